@@ -0,0 +1,92 @@
+"""contract bed uniqueness
+
+Revision ID: bfbf6445a4db
+Revises: 64ceebea232e
+Create Date: 2026-10-19 18:49:07.192910
+
+"""
+from typing import Sequence, Union
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# revision identifiers, used by Alembic.
+revision: str = 'bfbf6445a4db'
+down_revision: Union[str, None] = '64ceebea232e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # The unique index below fails on beds that already carry several live
+    # contracts. Keep one per bed (the ACTIVE one, else the oldest PENDING) and
+    # cancel the other PENDING ones with their unpaid invoices.
+    cancelled = bind.execute(sa.text("""
+        WITH ranked AS (
+            SELECT id, bed_id, status,
+                   row_number() OVER (
+                       PARTITION BY bed_id
+                       ORDER BY (status = 'ACTIVE') DESC, created_at, id
+                   ) AS rank
+            FROM contracts
+            WHERE status IN ('PENDING', 'ACTIVE')
+        )
+        UPDATE contracts SET status = 'TERMINATED'
+        FROM ranked
+        WHERE contracts.id = ranked.id AND ranked.rank > 1 AND ranked.status = 'PENDING'
+        RETURNING contracts.id, contracts.bed_id
+    """)).all()
+    if cancelled:
+        bind.execute(
+            sa.text("""
+                UPDATE invoices
+                SET status = 'CANCELLED',
+                    details = COALESCE(details, '{}'::jsonb) || '{"cancel_reason": "Duplicate contract for bed"}'::jsonb
+                WHERE status = 'UNPAID' AND contract_id IN :ids
+            """).bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": [row.id for row in cancelled]},
+        )
+        for row in cancelled:
+            logger.warning(f"Cancelled duplicate pending contract {row.id} on bed {row.bed_id}")
+
+    # Two ACTIVE contracts on one bed cannot be settled automatically: report
+    # them and stop before the index creation fails with a less useful error
+    conflicts = bind.execute(sa.text("""
+        SELECT bed_id, string_agg(id::text, ', ' ORDER BY created_at) AS contract_ids
+        FROM contracts
+        WHERE status = 'ACTIVE'
+        GROUP BY bed_id
+        HAVING count(*) > 1
+    """)).all()
+    if conflicts:
+        for row in conflicts:
+            logger.error(f"Bed {row.bed_id} has several ACTIVE contracts: {row.contract_ids}")
+        raise RuntimeError(
+            f"{len(conflicts)} beds have several ACTIVE contracts; terminate the extra ones and rerun the migration"
+        )
+
+    # Beds held by a pending contract used to stay AVAILABLE; mark them RESERVED
+    # so the conditional claim in booking sees them as taken.
+    op.execute("""
+        UPDATE beds SET status = 'RESERVED'
+        WHERE status = 'AVAILABLE'
+          AND EXISTS (
+              SELECT 1 FROM contracts
+              WHERE contracts.bed_id = beds.id AND contracts.status = 'PENDING'
+          )
+    """)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_index('uq_contracts_active_bed', 'contracts', ['bed_id'], unique=True, postgresql_where=sa.text("status IN ('PENDING', 'ACTIVE')"))
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('uq_contracts_active_bed', table_name='contracts', postgresql_where=sa.text("status IN ('PENDING', 'ACTIVE')"))
+    # ### end Alembic commands ###
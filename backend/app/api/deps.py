@@ -1,7 +1,9 @@
-from typing import Generator
+import math
+from typing import Generator, Optional
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, Header, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
@@ -9,11 +11,19 @@ from app.core.config import settings
 from app.models.users import User
 from app.models.enums import UserRole
 from app.core import security
+from app.core.admission import booking_room
+from app.core.principal import Principal, principal_cache
+from app.core.revocation import revocation_filter
+from app.core.rate_limit import login_ip_limiter, login_account_limiter, register_ip_limiter
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token"
 )
 
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token", auto_error=False
+)
+
 def get_db() -> Generator:
     try:
         db = SessionLocal()
@@ -21,31 +31,152 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
+def get_token_payload(
     token: str = Depends(reusable_oauth2)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+) -> dict:
+    # JWT check + in-memory revocation filter only, no database access
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == UUID(user_id)).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        payload = {}
+    user_id = payload.get("sub")
+    if user_id is None or revocation_filter.is_revoked(payload.get("jti"), user_id, payload.get("iat")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+def get_stream_token_payload(
+    header_token: Optional[str] = Depends(optional_oauth2),
+    token: Optional[str] = Query(None),
+) -> dict:
+    # EventSource cannot set headers, so streams also accept ?token=<access token>
+    return get_token_payload(header_token or token or "")
+
+def get_token_subject(
+    payload: dict = Depends(get_token_payload)
+) -> str:
+    return payload["sub"]
+
+def get_authenticated_user(
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_token_subject)
+) -> Principal:
+    """Token owner, also while a password change is pending (/auth/me, change password)"""
+    try:
+        key = UUID(user_id)
+    except ValueError:
+        key = None
+    principal = principal_cache.get(key) if key else None
+    if principal is None:
+        user = db.query(User).filter(User.id == key).first() if key else None
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal.from_user(user)
+        principal_cache.set(key, principal)
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tài khoản của bạn đã bị khóa hoặc chưa được kích hoạt."
+        )
+    return principal
+
+def get_current_user(
+    current_user: Principal = Depends(get_authenticated_user),
+) -> Principal:
+    if current_user.must_change_password:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Vui lòng đổi mật khẩu trước khi tiếp tục"
+        )
+    return current_user
+
+def require_booking_turn(
+    user_id: str = Depends(get_token_subject),
+    queue_token: Optional[str] = Header(None, alias="X-Queue-Token"),
+) -> Generator:
+    """
+    Admission control for booking: without an admitted turn token the request is
+    turned away with 429 before it touches the database.
+    """
+    if not settings.WAITING_ROOM_ENABLED:
+        yield None
+        return
+
+    rejected = booking_room.enter(queue_token, user_id)
+    if rejected is not None:
+        if not rejected:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Vui lòng lấy lượt trong hàng chờ trước khi đăng ký (POST /contracts/queue)",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"message": "Chưa đến lượt đăng ký, vui lòng chờ", **rejected},
+            headers={"Retry-After": str(max(math.ceil(rejected["eta_seconds"]), 1))},
+        )
+    # A refused booking (4xx, invalid body) keeps the turn so the student can pick
+    # another bed without queueing again; success or a server error uses it up
+    keep_turn = False
+    try:
+        yield queue_token
+    except HTTPException as exc:
+        keep_turn = exc.status_code < 500
+        raise
+    except RequestValidationError:
+        keep_turn = True
+        raise
+    finally:
+        if keep_turn:
+            booking_room.release(queue_token)
+        else:
+            booking_room.leave(queue_token)
+
+def client_ip(request: Request) -> str:
+    if settings.TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def _throttled(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Bạn thao tác quá nhiều lần, vui lòng thử lại sau",
+        headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+    )
+
+def limit_login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+) -> str:
+    """
+    Per-IP and per-account throttling for login, checked before any bcrypt or
+    database work. Returns the account key; the endpoint records failures on it.
+    """
+    retry_after = login_ip_limiter.hit(client_ip(request))
+    if retry_after:
+        raise _throttled(retry_after)
+    account = form_data.username.strip().lower()
+    retry_after = login_account_limiter.check(account)
+    if retry_after:
+        raise _throttled(retry_after)
+    return account
+
+def limit_register(request: Request) -> None:
+    retry_after = register_ip_limiter.hit(client_ip(request))
+    if retry_after:
+        raise _throttled(retry_after)
 
 def get_current_active_admin(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
@@ -56,8 +187,8 @@ def get_current_active_admin(
 get_current_active_superuser = get_current_active_admin
 
 def get_current_active_manager(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     # Manager or Admin can access manager routes
     if current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
         raise HTTPException(
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, rooms, contracts, services, communication, finance, users, conduct, transfers, dashboard, support, payment, chat
+from app.api.v1.endpoints import auth, rooms, contracts, services, communication, finance, users, conduct, transfers, dashboard, support, payment, chat, events
 
 api_router = APIRouter()
 
@@ -15,4 +15,5 @@ api_router.include_router(transfers.router, prefix="/transfers", tags=["Transfer
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 api_router.include_router(support.router, prefix="/support", tags=["Support"])
 api_router.include_router(chat.router, prefix="/chat", tags=["AI Chat"])
-api_router.include_router(payment.router, prefix="/payment", tags=["Payment"])
\ No newline at end of file
+api_router.include_router(payment.router, prefix="/payment", tags=["Payment"])
+api_router.include_router(events.router, prefix="/events", tags=["Events"])
\ No newline at end of file
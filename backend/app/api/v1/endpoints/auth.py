@@ -1,33 +1,35 @@
-from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.core import security
-from app.core.config import settings
+from app.core.rate_limit import login_account_limiter
+from app.services.auth_service import auth_service
 from app.services.user_service import user_service
-from app.schemas.token import Token
+from app.schemas.token import Token, RefreshRequest, LogoutRequest
 from app.schemas.user import UserCreate, UserResponse
 from app.models.users import User
 
 router = APIRouter()
 
 @router.post("/login/access-token", response_model=Token)
-def login_access_token(
+async def login_access_token(
     db: Session = Depends(deps.get_db),
-    form_data: OAuth2PasswordRequestForm = Depends()
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    account: str = Depends(deps.limit_login),
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
     # Gọi hàm authenticate từ Service Layer
-    user = user_service.authenticate(
+    user = await user_service.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     
     if not user:
+        login_account_limiter.hit(account)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Tài khoản hoặc mật khẩu không chính xác",
@@ -38,15 +40,34 @@ def login_access_token(
             detail="Tài khoản của bạn đã bị khóa hoặc chưa được kích hoạt."
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return {
-        "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
-        ),
-        "token_type": "bearer",
-    }
+    login_account_limiter.reset(account)
+    return await run_in_threadpool(auth_service.issue_tokens, db, user.id)
 
-@router.post("/register", response_model=UserResponse)
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(
+    *,
+    db: Session = Depends(deps.get_db),
+    body: RefreshRequest,
+) -> Any:
+    """
+    Đổi refresh token lấy cặp token mới (refresh token cũ bị thu hồi)
+    """
+    return auth_service.refresh(db, body.refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    *,
+    db: Session = Depends(deps.get_db),
+    body: Optional[LogoutRequest] = None,
+    payload: dict = Depends(deps.get_token_payload),
+) -> None:
+    """
+    Đăng xuất: thu hồi access token hiện tại và refresh token (hoặc mọi phiên)
+    """
+    body = body or LogoutRequest()
+    auth_service.logout(db, payload, refresh_token=body.refresh_token, all_sessions=body.all_sessions)
+
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(deps.limit_register)])
 def register_user(
     *,
     db: Session = Depends(deps.get_db),
@@ -69,7 +90,7 @@ def register_user(
 
 @router.get("/me", response_model=UserResponse)
 def read_users_me(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: User = Depends(deps.get_authenticated_user),
 ) -> Any:
     """
     Lấy thông tin người dùng hiện tại (Dựa trên Token gửi lên)
@@ -1,11 +1,16 @@
+import json
+from contextlib import aclosing
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.services.ai_service import ai_service
+from app.services.location_service import location_service
 from app.models.users import User
 from app.models.operations import Contract
-from app.models.enums import ContractStatus, InvoiceStatus
+from app.models.enums import InvoiceStatus
 from typing import List
 
 router = APIRouter()
@@ -27,17 +32,12 @@ def get_user_context(db: Session, user: User) -> str:
     context_parts = [f"User Name: {user.full_name}"]
     
     # 1. Check Active Contract & Room
-    active_contract = db.query(Contract).filter(
-        Contract.student_id == user.id,
-        Contract.status == ContractStatus.ACTIVE
-    ).first()
+    location = location_service.resolve(db, user.id)
     
-    if active_contract:
-        room = active_contract.bed.room
-        building = room.building
+    if location and location.is_active:
         context_parts.append(f"Living Status: Active Contract.")
-        context_parts.append(f"Address: Room {room.code}, Floor {room.floor}, Building {building.name}.")
-        context_parts.append(f"Contract Ends: {active_contract.end_date.strftime('%d/%m/%Y')}.")
+        context_parts.append(f"Address: Room {location.room_code}, Floor {location.floor}, Building {location.building_name}.")
+        context_parts.append(f"Contract Ends: {location.contract_end.strftime('%d/%m/%Y')}.")
     else:
         context_parts.append("Living Status: No active contract (Not currently living in dorm).")
 
@@ -78,13 +78,45 @@ async def chat(
     if not request.message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
     
-    # Build dynamic context
-    user_context = get_user_context(db, current_user)
+    # Build dynamic context (sync DB queries: keep them off the event loop)
+    user_context = await run_in_threadpool(get_user_context, db, current_user)
     
     # Generate response with context
     response_text = await ai_service.generate_response(request.message, user_context)
     return ChatResponse(response=response_text)
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Same as /chat/ but the answer arrives as Server-Sent Events while the model writes it:
+    `event: token` (data: {"text": ...}) repeated, then `event: done`.
+    """
+    if not request.message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    user_context = await run_in_threadpool(get_user_context, db, current_user)
+
+    async def stream():
+        # On client disconnect the response task is cancelled; aclosing makes sure
+        # the model stream is closed right away, not whenever the generator is collected
+        async with aclosing(ai_service.stream_response(request.message, user_context)) as answer:
+            async for text in answer:
+                yield _sse("token", {"text": text})
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/suggested", response_model=List[SuggestedQuestion])
 async def get_suggested_questions():
     # Predefined list
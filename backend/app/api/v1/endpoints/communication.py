@@ -5,7 +5,7 @@ from uuid import UUID
 
 from app.api import deps
 from app.models.users import User, UserRole
-from app.schemas.communication import Announcement, AnnouncementCreate, AnnouncementUpdate
+from app.schemas.communication import Announcement, AnnouncementCreate, AnnouncementUpdate, AnnouncementInboxItem, UnreadCount, AnnouncementReceipts
 from app.services.communication_service import communication_service
 
 router = APIRouter()
@@ -22,6 +22,69 @@ def list_announcements(
     """
     return communication_service.get_announcements(db, current_user=current_user, skip=skip, limit=limit)
 
+@router.get("/inbox", response_model=List[AnnouncementInboxItem])
+def read_inbox(
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 50,
+    unread_only: bool = False,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Hộp thư thông báo của người dùng hiện tại (kèm trạng thái đã đọc).
+    """
+    rows = communication_service.get_inbox(db, current_user.id, skip=skip, limit=limit, unread_only=unread_only)
+    return [
+        AnnouncementInboxItem.model_validate(announcement).model_copy(update={"read_at": read_at})
+        for announcement, read_at in rows
+    ]
+
+@router.get("/inbox/unread-count", response_model=UnreadCount)
+def read_unread_count(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Số thông báo chưa đọc.
+    """
+    return {"unread": communication_service.unread_count(db, current_user.id)}
+
+@router.post("/inbox/read-all", response_model=UnreadCount)
+def mark_all_read(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Đánh dấu tất cả thông báo là đã đọc.
+    """
+    communication_service.mark_read(db, current_user.id)
+    return {"unread": 0}
+
+@router.post("/{id}/read", response_model=UnreadCount)
+def mark_read(
+    id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Đánh dấu một thông báo là đã đọc; trả về số thông báo chưa đọc còn lại.
+    """
+    communication_service.mark_read(db, current_user.id, announcement_id=id)
+    return {"unread": communication_service.unread_count(db, current_user.id)}
+
+@router.get("/{id}/receipts", response_model=AnnouncementReceipts)
+def read_receipts(
+    id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_manager),
+) -> Any:
+    """
+    Số người nhận và số người đã đọc một thông báo (Admin/Manager).
+    """
+    if not communication_service.get_announcement(db, announcement_id=id):
+        raise HTTPException(status_code=404, detail="Announcement not found")
+    return communication_service.get_receipts(db, id)
+
 @router.post("/", response_model=Announcement)
 def create_announcement(
     announcement_in: AnnouncementCreate,
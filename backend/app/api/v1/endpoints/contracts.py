@@ -1,12 +1,17 @@
 from typing import Any, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.config import settings
 from app.models.users import User, UserRole
-from app.schemas.operations import ContractCreate, ContractResponse, ContractUpdateStatus, LiquidationCreate, LiquidationResponse, AdminContractCreate
+from app.schemas.operations import ContractCreate, ContractResponse, ContractUpdateStatus, LiquidationCreate, LiquidationResponse, AdminContractCreate, AllocationRequest, AllocationResult, QueueTicket, BulkContractStatusUpdate, BulkContractStatusResult, RenewalGenerate, RenewalResult, LiquidationBatchCreate, LiquidationBatchResult, ContractQuoteRequest, ContractQuoteResponse
 from app.services.contract_service import contract_service
+from app.services.allocation_service import allocation_service
+from app.services.renewal_service import renewal_service
+from app.core.admission import booking_room
+from app.core.principal import invalidate_principal
 
 router = APIRouter()
 
@@ -44,13 +49,70 @@ def admin_create_contract(
         db.add(student)
         db.commit()
         db.refresh(student)
+        invalidate_principal(student.id)
 
     # Reuse book_bed logic but pass the student_id from the input
     return contract_service.book_bed(db, user_id=contract_in.student_id, contract_in=contract_in)
 
+@router.post("/allocate", response_model=AllocationResult)
+def batch_allocate_beds(
+    allocation_in: AllocationRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Xếp giường hàng loạt cho đợt nhập học (tạo các hợp đồng CHỜ DUYỆT trong một lần).
+    Dùng `dry_run=true` để xem trước phương án và chỉ số chất lượng.
+    """
+    return allocation_service.allocate(db, allocation_in)
+
+@router.post("/quote", response_model=ContractQuoteResponse)
+def quote_contract_prices(
+    quote_in: ContractQuoteRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Báo giá nhiều giường x nhiều ngày kết thúc trong một lần gọi (không ghi dữ liệu).
+    """
+    return contract_service.quote(db, quote_in)
+
+@router.post("/queue", response_model=QueueTicket)
+def join_booking_queue(
+    user_id: str = Depends(deps.get_token_subject),
+) -> Any:
+    """
+    Lấy lượt trong hàng chờ đăng ký (gửi lại sẽ trả về lượt hiện có).
+    """
+    return booking_room.join(user_id)
+
+@router.get("/queue/stats")
+def read_booking_queue_stats(
+    current_user: User = Depends(deps.get_current_active_manager),
+) -> Any:
+    """
+    Queue length, admitted slots and average service time of the waiting room.
+    """
+    return {"enabled": settings.WAITING_ROOM_ENABLED, **booking_room.stats()}
+
+@router.get("/queue/{token}", response_model=QueueTicket)
+def read_booking_queue_position(
+    token: str,
+    user_id: str = Depends(deps.get_token_subject),
+) -> Any:
+    """
+    Vị trí hiện tại và thời gian chờ ước tính. Khi `admitted=true`, gửi token
+    trong header `X-Queue-Token` khi gọi /contracts/book.
+    """
+    ticket = booking_room.status(token, user_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Lượt chờ không tồn tại hoặc đã hết hạn")
+    return ticket
+
 @router.post("/book", response_model=ContractResponse)
 def student_book_bed(
     contract_in: ContractCreate,
+    queue_token: Optional[str] = Depends(deps.require_booking_turn),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -71,9 +133,11 @@ def read_my_contracts(
 
 @router.get("/", response_model=List[ContractResponse])
 def read_all_contracts(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     campus_id: UUID = None, # Add campus_id filter
     keyword: Optional[str] = None,
     status: Optional[str] = None,
@@ -81,8 +145,13 @@ def read_all_contracts(
 ) -> Any:
     """
     Admin xem danh sách toàn bộ hợp đồng.
+    Trang tiếp theo: truyền lại `cursor` từ header X-Next-Cursor. Tổng số (ước lượng, cache ngắn) ở X-Total-Count.
     """
-    return contract_service.get_all(db, skip=skip, limit=limit, campus_id=campus_id, keyword=keyword, status=status)
+    contracts, next_cursor = contract_service.get_all(db, skip=skip, limit=limit, cursor=cursor, campus_id=campus_id, keyword=keyword, status=status)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(contract_service.count_all(db, campus_id=campus_id, keyword=keyword, status=status))
+    return contracts
 
 @router.put("/{contract_id}/status", response_model=ContractResponse)
 def admin_update_contract_status(
@@ -96,6 +165,61 @@ def admin_update_contract_status(
     """
     return contract_service.update_status(db, contract_id=contract_id, status_in=status_in)
 
+@router.post("/bulk-status", response_model=BulkContractStatusResult)
+def admin_bulk_update_contract_status(
+    request_in: BulkContractStatusUpdate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Duyệt (ACTIVE) hoặc từ chối (TERMINATED) hàng loạt hợp đồng chờ duyệt,
+    theo danh sách id hoặc bộ lọc. Kết quả trả về cho từng hợp đồng.
+    """
+    return contract_service.bulk_update_status(db, request_in)
+
+@router.post("/sweep")
+def run_contract_sweep(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Run the contract sweeper now (normally run by the scheduled job).
+    """
+    return contract_service.sweep(db)
+
+@router.post("/renewals/generate", response_model=RenewalResult)
+def generate_contract_renewals(
+    renewal_in: RenewalGenerate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Tạo hàng loạt hợp đồng gia hạn (CHỜ XÁC NHẬN) kèm hóa đơn cho các hợp đồng sắp hết hạn.
+    """
+    return renewal_service.generate(db, renewal_in)
+
+@router.post("/{contract_id}/renewal/confirm", response_model=ContractResponse)
+def confirm_contract_renewal(
+    contract_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Sinh viên xác nhận gia hạn hợp đồng.
+    """
+    return renewal_service.confirm(db, contract_id=contract_id, user_id=current_user.id)
+
+@router.post("/{contract_id}/renewal/decline", response_model=ContractResponse)
+def decline_contract_renewal(
+    contract_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Sinh viên từ chối gia hạn (hóa đơn gia hạn bị hủy).
+    """
+    return renewal_service.decline(db, contract_id=contract_id, user_id=current_user.id)
+
 @router.post("/liquidate", response_model=LiquidationResponse)
 def liquidate_contract(
     liquidation_in: LiquidationCreate,
@@ -108,6 +232,18 @@ def liquidate_contract(
     from app.services.liquidation_service import liquidation_service
     return liquidation_service.liquidate_contract(db, confirmed_by=current_user.id, obj_in=liquidation_in)
 
+@router.post("/liquidate/batch", response_model=LiquidationBatchResult)
+def liquidate_contracts_batch(
+    batch_in: LiquidationBatchCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Liquidate many contracts at once (end-of-semester checkout) with per-contract fees.
+    """
+    from app.services.liquidation_service import liquidation_service
+    return liquidation_service.liquidate_batch(db, confirmed_by=current_user.id, request=batch_in)
+
 @router.delete("/{contract_id}/cancel")
 def student_cancel_contract(
     contract_id: UUID,
@@ -1,10 +1,15 @@
-from typing import Any
+from datetime import date, timedelta
+from typing import Any, Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.cache import cache_stats
 from app.models.users import User
+from app.models.enums import GenderType
 from app.services.dashboard_service import dashboard_service
+from app.services.occupancy_service import occupancy_service
 
 router = APIRouter()
 
@@ -31,3 +36,47 @@ def get_student_stats(
          pass # Allow others for testing or restrict? Usually dashboard is role-specific.
     
     return dashboard_service.get_student_stats(db, student_id=current_user.id)
+
+@router.get("/occupancy-trend")
+def get_occupancy_trend(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    building_id: Optional[UUID] = None,
+    room_type_id: Optional[UUID] = None,
+    gender_type: Optional[GenderType] = None,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_manager),
+) -> Any:
+    """
+    Daily occupancy history from the snapshot rollups (default: last 365 days).
+    """
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=365)
+    return occupancy_service.get_trend(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        building_id=building_id,
+        room_type_id=room_type_id,
+        gender_type=gender_type
+    )
+
+@router.post("/occupancy-snapshot")
+def take_occupancy_snapshot(
+    snapshot_date: Optional[date] = None,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Run the daily occupancy snapshot now (normally run by the scheduled job).
+    """
+    return occupancy_service.take_snapshot(db, snapshot_date=snapshot_date)
+
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Size and hit/miss counters of the in-process caches (this worker only).
+    """
+    return cache_stats()
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import time
+from typing import Any, List, Tuple
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.core.events import event_broker
+from app.core.principal import Principal
+from app.db.session import SessionLocal
+from app.models.users import User
+from app.services.location_service import location_service
+
+router = APIRouter()
+
+
+def _subscriber_topics(user_id: str) -> Tuple[Principal, List[str]]:
+    # Short-lived session: the stream itself must not hold a pooled connection
+    db: Session = SessionLocal()
+    try:
+        # Called outside FastAPI's resolver: run both dependency steps explicitly
+        principal = deps.get_current_user(deps.get_authenticated_user(db=db, user_id=user_id))
+        topics = ["all", f"user:{principal.id}", f"role:{principal.role.value}"]
+        location = location_service.resolve(db, principal.id)
+        if location:
+            topics += [f"room:{location.room_id}", f"building:{location.building_id}", f"campus:{location.campus_id}"]
+        return principal, topics
+    finally:
+        db.close()
+
+
+def _format(event: dict) -> str:
+    data = json.dumps({"type": event["type"], "data": event["data"], "at": event["at"]}, default=str, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    payload: dict = Depends(deps.get_stream_token_payload),
+) -> Any:
+    """
+    Server-Sent Events: thông báo, hóa đơn mới, thanh toán thành công.
+    EventSource: /events/stream?token=<access token>
+    """
+    _, topics = await run_in_threadpool(_subscriber_topics, payload["sub"])
+    # The stream ends with the access token; the client reconnects with a fresh one
+    expires_at = float(payload.get("exp") or time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+    async def stream():
+        async with event_broker.subscribe(topics) as subscription:
+            yield "retry: 5000\n: connected\n\n"
+            while time.time() < expires_at:
+                if await request.is_disconnected():
+                    break
+                timeout = min(settings.EVENTS_KEEPALIVE_SECONDS, max(expires_at - time.time(), 0))
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format(event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+def read_event_stats(
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Số kết nối đang mở và số sự kiện đã phát (Admin).
+    """
+    return event_broker.stats()
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.api import deps
 from app.services.payment_gateway_service import payment_gateway_service
+from app.services.location_service import location_service
 from app.models.users import User
 
 router = APIRouter()
@@ -26,17 +27,11 @@ def create_payment_url(
     client_ip = request.client.host
     
     # 1. Fetch Student Info (Room - Building)
-    from app.models.operations import Contract, ContractStatus
-    contract = db.query(Contract).filter(
-        Contract.student_id == current_user.id,
-        Contract.status == ContractStatus.ACTIVE
-    ).first()
+    location = location_service.resolve(db, current_user.id)
     
     student_info = "Unknown"
-    if contract and contract.bed and contract.bed.room and contract.bed.room.building:
-        building_name = contract.bed.room.building.name
-        room_code = contract.bed.room.code
-        student_info = f"{building_name} - {room_code}"
+    if location and location.is_active:
+        student_info = f"{location.building_name} - {location.room_code}"
     
     url = payment_gateway_service.create_payment_url(req.invoice_id, req.amount, client_ip, current_user.full_name, student_info)
     return {"url": url}
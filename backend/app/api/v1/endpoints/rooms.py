@@ -1,16 +1,19 @@
 from typing import Any, List, Optional, Dict
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.models.users import User
 from app.models.enums import RoomStatus
 from app.services.room_service import room_service, room_type_service
+from app.services.location_service import location_service
 # Import Schema mới tạo
 from app.schemas.infrastructure import (
     RoomResponse, RoomCreate, RoomUpdate,
-    RoomTypeResponse, RoomTypeCreate, RoomTypeUpdate
+    RoomTypeResponse, RoomTypeCreate, RoomTypeUpdate,
+    FloorPlanProvision, ProvisionResult
 )
 
 router = APIRouter()
@@ -148,9 +151,32 @@ def update_building(
         
     db.commit()
     db.refresh(building)
+    # Cached student locations carry the building name
+    location_service.clear()
     return building
 
 
+@router.get("/buildings/{building_id}/bed-matrix")
+def get_building_bed_matrix(
+    building_id: UUID,
+    since: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_manager),
+) -> Any:
+    """
+    Compact bed-status matrix of a whole building (floor x room x bed).
+    Pass `since=<version>` to receive only the cells changed after that version.
+    """
+    # Revalidation only needs the version, not the matrix itself
+    version = room_service.get_bed_matrix_version(db, building_id=building_id)
+    etag = f'W/"{building_id}:{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    matrix = room_service.get_bed_matrix(db, building_id=building_id, since=since, version=version)
+    return JSONResponse(content=matrix, headers=headers)
+
 @router.get("/stats", response_model=Dict[str, Any])
 def get_room_statistics(
     db: Session = Depends(deps.get_db),
@@ -196,6 +222,36 @@ def read_rooms(
         rooms = room_service.get_multi(db, skip=skip, limit=limit)
         return rooms
 
+@router.get("/compact")
+def read_rooms_compact(
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    room_type_id: Optional[UUID] = None,
+    status: Optional[RoomStatus] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    building_id: Optional[UUID] = None,
+    keyword: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Lightweight room listing for the grid view (code, floor, status, price, occupancy).
+    """
+    rows = room_service.get_compact_listing(
+        db,
+        skip=skip,
+        limit=limit,
+        room_type_id=room_type_id,
+        status=status,
+        min_price=min_price,
+        max_price=max_price,
+        building_id=building_id,
+        keyword=keyword
+    )
+    # Rows are already JSON-ready; bypass response_model validation
+    return JSONResponse(content=rows)
+
 @router.post("/", response_model=RoomResponse)
 def create_room(
     *,
@@ -209,6 +265,18 @@ def create_room(
     room = room_service.create(db, obj_in=room_in)
     return room
 
+@router.post("/provision", response_model=ProvisionResult)
+def provision_floor_plan(
+    *,
+    db: Session = Depends(deps.get_db),
+    plan_in: FloorPlanProvision,
+    current_user: User = Depends(deps.get_current_active_manager),
+) -> Any:
+    """
+    Bulk-create rooms and beds for a building from a floor plan template.
+    """
+    return room_service.provision_floor_plan(db, plan=plan_in)
+
 @router.get("/{room_id}", response_model=RoomResponse)
 def read_room_by_id(
     room_id: UUID,
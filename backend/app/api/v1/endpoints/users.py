@@ -1,5 +1,5 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, File, HTTPException, UploadFile, status
 from fastapi.encoders import jsonable_encoder
 from pydantic.networks import EmailStr
 from sqlalchemy.orm import Session
@@ -8,9 +8,10 @@ from uuid import UUID
 from app.api import deps
 from app.core.config import settings
 from app.models.users import User, UserRole
-from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserPasswordUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserPasswordUpdate, UserImportResult
 from app.services.user_service import user_service
 from app.core import security
+from app.services.auth_service import auth_service
 
 router = APIRouter()
 
@@ -55,6 +56,20 @@ def create_user(
     user = user_service.create(db, obj_in=user_in)
     return user
 
+@router.post("/import", response_model=UserImportResult)
+def import_users(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    current_user: User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Import student accounts from CSV (email, student_code, full_name, phone_number, gender, password).
+    dry_run=true only validates the file.
+    """
+    return user_service.import_csv(db, file.file.read(), dry_run=dry_run)
+
 @router.get("/{user_id}", response_model=UserResponse)
 def read_user_by_id(
     user_id: UUID,
@@ -114,7 +129,7 @@ def update_user_password(
     db: Session = Depends(deps.get_db),
     user_id: UUID,
     password_in: UserPasswordUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: User = Depends(deps.get_authenticated_user),
 ) -> Any:
     """
     Update password.
@@ -143,9 +158,14 @@ def update_user_password(
     # Update new password
     new_password_hash = security.get_password_hash(password_in.new_password)
     user.hashed_password = new_password_hash
+    if user.id == current_user.id:
+        # One-time password of an imported account replaced by the student
+        user.must_change_password = False
     db.add(user)
     db.commit()
     db.refresh(user)
+    # Đổi mật khẩu: đăng xuất mọi phiên đang mở
+    auth_service.revoke_all(db, user.id)
     return user
 
 @router.delete("/{user_id}", response_model=UserResponse)
@@ -175,4 +195,5 @@ def delete_user(
     db.add(user)
     db.commit()
     db.refresh(user)
+    auth_service.revoke_all(db, user.id)
     return user
@@ -0,0 +1,177 @@
+"""
+In-process waiting room for the booking flow.
+
+Students take a turn token, poll their position and only call `/contracts/book`
+once admitted. At most `max_active` tokens are admitted at a time, so excess
+load waits here (a dict lookup under a lock) instead of queueing on DB pool
+checkouts. State lives in the worker process: run a single worker while the
+room is enabled, or put one in front of the API.
+"""
+import math
+import secrets
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+
+
+@dataclass
+class Ticket:
+    token: str
+    user_id: str
+    seq: int
+    issued_at: float = field(default_factory=time.monotonic)
+    last_seen: float = field(default_factory=time.monotonic)
+    admitted_at: Optional[float] = None
+    in_flight: bool = False
+
+
+class WaitingRoom:
+    def __init__(self, max_active: int, token_ttl: float, default_service_time: float = 2.0):
+        self.max_active = max_active
+        self.token_ttl = token_ttl
+        self._lock = threading.Lock()
+        self._tickets: Dict[str, Ticket] = {}
+        self._by_user: Dict[str, str] = {}
+        self._waiting: Deque[str] = deque()
+        self._admitted: Dict[str, Ticket] = {}
+        self._issued = 0
+        self._next_admit_seq = 0
+        # EWMA of how long an admitted token holds its slot; drives the ETA
+        self._service_time = default_service_time
+        self.completed = 0
+        self.expired = 0
+
+    def join(self, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            token = self._by_user.get(user_id)
+            ticket = self._tickets.get(token) if token else None
+            if ticket is None:
+                ticket = Ticket(token=secrets.token_urlsafe(24), user_id=user_id, seq=self._issued)
+                self._issued += 1
+                self._tickets[ticket.token] = ticket
+                self._by_user[user_id] = ticket.token
+                self._waiting.append(ticket.token)
+            ticket.last_seen = now
+            self._admit(now)
+            return self._describe(ticket, now)
+
+    def status(self, token: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """None for an unknown token and for another user's token (no keep-alive either)"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            ticket = self._tickets.get(token)
+            if ticket is None or ticket.user_id != user_id:
+                return None
+            ticket.last_seen = now
+            self._admit(now)
+            return self._describe(ticket, now)
+
+    def enter(self, token: Optional[str], user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark an admitted token as in flight. Returns None on success, otherwise the
+        ticket description (or an empty dict for an unknown token) for the 429 body.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            ticket = self._tickets.get(token) if token else None
+            if ticket is None or ticket.user_id != user_id:
+                return {}
+            ticket.last_seen = now
+            self._admit(now)
+            if ticket.admitted_at is None or ticket.in_flight:
+                return self._describe(ticket, now)
+            ticket.in_flight = True
+            return None
+
+    def release(self, token: str) -> None:
+        """
+        Hand an in-flight token back unused (the booking was refused, e.g. the bed
+        was just taken): it may enter again until its admission expires.
+        """
+        with self._lock:
+            ticket = self._tickets.get(token)
+            if ticket is not None:
+                ticket.in_flight = False
+                ticket.last_seen = time.monotonic()
+
+    def leave(self, token: str) -> None:
+        # A token is single-use: finishing the booking call frees its slot
+        with self._lock:
+            ticket = self._tickets.get(token)
+            if ticket is None:
+                return
+            if ticket.admitted_at is not None:
+                held = time.monotonic() - ticket.admitted_at
+                self._service_time = 0.8 * self._service_time + 0.2 * held
+            self._drop(ticket)
+            self.completed += 1
+            self._admit(time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "waiting": len(self._tickets) - len(self._admitted),
+                "admitted": len(self._admitted),
+                "max_active": self.max_active,
+                "completed": self.completed,
+                "expired": self.expired,
+                "avg_service_seconds": round(self._service_time, 2),
+            }
+
+    # --- internals (caller holds the lock) ---
+
+    def _admit(self, now: float) -> None:
+        while self._waiting and len(self._admitted) < self.max_active:
+            ticket = self._tickets.get(self._waiting.popleft())
+            if ticket is None:
+                continue
+            self._next_admit_seq = ticket.seq + 1
+            if now - ticket.last_seen > self.token_ttl:
+                # Abandoned while waiting (stopped polling): skip it
+                self._drop(ticket)
+                self.expired += 1
+                continue
+            ticket.admitted_at = now
+            self._admitted[ticket.token] = ticket
+
+    def _expire(self, now: float) -> None:
+        # Admitted tokens must be used within the TTL; waiting ones are checked in _admit
+        stale = [
+            t for t in self._admitted.values()
+            if not t.in_flight and now - t.admitted_at > self.token_ttl
+        ]
+        for ticket in stale:
+            self._drop(ticket)
+            self.expired += 1
+
+    def _drop(self, ticket: Ticket) -> None:
+        self._tickets.pop(ticket.token, None)
+        self._admitted.pop(ticket.token, None)
+        if self._by_user.get(ticket.user_id) == ticket.token:
+            del self._by_user[ticket.user_id]
+
+    def _describe(self, ticket: Ticket, now: float) -> Dict[str, Any]:
+        admitted = ticket.admitted_at is not None
+        # Approximate: tickets that left the queue early are still counted
+        position = 0 if admitted else max(ticket.seq - self._next_admit_seq, 0) + 1
+        eta = 0 if admitted else math.ceil(position / self.max_active) * self._service_time
+        expires_at = (ticket.admitted_at if admitted else ticket.last_seen) + self.token_ttl
+        return {
+            "token": ticket.token,
+            "admitted": admitted,
+            "position": position,
+            "eta_seconds": round(eta, 1),
+            "expires_in": max(round(expires_at - now, 1), 0),
+        }
+
+
+booking_room = WaitingRoom(settings.BOOKING_MAX_CONCURRENCY, settings.QUEUE_TOKEN_TTL_SECONDS)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,11 +11,47 @@ class Settings(BaseSettings):
     
     # Security
     SECRET_KEY: str
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Short-lived access tokens; sessions are kept alive with refresh tokens
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # Password hashing: bcrypt cost, and the pool that runs it ("thread" or "process")
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Auth rate limits: login attempts per IP per minute, failed logins per
+    # account per 15 minutes, registrations per IP per hour
+    RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_PER_IP: int = 20
+    LOGIN_FAILURES_PER_ACCOUNT: int = 5
+    REGISTER_RATE_PER_IP: int = 5
+    # Take the client IP from X-Forwarded-For (only behind a trusted reverse proxy)
+    TRUST_FORWARDED_FOR: bool = False
+
+    # get_current_user principal cache (per worker)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
     PAYMENT_SECRET_KEY: str
 
+    # Booking waiting room (admission control during registration rush)
+    WAITING_ROOM_ENABLED: bool = False
+    BOOKING_MAX_CONCURRENCY: int = 10
+    QUEUE_TOKEN_TTL_SECONDS: int = 120
+
+    # Push channel (/events/stream): "memory" for one process, "postgres"
+    # (LISTEN/NOTIFY) when several API processes serve the stream
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_KEEPALIVE_SECONDS: int = 25
+
+    # Contract sweeper: unpaid PENDING contracts older than this release their bed
+    CONTRACT_PENDING_TTL_HOURS: int = 72
+
     # Google Gemini API
     GEMINI_API_KEY: str
+    # Endpoint override (API proxy, or the fake server of scripts/loadtest_chat)
+    GEMINI_BASE_URL: Optional[str] = None
+    # Deadline per chat answer (queueing included) and max model calls in flight per process
+    AI_TIMEOUT_SECONDS: float = 30
+    AI_MAX_CONCURRENCY: int = 16
 
     class Config:
         env_file = ".env"
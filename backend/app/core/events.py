@@ -0,0 +1,200 @@
+"""
+In-process pub/sub broker behind the `/events/stream` push channel.
+
+Services publish small events to topics after committing:
+
+- `user:<id>`              one user (invoices, payments)
+- `role:<value>`           everyone with a role ("SINH_VIEN", "QUAN_LY_TOA", ...)
+- `building:<id>`, `campus:<id>`, `room:<id>`  residents of a location
+- `all`                    everyone
+
+Each SSE connection is one coroutine waiting on a bounded asyncio.Queue, so idle
+connections cost a queue and a dict entry, not a thread. `publish()` is safe to
+call from the threadpool (sync endpoints): delivery is handed to each
+subscriber's event loop with `call_soon_threadsafe`.
+
+With several API processes, set EVENTS_BACKEND=postgres: events then travel
+through Postgres LISTEN/NOTIFY and every process delivers them to its own
+subscribers. Other transports only need to implement `EventBackend`.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Protocol, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "sdms_events"
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", topics: Set[str], maxsize: int):
+        self.broker = broker
+        self.topics = topics
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, event: dict) -> None:
+        # Runs on the subscriber's loop. A client that does not keep up loses the
+        # oldest events instead of growing memory without bound.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    async def __aenter__(self) -> "Subscription":
+        self.broker._add(self)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.broker._remove(self)
+
+
+class EventBackend(Protocol):
+    def publish(self, event: dict) -> None:
+        """Send an event to every process (including this one)"""
+        ...
+
+    def start(self, deliver: Callable[[dict], None]) -> None:
+        """Begin calling `deliver` for events published by any process"""
+        ...
+
+
+class LocalBackend:
+    def __init__(self):
+        self._deliver: Optional[Callable[[dict], None]] = None
+
+    def start(self, deliver: Callable[[dict], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, event: dict) -> None:
+        if self._deliver:
+            self._deliver(event)
+
+
+class PostgresBackend:
+    """LISTEN/NOTIFY fan-out between API processes (payloads must stay under 8 KB)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, event: dict) -> None:
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", (CHANNEL, json.dumps(event, default=str)))
+            raw.commit()
+        finally:
+            raw.close()
+
+    def start(self, deliver: Callable[[dict], None]) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._listen, args=(deliver,), name="events-listen", daemon=True)
+            self._thread.start()
+
+    def _listen(self, deliver: Callable[[dict], None]) -> None:
+        while True:
+            try:
+                raw = self.engine.raw_connection()
+                conn = raw.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        deliver(json.loads(conn.notifies.pop(0).payload))
+            except Exception:
+                logger.exception("Event listener lost its connection, reconnecting")
+                time.sleep(1)
+
+
+class EventBroker:
+    def __init__(self, backend: EventBackend, queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._topics: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._started = False
+        self.published = 0
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        return Subscription(self, set(topics), self.queue_size)
+
+    def publish(self, topics: Iterable[str], event_type: str, data: Dict[str, Any]) -> None:
+        event = {
+            "id": uuid.uuid4().hex,
+            "type": event_type,
+            "topics": sorted(set(topics)),
+            "data": data,
+            "at": time.time(),
+        }
+        try:
+            self.backend.publish(event)
+            self.published += 1
+        except Exception:
+            # Push is best effort: never fail the request that triggered it
+            logger.exception("Could not publish event %s", event_type)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            subscriptions = set().union(*self._topics.values()) if self._topics else set()
+            return {
+                "connections": len(subscriptions),
+                "topics": len(self._topics),
+                "published": self.published,
+                "dropped": sum(s.dropped for s in subscriptions),
+            }
+
+    def _deliver(self, event: dict) -> None:
+        with self._lock:
+            targets = set()
+            for topic in event["topics"]:
+                targets.update(self._topics.get(topic, ()))
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # Loop already closed (shutdown); the subscription goes away with it
+                pass
+
+    def _add(self, subscription: Subscription) -> None:
+        with self._lock:
+            if not self._started:
+                self.backend.start(self._deliver)
+                self._started = True
+            for topic in subscription.topics:
+                self._topics[topic].add(subscription)
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+
+def _make_backend() -> EventBackend:
+    if settings.EVENTS_BACKEND == "postgres":
+        from app.db.session import engine
+        return PostgresBackend(engine)
+    return LocalBackend()
+
+
+event_broker = EventBroker(_make_backend())
@@ -0,0 +1,51 @@
+"""
+Authenticated principal cache used by `deps.get_current_user`.
+
+The Principal carries the UserResponse fields plus role and active flag, so
+permission checks and `/auth/me` need no database round trip. Entries are
+dropped on user update, password change and deactivation; the TTL bounds
+staleness across worker processes.
+"""
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.enums import GenderType, UserRole
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: UUID
+    email: str
+    full_name: Optional[str]
+    role: UserRole
+    is_active: bool
+    student_code: Optional[str] = None
+    avatar_url: Optional[str] = None
+    phone_number: Optional[str] = None
+    gender: Optional[GenderType] = None
+    must_change_password: bool = False
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            student_code=user.student_code,
+            avatar_url=user.avatar_url,
+            phone_number=user.phone_number,
+            gender=user.gender,
+            must_change_password=user.must_change_password,
+        )
+
+
+principal_cache = TTLCache("principal", ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS, maxsize=10000)
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    principal_cache.invalidate(user_id)
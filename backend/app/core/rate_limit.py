@@ -0,0 +1,112 @@
+"""
+Token-bucket rate limiting for the unauthenticated auth endpoints.
+
+Each limiter allows `capacity` requests per `window_seconds` per identity (client
+IP, account email), refilled continuously, so a burst is allowed but the
+sustained rate is bounded. Checks run in request dependencies, before the form
+reaches bcrypt or the database.
+
+Buckets live in an in-process store by default (per worker: with N workers the
+effective limit is up to N times higher). A shared store, e.g. Redis, can be
+plugged in with `set_backend()`; it only has to implement `RateLimitBackend`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Protocol, Tuple
+
+from app.core.config import settings
+
+
+class RateLimitBackend(Protocol):
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1, dry_run: bool = False) -> float:
+        """Consume `cost` tokens; return 0 if allowed, else seconds until it would be"""
+        ...
+
+    def reset(self, key: str) -> None:
+        ...
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # key -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1, dry_run: bool = False) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < cost:
+                wait = (cost - tokens) / rate
+            else:
+                wait = 0.0
+                if not dry_run:
+                    tokens -= cost
+            if dry_run and key not in self._buckets:
+                return wait
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Evicting the least recently used bucket only forgets a partial refill
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_backend: RateLimitBackend = MemoryBackend()
+
+
+def set_backend(backend: RateLimitBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+class RateLimiter:
+    def __init__(self, name: str, capacity: int, window_seconds: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / window_seconds
+        self.rejected = 0
+
+    def _key(self, identity: str) -> str:
+        return f"{self.name}:{identity}"
+
+    def hit(self, identity: str, cost: float = 1) -> float:
+        """Count one request; returns the Retry-After delay when over the limit"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return 0.0
+        wait = _backend.take(self._key(identity), self.capacity, self.rate, cost)
+        if wait:
+            self.rejected += 1
+        return wait
+
+    def check(self, identity: str) -> float:
+        """Like hit, without consuming (e.g. only failures are counted)"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return 0.0
+        wait = _backend.take(self._key(identity), self.capacity, self.rate, dry_run=True)
+        if wait:
+            self.rejected += 1
+        return wait
+
+    def reset(self, identity: str) -> None:
+        _backend.reset(self._key(identity))
+
+    def stats(self) -> Dict[str, float]:
+        return {"name": self.name, "capacity": self.capacity, "per_second": round(self.rate, 4), "rejected": self.rejected}
+
+
+# Every login attempt from one IP
+login_ip_limiter = RateLimiter("login_ip", settings.LOGIN_RATE_PER_IP, 60)
+# Failed logins per account (brute force / credential stuffing on one account)
+login_account_limiter = RateLimiter("login_account", settings.LOGIN_FAILURES_PER_ACCOUNT, 15 * 60)
+register_ip_limiter = RateLimiter("register_ip", settings.REGISTER_RATE_PER_IP, 60 * 60)
@@ -0,0 +1,65 @@
+"""
+In-memory revocation filter for stateless access tokens.
+
+Access tokens are short-lived JWTs, so revoking one only has to be remembered
+until it expires. Two kinds of entries are kept:
+
+- single tokens by `jti` (logout), dropped once past their `exp`;
+- per-user cut-offs: every token of that user issued before the timestamp is
+  rejected (logout everywhere, password change, deactivation).
+
+Lookups are a dict access under a lock, so `get_current_user` stays off the
+database. The filter lives in process memory: it is not shared between workers
+and is lost on restart, so a revoked access token stays usable on other workers
+(or after a restart) until it expires. That window is bounded by
+ACCESS_TOKEN_EXPIRE_MINUTES (15 minutes); refresh tokens are revoked in the
+database and are not affected. Cut-offs outlive the access token lifetime only
+as long as needed and are then pruned.
+"""
+import threading
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.core.config import settings
+
+
+class RevocationFilter:
+    def __init__(self, token_lifetime_seconds: float):
+        self.token_lifetime = token_lifetime_seconds
+        self._lock = threading.Lock()
+        self._jti: Dict[str, float] = {}
+        self._revoked_before: Dict[str, float] = {}
+        self._next_prune = 0.0
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._jti[jti] = expires_at
+
+    def revoke_user(self, user_id: UUID, at: Optional[float] = None) -> None:
+        with self._lock:
+            self._revoked_before[str(user_id)] = at if at is not None else time.time()
+
+    def is_revoked(self, jti: Optional[str], user_id: str, issued_at: Optional[float]) -> bool:
+        now = time.time()
+        with self._lock:
+            if now >= self._next_prune:
+                self._prune(now)
+            if jti and jti in self._jti:
+                return True
+            cutoff = self._revoked_before.get(user_id)
+            # Legacy tokens without iat cannot be dated; they expire on their own
+            return cutoff is not None and issued_at is not None and issued_at <= cutoff
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"revoked_tokens": len(self._jti), "revoked_users": len(self._revoked_before)}
+
+    def _prune(self, now: float) -> None:
+        self._jti = {k: exp for k, exp in self._jti.items() if exp > now}
+        horizon = now - self.token_lifetime
+        self._revoked_before = {k: t for k, t in self._revoked_before.items() if t > horizon}
+        self._next_prune = now + 60
+
+
+revocation_filter = RevocationFilter(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
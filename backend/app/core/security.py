@@ -1,31 +1,98 @@
+import asyncio
+import hashlib
+import secrets
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, List, Optional, Tuple, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
 # Cấu hình thuật toán băm (bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pinned to the configured cost: hashes made with another cost are
+# reported by needs_update and rehashed on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Bounded pool for password hashing so a login storm cannot occupy every
+# request thread (or the event loop) with bcrypt work
+_hash_executor: Optional[Executor] = None
 
 ALGORITHM = "HS256"
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     """Tạo JWT Token khi user đăng nhập thành công"""
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    # jti/iat let a token be revoked individually or by issue time (see core.revocation);
+    # iat keeps sub-second precision so a re-login right after a revocation is not caught by it
+    to_encode = {"exp": expire, "iat": now.timestamp(), "jti": uuid.uuid4().hex, "sub": str(subject)}
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     
     return encoded_jwt
 
+def create_refresh_token() -> Tuple[str, str]:
+    """Refresh token ngẫu nhiên (opaque) và hash SHA-256 để lưu DB"""
+    token = secrets.token_urlsafe(48)
+    return token, hash_refresh_token(token)
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """So sánh pass nhập vào và pass trong DB"""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Băm mật khẩu trước khi lưu vào DB"""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Trả về (hợp lệ, hash mới nếu cần băm lại theo cấu hình hiện tại)"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def configure_hash_executor(kind: str = None, workers: int = None) -> Executor:
+    global _hash_executor
+    kind = kind or settings.PASSWORD_HASH_EXECUTOR
+    workers = workers or settings.PASSWORD_HASH_WORKERS
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+    if kind == "process":
+        _hash_executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        _hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+    return _hash_executor
+
+def get_hash_executor() -> Executor:
+    return _hash_executor or configure_hash_executor()
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """
+    Bulk hashing (CSV import) on the shared hash executor. bcrypt releases the GIL,
+    so a thread pool spreads the work over cores as well as a process pool does.
+    """
+    workers = settings.PASSWORD_HASH_WORKERS
+    if len(passwords) < 2 * workers:
+        return [get_password_hash(p) for p in passwords]
+    # chunksize only matters for a process pool (fewer pickling round trips)
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(get_hash_executor().map(get_password_hash, passwords, chunksize=chunksize))
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), get_password_hash, password)
@@ -0,0 +1,32 @@
+"""
+Text normalization for search.
+
+Vietnamese names are searched without diacritics ("nguyen" finds "Nguyễn"), so
+the searchable text is stored pre-normalized and queries are normalized the
+same way. Normalizing in Python keeps the database free of `unaccent`.
+"""
+import re
+import unicodedata
+from typing import List, Optional
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_search(value: Optional[str]) -> str:
+    """Lower-case, strip diacritics (đ -> d) and collapse whitespace"""
+    if not value:
+        return ""
+    value = value.replace("đ", "d").replace("Đ", "d")
+    value = unicodedata.normalize("NFD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return _SPACES.sub(" ", value).strip().lower()
+
+
+def search_terms(keyword: Optional[str]) -> List[str]:
+    return [term for term in normalize_search(keyword).split(" ") if term]
+
+
+def user_search_text(email: Optional[str], full_name: Optional[str], student_code: Optional[str]) -> str:
+    return " ".join(part for part in (
+        normalize_search(full_name), normalize_search(student_code), normalize_search(email)
+    ) if part)
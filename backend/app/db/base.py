@@ -1,10 +1,11 @@
 from app.models.base_class import Base
-from app.models.users import User, UserRole
+from app.models.users import User, UserRole, RefreshToken
 from app.models.infrastructure import Campus, Building, Room, Bed
 from app.models.operations import Contract, Asset
 from app.models.finance import Invoice, UtilityReading
 from app.models.support import MaintenanceRequest
 from app.models.operations import LiquidationRecord, TransferRequest
 from app.models.services import ServicePackage, ServiceSubscription
-from app.models.communication import Announcement
-from app.models.conduct import Violation
\ No newline at end of file
+from app.models.communication import Announcement, AnnouncementRecipient
+from app.models.conduct import Violation
+from app.models.reporting import OccupancySnapshot
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Contract renewal job. Creates renewal contracts and invoices for contracts ending
+soon (students have to renew 15 days before expiry). Schedule daily:
+
+    python -m app.jobs.contract_renewals --window-days 15 --term-months 5
+"""
+import argparse
+import logging
+from app.db import base  # noqa: F401
+from app.db.session import SessionLocal
+from app.schemas.operations import RenewalGenerate
+from app.services.renewal_service import renewal_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def run(window_days: int = 15, term_months: int = 5) -> None:
+    db = SessionLocal()
+    try:
+        result = renewal_service.generate(db, RenewalGenerate(window_days=window_days, term_months=term_months))
+        logger.info(
+            f"Contract renewals: {result['created']} created, {result['skipped']} skipped "
+            f"of {result['candidates']} candidates in {result['elapsed_ms']} ms"
+        )
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--window-days", type=int, default=15)
+    parser.add_argument("--term-months", type=int, default=5)
+    args = parser.parse_args()
+    run(args.window_days, args.term_months)
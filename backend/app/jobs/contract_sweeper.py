@@ -0,0 +1,32 @@
+"""
+Contract sweeper job. Expires ended contracts and releases stale pending holds,
+then prunes expired refresh tokens. Schedule periodically (e.g. cron every 15 minutes):
+
+    python -m app.jobs.contract_sweeper
+"""
+import logging
+from app.db import base  # noqa: F401
+from app.db.session import SessionLocal
+from app.services.auth_service import auth_service
+from app.services.contract_service import contract_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def run() -> None:
+    db = SessionLocal()
+    try:
+        result = contract_service.sweep(db)
+        logger.info(
+            f"Contract sweep: {result['expired_contracts']} expired ({result['freed_beds']} beds freed), "
+            f"{result['released_holds']} pending holds released ({result['released_beds']} beds freed), "
+            f"{result['activated_renewals']} renewals activated, {result['lapsed_renewals']} lapsed "
+            f"in {result['elapsed_ms']} ms"
+        )
+        pruned = auth_service.prune_refresh_tokens(db)
+        logger.info(f"Refresh tokens: {pruned} expired tokens pruned")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,25 @@
+"""
+Daily occupancy snapshot job. Schedule once a day (e.g. cron at 23:55):
+
+    python -m app.jobs.occupancy_snapshot
+"""
+import logging
+from app.db import base  # noqa: F401
+from app.db.session import SessionLocal
+from app.services.occupancy_service import occupancy_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def run() -> None:
+    db = SessionLocal()
+    try:
+        result = occupancy_service.take_snapshot(db)
+        logger.info(
+            f"Occupancy snapshot {result['snapshot_date']}: {result['rows']} rows in {result['elapsed_ms']} ms"
+        )
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run()
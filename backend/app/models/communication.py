@@ -1,6 +1,7 @@
 import uuid
 from typing import Optional, TYPE_CHECKING
-from sqlalchemy import String, ForeignKey, Text, Enum, DateTime, JSON
+from sqlalchemy import String, ForeignKey, Text, Enum, DateTime, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base_class import Base
 from app.models.enums import AnnouncementPriority, AnnouncementScope, AnnouncementStatus
@@ -19,7 +20,8 @@ class Announcement(Base):
     
     # Targeting
     scope: Mapped[AnnouncementScope] = mapped_column(Enum(AnnouncementScope), default=AnnouncementScope.GLOBAL)
-    target_criteria: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
+    # List of building ids / campus ids / role values, matched with JSONB containment (@>)
+    target_criteria: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
     
     # Scheduling & Lifecycle
     status: Mapped[AnnouncementStatus] = mapped_column(Enum(AnnouncementStatus), default=AnnouncementStatus.DRAFT)
@@ -30,3 +32,29 @@ class Announcement(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
     author: Mapped["User"] = relationship("User")
+
+    __table_args__ = (
+        Index(
+            "ix_announcements_target_criteria", "target_criteria",
+            postgresql_using="gin", postgresql_ops={"target_criteria": "jsonb_path_ops"}
+        ),
+        # Student feed: published announcements by priority, newest first
+        Index("ix_announcements_status_priority_created", "status", "priority", "created_at"),
+    )
+
+class AnnouncementRecipient(Base):
+    """Per-user inbox row, fanned out when an announcement is published."""
+    __tablename__ = "announcement_recipients"
+    __table_args__ = (
+        UniqueConstraint("user_id", "announcement_id", name="uq_announcement_recipient"),
+        # Inbox listing: one range scan per user in display order
+        Index("ix_announcement_recipients_inbox", "user_id", "priority", "published_at"),
+        Index("ix_announcement_recipients_unread", "user_id", postgresql_where=text("read_at IS NULL")),
+    )
+
+    announcement_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("announcements.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # Copied from the announcement so the inbox sorts without a join
+    priority: Mapped[AnnouncementPriority] = mapped_column(Enum(AnnouncementPriority))
+    published_at: Mapped[datetime] = mapped_column(DateTime)
+    read_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
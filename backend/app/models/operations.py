@@ -1,7 +1,7 @@
 import uuid
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
-from sqlalchemy import String, ForeignKey, DateTime, Float, Enum, Text
+from sqlalchemy import String, ForeignKey, DateTime, Float, Enum, Text, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base_class import Base
 from app.models.enums import ContractStatus, TransferStatus
@@ -33,6 +33,24 @@ class TransferRequest(Base):
 
 class Contract(Base):
     __tablename__ = "contracts"
+    __table_args__ = (
+        # At most one live (pending/active) contract per bed; a renewal shares
+        # the bed with the contract it renews
+        Index(
+            "uq_contracts_active_bed", "bed_id", unique=True,
+            postgresql_where=text("status IN ('PENDING', 'ACTIVE') AND renewal_of_id IS NULL")
+        ),
+        # At most one live renewal per contract
+        Index(
+            "uq_contracts_live_renewal", "renewal_of_id", unique=True,
+            postgresql_where=text("status IN ('PENDING', 'ACTIVE')")
+        ),
+        # Sweeper scans: ended ACTIVE contracts and stale PENDING holds
+        Index("ix_contracts_status_end_date", "status", "end_date"),
+        Index("ix_contracts_status_created_at", "status", "created_at"),
+        # Keyset pagination of the admin list (newest first)
+        Index("ix_contracts_created_at_id", "created_at", "id"),
+    )
     
     student_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
     bed_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("beds.id"))
@@ -44,6 +62,11 @@ class Contract(Base):
     deposit_amount: Mapped[float] = mapped_column(Float, default=0.0)
     
     status: Mapped[ContractStatus] = mapped_column(Enum(ContractStatus), default=ContractStatus.PENDING)
+    # Set on renewal contracts: the contract being extended
+    renewal_of_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("contracts.id"), nullable=True)
+    # Renewal confirmed by the student (or approved by staff). It stays PENDING next
+    # to the original and only becomes ACTIVE once the sweeper expires the original.
+    confirmed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     student: Mapped["User"] = relationship("User", back_populates="contracts")
     bed: Mapped["Bed"] = relationship("Bed", back_populates="contracts")
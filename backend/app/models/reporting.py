@@ -0,0 +1,25 @@
+import uuid
+from datetime import date
+from typing import Optional
+from sqlalchemy import ForeignKey, Integer, Date, Enum, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base_class import Base
+from app.models.enums import GenderType
+
+class OccupancySnapshot(Base):
+    """Daily bed counts per building / room type / gender (rollup for trend reports)."""
+    __tablename__ = "occupancy_snapshots"
+    __table_args__ = (
+        UniqueConstraint("snapshot_date", "building_id", "room_type_id", "gender_type", name="uq_occupancy_snapshot_key"),
+        Index("ix_occupancy_snapshots_building_date", "building_id", "snapshot_date"),
+    )
+
+    snapshot_date: Mapped[date] = mapped_column(Date)
+    building_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("buildings.id"))
+    room_type_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("room_types.id"), nullable=True)
+    gender_type: Mapped[GenderType] = mapped_column(Enum(GenderType))
+
+    total_beds: Mapped[int] = mapped_column(Integer, default=0)
+    occupied_beds: Mapped[int] = mapped_column(Integer, default=0)
+    reserved_beds: Mapped[int] = mapped_column(Integer, default=0)
+    maintenance_beds: Mapped[int] = mapped_column(Integer, default=0)
@@ -1,8 +1,12 @@
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Boolean, Enum
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Boolean, Enum, DateTime, ForeignKey, Index, Text, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import expression
 from app.models.base_class import Base
 from app.models.enums import UserRole, GenderType
+from app.core.text import user_search_text
 
 if TYPE_CHECKING:
     from app.models.operations import Contract
@@ -25,7 +29,34 @@ class User(Base):
     avatar_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Set on imported accounts (one-time password): other endpoints are refused until changed
+    must_change_password: Mapped[bool] = mapped_column(Boolean, default=False, server_default=expression.false())
+    # Unaccented "full_name student_code email", kept in sync by the mapper events below
+    search_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     contracts: Mapped[List["Contract"]] = relationship("Contract", back_populates="student")
 
     maintenance_requests: Mapped[List["MaintenanceRequest"]] = relationship("MaintenanceRequest", back_populates="user")
-    recorded_utilities: Mapped[List["UtilityReading"]] = relationship("UtilityReading", back_populates="recorder")
\ No newline at end of file
+    recorded_utilities: Mapped[List["UtilityReading"]] = relationship("UtilityReading", back_populates="recorder")
+
+    __table_args__ = (
+        # Trigram index: serves LIKE '%term%' on the normalized text (pg_trgm)
+        Index(
+            "ix_users_search_text_trgm", "search_text",
+            postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}
+        ),
+    )
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _set_search_text(mapper, connection, target: User) -> None:
+    # Core bulk inserts bypass this hook and must set search_text themselves
+    target.search_text = user_search_text(target.email, target.full_name, target.student_code)
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
+    # SHA-256 of the opaque token; the raw value is only ever sent to the client
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -33,3 +33,14 @@ class AnnouncementInDBBase(AnnouncementBase):
 
 class Announcement(AnnouncementInDBBase):
     author_name: Optional[str] = None
+
+class AnnouncementInboxItem(Announcement):
+    read_at: Optional[datetime] = None
+
+class UnreadCount(BaseModel):
+    unread: int
+
+class AnnouncementReceipts(BaseModel):
+    announcement_id: UUID
+    recipients: int
+    read: int
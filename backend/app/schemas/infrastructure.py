@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from app.models.enums import RoomStatus, GenderType, BedStatus
 
 class RoomTypeBase(BaseModel):
@@ -100,3 +100,22 @@ class RoomResponse(RoomBase):
     building: Optional[BuildingResponse] = None
     model_config = ConfigDict(from_attributes=True)
 
+
+
+# --- BULK PROVISIONING SCHEMAS ---
+class FloorPlanProvision(BaseModel):
+    building_id: UUID
+    room_type_id: UUID
+    floors: int = Field(gt=0, le=100)
+    rooms_per_floor: int = Field(gt=0, le=500)
+    start_floor: int = 1
+    gender_type: GenderType = GenderType.MALE
+    base_price: Optional[float] = None  # Mặc định lấy giá của loại phòng
+    code_prefix: Optional[str] = None   # Mặc định lấy mã tòa nhà (VD: MH -> MH101)
+
+class ProvisionResult(BaseModel):
+    building_id: UUID
+    rooms_created: int
+    beds_created: int
+    elapsed_ms: float
+    room_codes: List[str] = []
@@ -1,7 +1,8 @@
-from typing import Optional
+from collections import Counter
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from app.models.operations import ContractStatus
 from app.schemas.user import UserResponse
 from app.models.enums import GenderType
@@ -20,9 +21,76 @@ class AdminContractCreate(ContractCreate):
     student_gender: Optional[GenderType] = None
     student_phone: Optional[str] = None
 
+class ContractQuoteRequest(BaseModel):
+    bed_ids: List[UUID] = Field(min_length=1, max_length=200)
+    end_dates: List[datetime] = Field(min_length=1, max_length=24)
+    # Defaults to now, like booking
+    start_date: Optional[datetime] = None
+
+class QuoteOption(BaseModel):
+    end_date: datetime
+    months: int
+    total_rent: float
+    grand_total: float
+
+class BedQuote(BaseModel):
+    bed_id: UUID
+    room_id: UUID
+    room_code: str
+    price_per_month: float
+    deposit: float
+    options: List[QuoteOption]
+
+class ContractQuoteResponse(BaseModel):
+    start_date: datetime
+    quotes: List[BedQuote]
+    missing_bed_ids: List[UUID]
+
 class ContractUpdateStatus(BaseModel):
     status: ContractStatus
 
+class BulkContractStatusUpdate(BaseModel):
+    status: ContractStatus
+    # Either explicit ids, or a filter over PENDING contracts (oldest first)
+    contract_ids: Optional[List[UUID]] = None
+    campus_id: Optional[UUID] = None
+    building_id: Optional[UUID] = None
+    created_before: Optional[datetime] = None
+    limit: int = Field(default=500, ge=1, le=5000)
+    chunk_size: int = Field(default=200, ge=1, le=1000)
+
+class BulkContractItem(BaseModel):
+    contract_id: UUID
+    success: bool
+    invoice_id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+class BulkContractStatusResult(BaseModel):
+    status: ContractStatus
+    processed: int
+    succeeded: int
+    failed: int
+    chunks: int
+    elapsed_ms: float
+    results: List[BulkContractItem]
+
+class RenewalGenerate(BaseModel):
+    # Contracts ending within this many days are renewed
+    window_days: int = Field(default=15, ge=1, le=120)
+    # New term: a fixed end date (e.g. end of semester) or N months after the current end
+    end_date: Optional[datetime] = None
+    term_months: int = Field(default=5, ge=1, le=12)
+    building_id: Optional[UUID] = None
+    dry_run: bool = False
+
+class RenewalResult(BaseModel):
+    dry_run: bool
+    candidates: int
+    created: int
+    skipped: int
+    invoices_created: int
+    elapsed_ms: float
+
 class ContractResponse(ContractBase):
     id: UUID
     student_id: UUID
@@ -31,6 +99,8 @@ class ContractResponse(ContractBase):
     status: ContractStatus
     start_date: datetime
     created_at: datetime
+    renewal_of_id: Optional[UUID] = None
+    confirmed_at: Optional[datetime] = None
     student: Optional["UserResponse"] = None
     bed: Optional["BedResponse"] = None
     room: Optional["RoomResponse"] = None
@@ -52,4 +122,77 @@ class LiquidationResponse(BaseModel):
     damage_fee: float
     notes: Optional[str] = None
     confirmed_by: UUID
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class LiquidationBatchCreate(BaseModel):
+    items: List[LiquidationCreate] = Field(min_length=1, max_length=5000)
+    chunk_size: int = Field(default=200, ge=1, le=1000)
+
+class LiquidationBatchItem(BaseModel):
+    contract_id: UUID
+    success: bool
+    liquidation_id: Optional[UUID] = None
+    refund_deposit_amount: float
+    penalty_amount: float
+    damage_fee: float
+    total_refund_to_student: float
+    detail: Optional[str] = None
+
+class LiquidationBatchResult(BaseModel):
+    processed: int
+    succeeded: int
+    failed: int
+    chunks: int
+    total_deposit: float
+    total_penalty: float
+    total_damage_fee: float
+    total_refund: float
+    total_owed: float
+    cancelled_invoices: int
+    elapsed_ms: float
+    results: List[LiquidationBatchItem]
+
+# --- BATCH ALLOCATION ---
+class AllocationStudent(BaseModel):
+    student_id: UUID
+    max_budget: Optional[float] = None
+    preferred_building_id: Optional[UUID] = None
+    roommate_ids: List[UUID] = []
+
+class AllocationRequest(BaseModel):
+    students: List[AllocationStudent]
+    end_date: datetime
+    building_ids: Optional[List[UUID]] = None
+    dry_run: bool = False
+
+    @field_validator("students")
+    @classmethod
+    def reject_duplicate_students(cls, v):
+        # A student listed twice would get two beds and two contracts
+        counts = Counter(s.student_id for s in v)
+        duplicates = sorted(str(student_id) for student_id, n in counts.items() if n > 1)
+        if duplicates:
+            raise ValueError(f"Sinh viên bị trùng trong danh sách: {', '.join(duplicates)}")
+        return v
+
+class AllocationAssignment(BaseModel):
+    student_id: UUID
+    bed_id: UUID
+    room_id: UUID
+    building_id: UUID
+    price: float
+
+class AllocationResult(BaseModel):
+    dry_run: bool
+    contracts_created: int
+    assignments: List[AllocationAssignment] = []
+    unassigned: List[UUID] = []
+    skipped: List[UUID] = []
+    metrics: Dict[str, float] = {}
+
+class QueueTicket(BaseModel):
+    token: str
+    admitted: bool
+    position: int
+    eta_seconds: float
+    expires_in: float
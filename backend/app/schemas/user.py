@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
 from app.models.users import UserRole, GenderType
 
 # 1. Base Schema (Chứa các trường chung)
@@ -25,6 +25,7 @@ class UserResponse(UserBase):
     avatar_url: Optional[str] = None
     phone_number: Optional[str] = None
     gender: Optional[GenderType] = None
+    must_change_password: bool = False
     model_config = ConfigDict(from_attributes=True)
 
 # 4. Update Schema (Dùng khi cập nhật)
@@ -39,4 +40,51 @@ class UserUpdate(BaseModel):
 
 class UserPasswordUpdate(BaseModel):
     current_password: str
-    new_password: str
\ No newline at end of file
+    new_password: str
+
+# 5. Import hàng loạt từ CSV (tài khoản sinh viên)
+class UserImportRow(BaseModel):
+    email: EmailStr
+    student_code: str
+    full_name: Optional[str] = None
+    phone_number: Optional[str] = None
+    gender: Optional[GenderType] = None
+    # Mật khẩu ban đầu; bỏ trống thì sinh mật khẩu dùng một lần
+    password: Optional[str] = None
+
+    @field_validator("email", mode="before")
+    @classmethod
+    def normalize_email(cls, v):
+        return v.strip().lower() if isinstance(v, str) else v
+
+    @field_validator("gender", mode="before")
+    @classmethod
+    def parse_gender(cls, v):
+        # Accept both the stored value ("NAM") and the enum name ("MALE")
+        if isinstance(v, str) and v.strip().upper() in GenderType.__members__:
+            return GenderType[v.strip().upper()]
+        return v
+
+class UserImportIssue(BaseModel):
+    row: int
+    email: Optional[str] = None
+    student_code: Optional[str] = None
+    reason: str
+
+class UserImportCredential(BaseModel):
+    email: str
+    student_code: str
+    # Shown once; the student must change it at first login
+    temporary_password: str
+
+class UserImportResult(BaseModel):
+    dry_run: bool
+    total_rows: int
+    created: int
+    invalid: int
+    conflicts: int
+    issues: List[UserImportIssue]
+    credentials: List[UserImportCredential] = []
+    hash_ms: float
+    elapsed_ms: float
+    accounts_per_second: float
@@ -1,21 +1,19 @@
+import asyncio
+from typing import AsyncIterator, Optional
 from google import genai
 from google.genai import types
 import os
 from dotenv import load_dotenv
+from app.core.config import settings
 from app.core.knowledge_base import SYSTEM_RULES
 
 load_dotenv()
 
 class AIService:
     def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        self.client = None
-        
-        if not self.api_key:
-            print("WARNING: GEMINI_API_KEY not found in environment variables.")
-        else:
-            # Initialize the new GenAI Client
-            self.client = genai.Client(api_key=self.api_key)
+        self.configure(os.getenv("GEMINI_API_KEY"), settings.GEMINI_BASE_URL)
+        # Caps model calls in flight; extra chats wait here (within their timeout)
+        self._slots = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
             
         # STRICTLY use Gemini 2.5 Flash as requested for speed and capabilities
         # The new SDK might require model names like 'gemini-2.0-flash-exp' or similar. 
@@ -34,13 +32,18 @@ class AIService:
         - TUYỆT ĐỐI không bịa đặt thông tin. Nếu không biết, hãy xin lỗi và hướng dẫn liên hệ Admin.
         """
 
-    async def generate_response(self, message: str, user_context: str = "") -> str:
-        if not self.client:
-             return "Lỗi hệ thống: Chưa cấu hình khóa API."
-             
-        try:
-            # Construct dynamic system prompt
-            full_system_prompt = f"""
+    def configure(self, api_key: Optional[str], base_url: Optional[str] = None) -> None:
+        self.api_key = api_key
+        if not self.api_key:
+            print("WARNING: GEMINI_API_KEY not found in environment variables.")
+            self.client = None
+            return
+        # Initialize the new GenAI Client
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=self.api_key, http_options=http_options)
+
+    def _system_prompt(self, user_context: str) -> str:
+        return f"""
             {self.base_instruction}
 
             ---
@@ -53,21 +56,79 @@ class AIService:
             
             HÃY TRẢ LỜI DỰA TRÊN THÔNG TIN TRÊN.
             """
-            
-            # Use the new SDK's generate_content method
-            response = self.client.models.generate_content(
+
+    def _config(self, user_context: str) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(system_instruction=self._system_prompt(user_context))
+
+    def _error_message(self, e: Exception) -> str:
+        if isinstance(e, asyncio.TimeoutError):
+            print(f"AI response with {self.model_name} timed out after {settings.AI_TIMEOUT_SECONDS}s")
+            return "Tinmyn đang phản hồi chậm do có nhiều người dùng. Vui lòng thử lại sau ít phút."
+        print(f"Error generating AI response with {self.model_name}: {e}")
+        if "429" in str(e) or "quota" in str(e).lower():
+            return "Hệ thống đang quá tải (Quota Exceeded). Vui lòng thử lại sau ít phút."
+        return "Xin lỗi, Tinmyn đang gặp trục trặc kỹ thuật. Vui lòng thử lại sau."
+
+    async def _generate(self, message: str, user_context: str) -> str:
+        async with self._slots:
+            # Async client: the event loop keeps serving other requests meanwhile
+            response = await self.client.aio.models.generate_content(
                 model=self.model_name,
                 contents=message,
-                config=types.GenerateContentConfig(
-                    system_instruction=full_system_prompt
-                )
+                config=self._config(user_context)
             )
             return response.text
-            
+
+    async def generate_response(self, message: str, user_context: str = "") -> str:
+        if not self.client:
+             return "Lỗi hệ thống: Chưa cấu hình khóa API."
+             
+        try:
+            return await asyncio.wait_for(self._generate(message, user_context), timeout=settings.AI_TIMEOUT_SECONDS)
+        except Exception as e:
+            return self._error_message(e)
+
+    async def stream_response(self, message: str, user_context: str = "") -> AsyncIterator[str]:
+        """
+        Yield the answer as the model produces it. Same slot limit and deadline as
+        generate_response; closing this generator (client gone) closes the
+        upstream stream so an abandoned answer stops consuming quota.
+        """
+        if not self.client:
+            yield "Lỗi hệ thống: Chưa cấu hình khóa API."
+            return
+
+        deadline = asyncio.get_running_loop().time() + settings.AI_TIMEOUT_SECONDS
+        sent = False
+        try:
+            async with asyncio.timeout_at(deadline):
+                await self._slots.acquire()
+            stream = None
+            try:
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=message,
+                    config=self._config(user_context)
+                )
+                while True:
+                    # timeout_at rather than wait_for: the SDK stream must be
+                    # iterated from this task, not from a wrapper task
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            chunk = await anext(stream)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        sent = True
+                        yield chunk.text
+            finally:
+                if stream is not None:
+                    await stream.aclose()
+                self._slots.release()
         except Exception as e:
-            print(f"Error generating AI response with {self.model_name}: {e}")
-            if "429" in str(e) or "quota" in str(e).lower():
-                return "Hệ thống đang quá tải (Quota Exceeded). Vui lòng thử lại sau ít phút."
-            return "Xin lỗi, Tinmyn đang gặp trục trặc kỹ thuật. Vui lòng thử lại sau."
+            fallback = self._error_message(e)
+            # Mid-answer failure: keep the partial text rather than appending an apology
+            if not sent:
+                yield fallback
 
 ai_service = AIService()
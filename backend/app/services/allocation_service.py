@@ -0,0 +1,374 @@
+import heapq
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select, insert, update, exists, and_
+from sqlalchemy.orm import Session
+
+from app.models.enums import GenderType, RoomStatus, BedStatus, ContractStatus
+from app.models.infrastructure import Bed, Room
+from app.models.operations import Contract
+from app.models.users import User, UserRole
+from app.schemas.operations import AllocationRequest
+from app.services.communication_service import communication_service
+from app.services.location_service import location_service
+
+
+@dataclass
+class StudentDemand:
+    student_id: UUID
+    gender: Optional[GenderType]
+    max_budget: Optional[float] = None
+    preferred_building_id: Optional[UUID] = None
+    roommate_ids: List[UUID] = field(default_factory=list)
+
+
+@dataclass
+class FreeBed:
+    bed_id: UUID
+    room_id: UUID
+    building_id: UUID
+    gender_type: GenderType
+    price: float
+
+
+@dataclass
+class _RoomSlot:
+    room_id: UUID
+    building_id: UUID
+    gender_type: GenderType
+    price: float
+    beds: List[UUID]
+
+
+@dataclass
+class AllocationPlan:
+    assignments: Dict[UUID, FreeBed]
+    unassigned: List[UUID]
+    metrics: Dict[str, float]
+
+
+class _Inventory:
+    """
+    Free beds grouped by room. Per (gender, building, free-bed count) bucket keeps a
+    min-heap on price with lazy deletion, so "cheapest room with at least k free beds
+    under budget" is a handful of heap peeks instead of a scan over all rooms.
+    """
+
+    def __init__(self, beds: List[FreeBed]):
+        self.rooms: Dict[UUID, _RoomSlot] = {}
+        for b in beds:
+            slot = self.rooms.get(b.room_id)
+            if slot is None:
+                slot = _RoomSlot(b.room_id, b.building_id, b.gender_type, b.price, [])
+                self.rooms[b.room_id] = slot
+            slot.beds.append(b.bed_id)
+
+        self.free = len(beds)
+        self.buildings = sorted({s.building_id for s in self.rooms.values()}, key=str)
+        self.max_free = max((len(s.beds) for s in self.rooms.values()), default=0)
+        self.heaps: Dict[Tuple[GenderType, UUID, int], list] = defaultdict(list)
+        for slot in self.rooms.values():
+            self._push(slot)
+
+    def _push(self, slot: _RoomSlot) -> None:
+        free = len(slot.beds)
+        if free:
+            heapq.heappush(self.heaps[(slot.gender_type, slot.building_id, free)], (slot.price, str(slot.room_id), slot.room_id))
+
+    def _peek(self, key: Tuple[GenderType, UUID, int]) -> Optional[_RoomSlot]:
+        heap = self.heaps.get(key)
+        while heap:
+            _, _, room_id = heap[0]
+            slot = self.rooms[room_id]
+            if len(slot.beds) == key[2]:
+                return slot
+            heapq.heappop(heap)  # stale entry, room moved to another bucket
+        return None
+
+    def find_room(self, genders: Tuple[GenderType, ...], buildings: List[UUID], size: int, budget: float) -> Optional[_RoomSlot]:
+        # Best fit: the fewest free beds that still hold the whole group, then the cheapest
+        for free in range(size, self.max_free + 1):
+            best = None
+            for building_id in buildings:
+                for gender in genders:
+                    slot = self._peek((gender, building_id, free))
+                    if slot and slot.price <= budget and (best is None or slot.price < best.price):
+                        best = slot
+            if best:
+                return best
+        return None
+
+    def take(self, slot: _RoomSlot, count: int) -> List[UUID]:
+        taken, slot.beds = slot.beds[:count], slot.beds[count:]
+        self.free -= len(taken)
+        self._push(slot)
+        return taken
+
+
+def _group_roommates(students: List[StudentDemand]) -> List[List[StudentDemand]]:
+    parent = {s.student_id: s.student_id for s in students}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for s in students:
+        for mate in s.roommate_ids:
+            if mate in parent:
+                parent[find(s.student_id)] = find(mate)
+
+    groups: Dict[UUID, List[StudentDemand]] = defaultdict(list)
+    for s in students:
+        groups[find(s.student_id)].append(s)
+    return list(groups.values())
+
+
+def _allowed_genders(members: List[StudentDemand]) -> Tuple[GenderType, ...]:
+    genders = {m.gender for m in members}
+    # Phòng Nam/Nữ chỉ nhận sinh viên đã khai báo cùng giới tính, còn lại chỉ xếp phòng Hỗn hợp
+    if len(genders) == 1 and None not in genders:
+        return (genders.pop(), GenderType.MIXED)
+    return (GenderType.MIXED,)
+
+
+def plan_allocation(students: List[StudentDemand], beds: List[FreeBed], repair_candidates: int = 200) -> AllocationPlan:
+    """
+    Greedy-with-repair assignment of students to free beds.
+
+    1. Roommate requests are merged into groups (union-find); large, budget-tight
+       groups are placed first.
+    2. Each group goes to the best-fitting room in its preferred building, then in
+       any building; groups that fit nowhere together are split and placed one by one.
+    3. Repair: an unplaced student may take the bed of a placed single student when
+       that student can be moved to another free bed within their own constraints.
+    """
+    started = time.perf_counter()
+    inventory = _Inventory(beds)
+    by_id = {s.student_id: s for s in students}
+    assignments: Dict[UUID, FreeBed] = {}
+    unassigned: List[UUID] = []
+
+    def budget_of(members):
+        return min((m.max_budget for m in members if m.max_budget is not None), default=float("inf"))
+
+    def buildings_for(members):
+        prefs = Counter(m.preferred_building_id for m in members if m.preferred_building_id)
+        preferred = [b for b, _ in prefs.most_common() if b in inventory.buildings]
+        return preferred, [b for b in inventory.buildings if b not in preferred]
+
+    def place(members, slot):
+        for member, bed_id in zip(members, inventory.take(slot, len(members))):
+            assignments[member.student_id] = FreeBed(bed_id, slot.room_id, slot.building_id, slot.gender_type, slot.price)
+
+    def try_place(members) -> bool:
+        genders = _allowed_genders(members)
+        budget = budget_of(members)
+        preferred, others = buildings_for(members)
+        slot = None
+        if preferred:
+            slot = inventory.find_room(genders, preferred, len(members), budget)
+        if slot is None:
+            slot = inventory.find_room(genders, others, len(members), budget)
+        if slot is None:
+            return False
+        place(members, slot)
+        return True
+
+    groups = _group_roommates(students)
+    groups.sort(key=lambda g: (-len(g), budget_of(g)))
+    multi_groups = [g for g in groups if len(g) > 1]
+
+    for group in groups:
+        if len(group) > 1 and try_place(group):
+            continue
+        for member in sorted(group, key=lambda m: budget_of([m])):
+            if not try_place([member]):
+                unassigned.append(member.student_id)
+
+    # --- Repair phase ---
+    singles_by_room: Dict[UUID, List[UUID]] = defaultdict(list)
+    grouped = {m.student_id for g in multi_groups for m in g}
+    for sid, bed in assignments.items():
+        if sid not in grouped:
+            singles_by_room[bed.room_id].append(sid)
+
+    # The inventory only shrinks from here on, so a failed single-bed lookup stays failed
+    no_room: set = set()
+
+    def find_single(member):
+        key = (_allowed_genders([member]), budget_of([member]))
+        if key in no_room:
+            return None
+        slot = inventory.find_room(key[0], inventory.buildings, 1, key[1])
+        if slot is None:
+            no_room.add(key)
+        return slot
+
+    still_unassigned = []
+    for sid in unassigned:
+        if inventory.free == 0:
+            still_unassigned.append(sid)
+            continue
+        student = by_id[sid]
+        genders = _allowed_genders([student])
+        budget = budget_of([student])
+        repaired = False
+        checked = 0
+        for room_id, occupants in singles_by_room.items():
+            if checked >= repair_candidates:
+                break
+            if not occupants:
+                continue
+            sample = assignments[occupants[0]]
+            if sample.gender_type not in genders or sample.price > budget:
+                continue
+            checked += 1
+            for other_id in occupants:
+                other = by_id[other_id]
+                old = assignments[other_id]
+                slot = find_single(other)
+                if slot is None or slot.room_id == old.room_id:
+                    continue
+                place([other], slot)
+                singles_by_room[slot.room_id].append(other_id)
+                occupants.remove(other_id)
+                assignments[sid] = FreeBed(old.bed_id, old.room_id, old.building_id, old.gender_type, old.price)
+                occupants.append(sid)
+                repaired = True
+                break
+            if repaired:
+                break
+        if not repaired:
+            still_unassigned.append(sid)
+    unassigned = still_unassigned
+
+    # --- Quality metrics ---
+    with_pref = [s for s in students if s.preferred_building_id and s.student_id in assignments]
+    pref_hits = sum(1 for s in with_pref if assignments[s.student_id].building_id == s.preferred_building_id)
+    kept = sum(
+        1 for g in multi_groups
+        if all(m.student_id in assignments for m in g)
+        and len({assignments[m.student_id].room_id for m in g}) == 1
+    )
+    budgeted = [s for s in students if s.max_budget and s.student_id in assignments]
+    utilization = sum(assignments[s.student_id].price / s.max_budget for s in budgeted)
+
+    metrics = {
+        "students": len(students),
+        "free_beds": len(beds),
+        "assigned": len(assignments),
+        "unassigned": len(unassigned),
+        "assignment_rate": round(len(assignments) / len(students), 4) if students else 0.0,
+        "preferred_building_rate": round(pref_hits / len(with_pref), 4) if with_pref else 0.0,
+        "roommate_groups": len(multi_groups),
+        "roommate_groups_kept": kept,
+        "avg_budget_utilization": round(utilization / len(budgeted), 4) if budgeted else 0.0,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    return AllocationPlan(assignments=assignments, unassigned=unassigned, metrics=metrics)
+
+
+class AllocationService:
+    def load_free_beds(self, db: Session, building_ids: Optional[List[UUID]] = None) -> List[FreeBed]:
+        held = exists().where(
+            and_(Contract.bed_id == Bed.id, Contract.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE]))
+        )
+        stmt = select(Bed.id, Room.id, Room.building_id, Room.gender_type, Room.base_price)\
+            .join(Room, Bed.room_id == Room.id)\
+            .where(Bed.status == BedStatus.AVAILABLE, Room.status != RoomStatus.MAINTENANCE, ~held)
+        if building_ids:
+            stmt = stmt.where(Room.building_id.in_(building_ids))
+        return [FreeBed(*row) for row in db.execute(stmt).all()]
+
+    def allocate(self, db: Session, request: AllocationRequest) -> dict:
+        now = datetime.now(timezone.utc)
+        end_date = request.end_date
+        if end_date.tzinfo is None:
+            end_date = end_date.replace(tzinfo=timezone.utc)
+        if end_date <= now:
+            raise HTTPException(status_code=400, detail="Ngày kết thúc hợp đồng phải sau ngày hiện tại!")
+
+        ids = [s.student_id for s in request.students]
+        users = {
+            row.id: row for row in db.execute(
+                select(User.id, User.gender).where(User.id.in_(ids), User.is_active == True, User.role == UserRole.STUDENT)
+            ).all()
+        }
+        already_housed = set(db.execute(
+            select(Contract.student_id).where(
+                Contract.student_id.in_(ids),
+                Contract.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE])
+            )
+        ).scalars().all())
+
+        skipped = [sid for sid in ids if sid not in users or sid in already_housed]
+        demands = [
+            StudentDemand(
+                student_id=s.student_id,
+                gender=users[s.student_id].gender,
+                max_budget=s.max_budget,
+                preferred_building_id=s.preferred_building_id,
+                roommate_ids=s.roommate_ids,
+            )
+            for s in request.students
+            if s.student_id in users and s.student_id not in already_housed
+        ]
+
+        plan = plan_allocation(demands, self.load_free_beds(db, request.building_ids))
+        assignments = plan.assignments
+        conflicts: List[UUID] = []
+        contracts_created = 0
+
+        if not request.dry_run and assignments:
+            # Claim beds atomically; a bed booked concurrently since inventory load is not returned
+            claimed = set(db.execute(
+                update(Bed)
+                .where(Bed.id.in_([a.bed_id for a in assignments.values()]), Bed.status == BedStatus.AVAILABLE)
+                .values(status=BedStatus.RESERVED)
+                .returning(Bed.id)
+            ).scalars().all())
+            conflicts = [sid for sid, a in assignments.items() if a.bed_id not in claimed]
+            assignments = {sid: a for sid, a in assignments.items() if a.bed_id in claimed}
+
+            if assignments:
+                db.execute(insert(Contract), [
+                    {
+                        "id": uuid.uuid4(),
+                        "student_id": sid,
+                        "bed_id": a.bed_id,
+                        "start_date": now,
+                        "end_date": end_date,
+                        "price_per_month": a.price,
+                        "deposit_amount": a.price,
+                        "status": ContractStatus.PENDING,
+                    }
+                    for sid, a in assignments.items()
+                ])
+            db.commit()
+            contracts_created = len(assignments)
+            location_service.invalidate(assignments)
+            communication_service.deliver_to_users(db, list(assignments))
+
+        return {
+            "dry_run": request.dry_run,
+            "contracts_created": contracts_created,
+            "assignments": [
+                {"student_id": sid, "bed_id": a.bed_id, "room_id": a.room_id, "building_id": a.building_id, "price": a.price}
+                for sid, a in assignments.items()
+            ],
+            "unassigned": plan.unassigned + conflicts,
+            "skipped": skipped,
+            "metrics": plan.metrics,
+        }
+
+
+allocation_service = AllocationService()
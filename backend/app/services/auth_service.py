@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from app.core import security
+from app.core.config import settings
+from app.core.principal import invalidate_principal
+from app.core.revocation import revocation_filter
+from app.models.users import User, RefreshToken
+
+
+class AuthService:
+    def issue_tokens(self, db: Session, user_id: UUID) -> dict:
+        """Access token ngắn hạn + refresh token lưu phía server (chỉ lưu hash)"""
+        refresh_token, token_hash = security.create_refresh_token()
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=token_hash,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        db.commit()
+        return {
+            "access_token": security.create_access_token(
+                user_id, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+            ),
+            "token_type": "bearer",
+            "refresh_token": refresh_token,
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+
+    def refresh(self, db: Session, refresh_token: str) -> dict:
+        """
+        Rotate: the presented refresh token is revoked and a new pair is issued.
+        Presenting an already revoked token means it leaked; every session of that
+        user is revoked.
+        """
+        invalid = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Phiên đăng nhập đã hết hạn, vui lòng đăng nhập lại",
+        )
+        stored = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == security.hash_refresh_token(refresh_token)
+        ).with_for_update().first()
+        if stored is None:
+            raise invalid
+        if stored.revoked_at is not None:
+            self.revoke_all(db, stored.user_id)
+            raise invalid
+        if stored.expires_at <= datetime.now(timezone.utc):
+            raise invalid
+
+        user = db.query(User).filter(User.id == stored.user_id).first()
+        if user is None or not user.is_active:
+            raise invalid
+
+        stored.revoked_at = datetime.now(timezone.utc)
+        db.add(stored)
+        return self.issue_tokens(db, user.id)
+
+    def logout(self, db: Session, payload: dict, refresh_token: Optional[str] = None, all_sessions: bool = False) -> None:
+        user_id = UUID(payload["sub"])
+        if payload.get("jti") and payload.get("exp"):
+            revocation_filter.revoke_token(payload["jti"], float(payload["exp"]))
+        if all_sessions:
+            self.revoke_all(db, user_id)
+            return
+        if refresh_token:
+            db.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.token_hash == security.hash_refresh_token(refresh_token),
+                    RefreshToken.user_id == user_id,
+                    RefreshToken.revoked_at.is_(None),
+                )
+                .values(revoked_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+
+    def prune_refresh_tokens(self, db: Session) -> int:
+        """
+        Delete expired refresh tokens. Revoked ones are kept until they expire so a
+        replayed token is still recognised (revoke_all on reuse).
+        """
+        result = db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= datetime.now(timezone.utc)))
+        db.commit()
+        return result.rowcount
+
+    def revoke_all(self, db: Session, user_id: UUID) -> None:
+        """Đăng xuất mọi phiên: đổi mật khẩu, khóa tài khoản, phát hiện token bị lộ"""
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+        )
+        db.commit()
+        revocation_filter.revoke_user(user_id)
+        invalidate_principal(user_id)
+
+
+auth_service = AuthService()
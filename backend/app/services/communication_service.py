@@ -1,10 +1,14 @@
 from datetime import datetime
+from sqlalchemy import String, and_, case, cast, delete, func, literal, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import List, Optional, Union
-from app.models.communication import Announcement
+from typing import List, Optional, Tuple, Union
+from app.models.communication import Announcement, AnnouncementRecipient
+from app.core.events import event_broker
 from app.models.enums import AnnouncementStatus, AnnouncementScope, UserRole
 from app.schemas.communication import AnnouncementCreate, AnnouncementUpdate
+from app.services.location_service import location_service
 from app.models.users import User
 
 class CommunicationService:
@@ -19,6 +23,8 @@ class CommunicationService:
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.publish_to_inbox(db, db_obj)
+        self._push(db_obj)
         return db_obj
 
     def get_announcements(self, db: Session, current_user: User, skip: int = 0, limit: int = 100) -> List[Announcement]:
@@ -30,64 +36,163 @@ class CommunicationService:
                 .limit(limit)\
                 .all()
 
+        # Students read their precomputed inbox
+        return [announcement for announcement, _ in self.get_inbox(db, current_user.id, skip=skip, limit=limit)]
+
+    # --- Inbox (fan-out on publish) ---
+
+    def _fan_out(self, db: Session, *conditions) -> int:
+        """
+        INSERT ... SELECT the (announcement, user) pairs matching the targeting
+        rules into the inbox, for the announcements / users selected by `conditions`.
+        All audience segments (global, role, building, campus) go in one statement;
+        existing rows (and their read state) are kept.
+        """
         now = datetime.utcnow()
-        
-        # 1. Base Filter: Published & Time Window
-        query = db.query(Announcement).filter(
-            Announcement.status == AnnouncementStatus.PUBLISHED,
+        # Building / campus of every live contract
+        location = location_service.live_contracts().subquery()
+        # target_criteria holds the API values of roles ("SINH_VIEN"), the column stores names
+        role_value = case(*[(User.role == role, literal(role.value, String)) for role in UserRole])
+
+        audience = or_(
+            and_(Announcement.scope == AnnouncementScope.GLOBAL, User.role == UserRole.STUDENT),
+            and_(
+                Announcement.scope == AnnouncementScope.ROLE,
+                Announcement.target_criteria.contains(func.jsonb_build_array(role_value))
+            ),
+            and_(
+                Announcement.scope == AnnouncementScope.BUILDING,
+                Announcement.target_criteria.contains(func.jsonb_build_array(cast(location.c.building_id, String)))
+            ),
+            and_(
+                Announcement.scope == AnnouncementScope.CAMPUS,
+                Announcement.target_criteria.contains(func.jsonb_build_array(cast(location.c.campus_id, String)))
+            ),
         )
-        
-        # 2. Fetch candidates
-        candidates = query.order_by(Announcement.priority.desc(), Announcement.created_at.desc()).all()
-        
-        # 3. Targeting Logic (Python Side)
-        user_building_id = None
-        user_campus_id = None
-        
-        from app.models.operations import Contract, ContractStatus
-        from app.models.infrastructure import Bed, Room, Building as DbBuilding
-        
-        active_contract = db.query(Contract).join(Bed).join(Room).join(DbBuilding)\
-            .filter(Contract.student_id == current_user.id, Contract.status.in_([ContractStatus.ACTIVE, ContractStatus.PENDING]))\
-            .order_by(Contract.created_at.desc())\
-            .first()
-            
-        if active_contract:
-            location_info = db.query(Room.building_id, DbBuilding.campus_id)\
-                .select_from(Contract)\
-                .join(Bed).join(Room).join(DbBuilding)\
-                .filter(Contract.id == active_contract.id)\
-                .first()
-                
-            if location_info:
-                user_building_id = str(location_info.building_id)
-                user_campus_id = str(location_info.campus_id)
-
-        visible_announcements = []
-        for ann in candidates:
-            if ann.scope == AnnouncementScope.GLOBAL:
-                visible_announcements.append(ann)
-                continue
-                
-            if not ann.target_criteria:
-                continue
-                
-            criteria = ann.target_criteria
-            
-            if ann.scope == AnnouncementScope.BUILDING:
-                if user_building_id and user_building_id in criteria:
-                    visible_announcements.append(ann)
-            
-            elif ann.scope == AnnouncementScope.ROLE:
-                 if current_user.role and current_user.role.value in criteria:
-                     visible_announcements.append(ann)
+        pairs = select(
+            func.gen_random_uuid(),
+            Announcement.id,
+            User.id,
+            Announcement.priority,
+            func.coalesce(Announcement.published_at, Announcement.created_at),
+        ).select_from(Announcement)\
+            .join(User, true())\
+            .outerjoin(location, location.c.student_id == User.id)\
+            .where(
+                Announcement.status == AnnouncementStatus.PUBLISHED,
+                or_(Announcement.expires_at.is_(None), Announcement.expires_at > now),
+                User.is_active.is_(True),
+                audience,
+                *conditions,
+            )
+
+        result = db.execute(
+            pg_insert(AnnouncementRecipient).from_select(
+                ["id", "announcement_id", "user_id", "priority", "published_at"], pairs
+            ).on_conflict_do_nothing(index_elements=["user_id", "announcement_id"])
+        )
+        return result.rowcount
+
+    def publish_to_inbox(self, db: Session, announcement: Announcement) -> int:
+        """(Re)build the inbox rows of one announcement after create / update"""
+        if announcement.status != AnnouncementStatus.PUBLISHED:
+            # Hidden by the status filter of the inbox query; read receipts are kept
+            return 0
+        # Retargeted: drop unread rows, the fan-out below re-adds the current audience
+        db.execute(delete(AnnouncementRecipient).where(
+            AnnouncementRecipient.announcement_id == announcement.id,
+            AnnouncementRecipient.read_at.is_(None),
+        ))
+        db.execute(update(AnnouncementRecipient).where(
+            AnnouncementRecipient.announcement_id == announcement.id
+        ).values(
+            priority=announcement.priority,
+            published_at=announcement.published_at or announcement.created_at,
+        ))
+        delivered = self._fan_out(db, Announcement.id == announcement.id)
+        db.commit()
+        return delivered
+
+    def deliver_to_users(self, db: Session, user_ids: List[UUID]) -> int:
+        """
+        Catch up the inbox of users whose audience changed (new account, booking,
+        transfer) with the announcements already published for them.
+        """
+        if not user_ids:
+            return 0
+        delivered = self._fan_out(db, User.id.in_(user_ids))
+        db.commit()
+        return delivered
+
+    def _push(self, announcement: Announcement) -> None:
+        """Notify connected clients of the audience (scheduled ones only appear in the inbox)"""
+        if announcement.status != AnnouncementStatus.PUBLISHED or \
+                (announcement.published_at and announcement.published_at > datetime.utcnow()):
+            return
+        criteria = announcement.target_criteria or []
+        if announcement.scope == AnnouncementScope.GLOBAL:
+            topics = [f"role:{UserRole.STUDENT.value}"]
+        elif announcement.scope == AnnouncementScope.ROLE:
+            topics = [f"role:{value}" for value in criteria]
+        elif announcement.scope == AnnouncementScope.BUILDING:
+            topics = [f"building:{value}" for value in criteria]
+        else:
+            topics = [f"campus:{value}" for value in criteria]
+        event_broker.publish(topics, "announcement.published", {
+            "id": str(announcement.id),
+            "title": announcement.title,
+            "priority": announcement.priority.value,
+        })
+
+    def get_inbox(
+        self, db: Session, user_id: UUID, skip: int = 0, limit: int = 100, unread_only: bool = False
+    ) -> List[Tuple[Announcement, Optional[datetime]]]:
+        now = datetime.utcnow()
+        query = db.query(Announcement, AnnouncementRecipient.read_at)\
+            .join(AnnouncementRecipient, AnnouncementRecipient.announcement_id == Announcement.id)\
+            .filter(
+                AnnouncementRecipient.user_id == user_id,
+                AnnouncementRecipient.published_at <= now,
+                Announcement.status == AnnouncementStatus.PUBLISHED,
+                or_(Announcement.expires_at.is_(None), Announcement.expires_at > now),
+            )
+        if unread_only:
+            query = query.filter(AnnouncementRecipient.read_at.is_(None))
+        return query.order_by(AnnouncementRecipient.priority.desc(), AnnouncementRecipient.published_at.desc())\
+            .offset(skip)\
+            .limit(limit)\
+            .all()
+
+    def unread_count(self, db: Session, user_id: UUID) -> int:
+        now = datetime.utcnow()
+        return db.query(func.count(AnnouncementRecipient.id))\
+            .join(Announcement, AnnouncementRecipient.announcement_id == Announcement.id)\
+            .filter(
+                AnnouncementRecipient.user_id == user_id,
+                AnnouncementRecipient.read_at.is_(None),
+                AnnouncementRecipient.published_at <= now,
+                Announcement.status == AnnouncementStatus.PUBLISHED,
+                or_(Announcement.expires_at.is_(None), Announcement.expires_at > now),
+            ).scalar()
+
+    def mark_read(self, db: Session, user_id: UUID, announcement_id: Optional[UUID] = None) -> int:
+        """Mark one announcement (or the whole inbox) as read; returns rows changed"""
+        stmt = update(AnnouncementRecipient).where(
+            AnnouncementRecipient.user_id == user_id,
+            AnnouncementRecipient.read_at.is_(None),
+        ).values(read_at=datetime.utcnow())
+        if announcement_id:
+            stmt = stmt.where(AnnouncementRecipient.announcement_id == announcement_id)
+        result = db.execute(stmt)
+        db.commit()
+        return result.rowcount
 
-            elif ann.scope == AnnouncementScope.CAMPUS:
-                 if user_campus_id and user_campus_id in criteria:
-                     visible_announcements.append(ann)
-                     
-        # 4. Pagination
-        return visible_announcements[skip : skip + limit]
+    def get_receipts(self, db: Session, announcement_id: UUID) -> dict:
+        recipients, read = db.query(
+            func.count(AnnouncementRecipient.id),
+            func.count(AnnouncementRecipient.read_at),
+        ).filter(AnnouncementRecipient.announcement_id == announcement_id).one()
+        return {"announcement_id": announcement_id, "recipients": recipients, "read": read}
 
     def get_announcement(self, db: Session, announcement_id: UUID) -> Optional[Announcement]:
         return db.query(Announcement).filter(Announcement.id == announcement_id).first()
@@ -95,6 +200,7 @@ class CommunicationService:
     def update_announcement(
         self, db: Session, *, db_obj: Announcement, obj_in: Union[AnnouncementUpdate, AnnouncementCreate]
     ) -> Announcement:
+        was_published = db_obj.status == AnnouncementStatus.PUBLISHED
         obj_data = db_obj.to_dict() if hasattr(db_obj, "to_dict") else db_obj.__dict__
         update_data = obj_in.model_dump(exclude_unset=True)
         
@@ -109,10 +215,14 @@ class CommunicationService:
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.publish_to_inbox(db, db_obj)
+        if not was_published:
+            self._push(db_obj)
         return db_obj
 
     def delete_announcement(self, db: Session, *, id: UUID) -> Announcement:
         obj = db.query(Announcement).get(id)
+        db.execute(delete(AnnouncementRecipient).where(AnnouncementRecipient.announcement_id == id))
         db.delete(obj)
         db.commit()
         return obj
@@ -1,14 +1,29 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, insert, update, func, tuple_, literal, and_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, contains_eager
 from fastapi import HTTPException
 from uuid import UUID
 from app.models.operations import Contract, ContractStatus
-from app.models.infrastructure import Bed, Room, BedStatus
+from app.models.infrastructure import Bed, Room, Building, BedStatus
 from app.models.users import User, UserRole
 from app.models.enums import GenderType
 from app.models.finance import Invoice, InvoiceStatus
-from app.schemas.operations import ContractCreate, ContractUpdateStatus
+from app.core.config import settings
+from app.core.cache import TTLCache
+from app.schemas.operations import ContractCreate, ContractUpdateStatus, BulkContractStatusUpdate, ContractQuoteRequest
+from app.services.room_service import bed_price_cache
+from app.services.communication_service import communication_service
+from app.services.finance_service import finance_service
+from app.services.location_service import location_service
 from datetime import datetime, timezone, timedelta
+from typing import List, Optional, Tuple
+from uuid import uuid4
+import base64
 import math
+import time
+
+contract_count_cache = TTLCache("contract_list_count", ttl=30, maxsize=256)
 
 class ContractService:
     def calculate_months(self, start_date: datetime, end_date: datetime) -> int:
@@ -46,14 +61,6 @@ class ContractService:
         if bed.status != BedStatus.AVAILABLE:
             raise HTTPException(status_code=400, detail="Giường này không khả dụng (Đã có người hoặc đang bảo trì)")
 
-        existing_contract = db.query(Contract).filter(
-            Contract.bed_id == contract_in.bed_id,
-            Contract.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE])
-        ).first()
-
-        if existing_contract:
-            raise HTTPException(status_code=400, detail="Giường này đang được giữ chỗ (Chờ duyệt)")
-
         # --- 2.1 Kiểm tra User và Giới tính ---
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
@@ -84,7 +91,14 @@ class ContractService:
         deposit = room.base_price 
         grand_total = total_rent + deposit
 
-        # --- 4. Tạo hợp đồng ---
+        # --- 4. Giữ chỗ giường (atomic) ---
+        # Conditional UPDATE: under concurrent requests only one transaction can move
+        # the bed from AVAILABLE to RESERVED; the others match zero rows.
+        if not self.claim_bed(db, contract_in.bed_id):
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Giường này đang được giữ chỗ (Chờ duyệt)")
+
+        # --- 5. Tạo hợp đồng ---
         contract = Contract(
             student_id=user_id,
             bed_id=contract_in.bed_id,
@@ -95,11 +109,101 @@ class ContractService:
             status=ContractStatus.PENDING
         )
         db.add(contract)
-        db.flush()
+        try:
+            # uq_contracts_active_bed is the last line of defence against double booking
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Giường này đang được giữ chỗ (Chờ duyệt)")
         db.commit()
         db.refresh(contract)
+        location_service.invalidate([user_id])
+        # New building / campus: deliver the announcements already published there
+        communication_service.deliver_to_users(db, [user_id])
         return contract
 
+    def quote(self, db: Session, quote_in: ContractQuoteRequest) -> dict:
+        """
+        Price every bed x end date combination with the same rules as book_bed.
+        Read-only; room prices come from a short-lived cache keyed by bed.
+        """
+        start_date = quote_in.start_date or datetime.now(timezone.utc)
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=timezone.utc)
+
+        end_dates = []
+        for end_date in dict.fromkeys(quote_in.end_dates):
+            end_date = end_date.replace(tzinfo=timezone.utc) if end_date.tzinfo is None else end_date.astimezone(timezone.utc)
+            if end_date <= start_date:
+                raise HTTPException(status_code=400, detail="Ngày kết thúc hợp đồng phải sau ngày hiện tại!")
+            # --- Logic tính tháng giống book_bed ---
+            end_dates.append((end_date, max(self.calculate_months(start_date, end_date), 1)))
+
+        bed_ids = list(dict.fromkeys(quote_in.bed_ids))
+        prices = {}
+        misses = []
+        for bed_id in bed_ids:
+            cached = bed_price_cache.get(bed_id)
+            if cached is None:
+                misses.append(bed_id)
+            else:
+                prices[bed_id] = cached
+        if misses:
+            rows = db.execute(
+                select(Bed.id, Room.id, Room.code, Room.base_price)
+                .join(Room, Bed.room_id == Room.id)
+                .where(Bed.id.in_(misses))
+            ).all()
+            for bed_id, room_id, room_code, base_price in rows:
+                prices[bed_id] = (room_id, room_code, base_price)
+                bed_price_cache.set(bed_id, prices[bed_id])
+
+        quotes = []
+        for bed_id in bed_ids:
+            if bed_id not in prices:
+                continue
+            room_id, room_code, base_price = prices[bed_id]
+            deposit = base_price
+            quotes.append({
+                "bed_id": bed_id,
+                "room_id": room_id,
+                "room_code": room_code,
+                "price_per_month": base_price,
+                "deposit": deposit,
+                "options": [
+                    {
+                        "end_date": end_date,
+                        "months": months,
+                        "total_rent": months * base_price,
+                        "grand_total": months * base_price + deposit,
+                    }
+                    for end_date, months in end_dates
+                ],
+            })
+
+        return {
+            "start_date": start_date,
+            "quotes": quotes,
+            "missing_bed_ids": [bed_id for bed_id in bed_ids if bed_id not in prices],
+        }
+
+    def claim_bed(self, db: Session, bed_id: UUID) -> bool:
+        claimed = db.execute(
+            update(Bed)
+            .where(Bed.id == bed_id, Bed.status == BedStatus.AVAILABLE)
+            .values(status=BedStatus.RESERVED)
+            .returning(Bed.id)
+        ).first()
+        return claimed is not None
+
+    def release_bed(self, db: Session, bed_id: UUID) -> None:
+        # Only a hold is released; occupied/maintenance beds are left untouched
+        db.execute(
+            update(Bed)
+            .where(Bed.id == bed_id, Bed.status == BedStatus.RESERVED)
+            .values(status=BedStatus.AVAILABLE, is_occupied=False)
+        )
+
     def get_my_contracts(self, db: Session, user_id: UUID):
         contracts = db.query(Contract).options(
             joinedload(Contract.bed).joinedload(Bed.room).joinedload(Room.room_type),
@@ -111,40 +215,91 @@ class ContractService:
                 c.room = c.bed.room
         return contracts
 
-    def get_all(self, db: Session, skip: int = 0, limit: int = 100, campus_id: UUID = None, keyword: str = None, status: str = None):
-        query = db.query(Contract).options(
-            joinedload(Contract.bed).joinedload(Bed.room).joinedload(Room.room_type),
-            joinedload(Contract.bed).joinedload(Bed.room).joinedload(Room.building),
-            joinedload(Contract.student)
-        )
-        
+    def _filtered_query(self, db: Session, campus_id: UUID = None, keyword: str = None, status: str = None):
+        # One join path, used both for filtering and (via contains_eager) for loading
+        query = db.query(Contract)\
+            .join(Contract.bed).join(Bed.room).join(Room.building)\
+            .outerjoin(Room.room_type).join(Contract.student)
+
         if status and status != 'ALL':
              query = query.filter(Contract.status == status)
         
         if campus_id:
-             from app.models.infrastructure import Building
-             query = query.join(Contract.bed).join(Bed.room).join(Room.building).filter(Building.campus_id == campus_id)
+             query = query.filter(Building.campus_id == campus_id)
 
         if keyword:
             search = f"%{keyword}%"
-            query = query.join(Contract.student).filter(
+            query = query.filter(
                 (User.full_name.ilike(search)) |
                 (User.student_code.ilike(search)) |
                 (User.email.ilike(search))
             )
+        return query
+
+    @staticmethod
+    def encode_cursor(contract: Contract) -> str:
+        raw = f"{contract.created_at.isoformat()}|{contract.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        try:
+            created_at, contract_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(created_at), UUID(contract_id)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100, campus_id: UUID = None, keyword: str = None, status: str = None, cursor: Optional[str] = None):
+        """
+        Newest first. With `cursor` (from the previous page) the page is fetched by
+        keyset on (created_at, id) and `skip` is ignored.
+        Returns (contracts, next_cursor).
+        """
+        query = self._filtered_query(db, campus_id=campus_id, keyword=keyword, status=status).options(
+            contains_eager(Contract.bed).contains_eager(Bed.room).contains_eager(Room.room_type),
+            contains_eager(Contract.bed).contains_eager(Bed.room).contains_eager(Room.building),
+            contains_eager(Contract.student)
+        )
+
+        query = query.order_by(Contract.created_at.desc(), Contract.id.desc())
+        if cursor:
+            created_at, contract_id = self.decode_cursor(cursor)
+            query = query.filter(tuple_(Contract.created_at, Contract.id) < tuple_(created_at, contract_id))
+        elif skip:
+            query = query.offset(skip)
 
-        contracts = query.order_by(Contract.created_at.desc()).offset(skip).limit(limit).all()
+        contracts = query.limit(limit).all()
         for c in contracts:
             if c.bed:
                 c.room = c.bed.room
-        return contracts
+
+        next_cursor = self.encode_cursor(contracts[-1]) if len(contracts) == limit else None
+        return contracts, next_cursor
+
+    def count_all(self, db: Session, campus_id: UUID = None, keyword: str = None, status: str = None) -> int:
+        # Cached for a short TTL: the list header only needs an approximate total
+        key = (campus_id, keyword, status)
+        return contract_count_cache.get_or_set(
+            key,
+            lambda: self._filtered_query(db, campus_id=campus_id, keyword=keyword, status=status)
+                        .with_entities(func.count(Contract.id)).scalar()
+        )
 
     def update_status(self, db: Session, contract_id: UUID, status_in: ContractUpdateStatus) -> Contract:
         contract = db.query(Contract).filter(Contract.id == contract_id).first()
         if not contract:
             raise HTTPException(status_code=404, detail="Hợp đồng không tìm thấy")
 
-        if status_in.status == ContractStatus.ACTIVE and contract.status != ContractStatus.ACTIVE:
+        new_invoices = []
+        new_status = status_in.status
+        if new_status == ContractStatus.ACTIVE and contract.status == ContractStatus.PENDING and contract.renewal_of_id:
+            # Gia hạn: cùng giường, hóa đơn đã tạo khi sinh hợp đồng gia hạn
+            original_status = db.query(Contract.status).filter(Contract.id == contract.renewal_of_id).scalar()
+            new_status = self.renewal_approval_status(original_status)
+            if new_status is None:
+                raise HTTPException(status_code=400, detail="Hợp đồng gốc đã chấm dứt, không thể duyệt gia hạn")
+            contract.confirmed_at = contract.confirmed_at or datetime.now(timezone.utc)
+        elif new_status == ContractStatus.ACTIVE and contract.status != ContractStatus.ACTIVE:
             # Nếu duyệt -> Đánh dấu giường đã có người
             bed = db.query(Bed).filter(Bed.id == contract.bed_id).first()
             bed.status = BedStatus.OCCUPIED
@@ -157,37 +312,22 @@ class ContractService:
             if not room:
                  room = db.query(Room).filter(Room.id == bed.room_id).first()
             
-            billable_months = 1
-            total_rent = billable_months * room.base_price
-            deposit = room.base_price
-            grand_total = total_rent + deposit
-
-            invoice_title = f"Thanh toán Đợt 1: Cọc + Tiền thuê tháng đầu"
-            
-            invoice = Invoice(
-                contract_id=contract.id,
-                title=invoice_title,
-                total_amount=grand_total,
-                status=InvoiceStatus.UNPAID,
-                # Add default due_date: 5 days from now
-                due_date=datetime.now(timezone.utc) + timedelta(days=5),
-                details={
-                    "rent_months": billable_months,
-                    "price_per_month": room.base_price,
-                    "deposit": deposit,
-                    "start_date": str(start_date),
-                    "note": "Hóa đơn thanh toán lần đầu (Cọc + Tháng 1). Các tháng tiếp theo sẽ thanh toán hàng tháng."
-                }
-            )
-            db.add(invoice)
+            values = self._first_invoice_values(contract.id, start_date, room.base_price)
+            values["id"] = uuid4()
+            db.add(Invoice(**values))
+            new_invoices.append({**values, "student_id": contract.student_id})
         
-        if status_in.status in [ContractStatus.EXPIRED, ContractStatus.TERMINATED] and contract.status == ContractStatus.ACTIVE:
-            bed = db.query(Bed).filter(Bed.id == contract.bed_id).first()
-            bed.status = BedStatus.AVAILABLE
-            bed.is_occupied = False
-            db.add(bed)
+        if new_status in [ContractStatus.EXPIRED, ContractStatus.TERMINATED] and contract.status == ContractStatus.PENDING:
+            if contract.renewal_of_id:
+                # Gia hạn bị từ chối: giường vẫn thuộc hợp đồng gốc, chỉ hủy hóa đơn gia hạn
+                self.cancel_unpaid_invoices(db, [contract.id], "Renewal rejected")
+            else:
+                # Từ chối hợp đồng chờ duyệt -> trả lại giường đang giữ chỗ
+                self.release_bed(db, contract.bed_id)
 
-            if status_in.status == ContractStatus.TERMINATED:
+        ended = new_status in [ContractStatus.EXPIRED, ContractStatus.TERMINATED] and contract.status == ContractStatus.ACTIVE
+        if ended:
+            if new_status == ContractStatus.TERMINATED:
                 unpaid_invoices = db.query(Invoice).filter(
                     Invoice.contract_id == contract.id,
                     Invoice.status == InvoiceStatus.UNPAID
@@ -201,12 +341,350 @@ class ContractService:
                     inv.details = new_details
                     db.add(inv)
 
-        contract.status = status_in.status
+        contract.status = new_status
         db.add(contract)
+        if ended:
+            db.flush()
+            # Same transitions as the sweeper (expiry) and liquidation (early end)
+            if new_status == ContractStatus.EXPIRED:
+                self.roll_over_renewals(db, [contract.id])
+            else:
+                self.end_renewals(db, [contract.id], "Contract terminated by admin")
+            # The bed stays held if a renewal took it over
+            self.free_beds(db, [contract.bed_id], BedStatus.OCCUPIED)
         db.commit()
         db.refresh(contract)
+        location_service.invalidate([contract.student_id])
+        finance_service.push_invoices_created(new_invoices)
         return contract
 
+    @staticmethod
+    def renewal_approval_status(original_status: ContractStatus) -> Optional[ContractStatus]:
+        """
+        Status a renewal gets when confirmed / approved: it waits (PENDING) while the
+        contract it extends is still ACTIVE and takes over once that one EXPIRED.
+        None when the original ended early (terminated) and cannot be renewed.
+        """
+        if original_status == ContractStatus.ACTIVE:
+            return ContractStatus.PENDING
+        if original_status == ContractStatus.EXPIRED:
+            return ContractStatus.ACTIVE
+        return None
+
+    def roll_over_renewals(self, db: Session, contract_ids: List[UUID]) -> Tuple[List[UUID], List[UUID]]:
+        """
+        The given contracts just EXPIRED: their confirmed renewals become ACTIVE (same
+        bed), unconfirmed ones lapse and their invoices are cancelled.
+        Returns (activated, lapsed) renewal ids.
+        """
+        if not contract_ids:
+            return [], []
+        waiting = and_(Contract.renewal_of_id.in_(contract_ids), Contract.status == ContractStatus.PENDING)
+        activated = db.execute(
+            update(Contract)
+            .where(waiting, Contract.confirmed_at.is_not(None))
+            .values(status=ContractStatus.ACTIVE)
+            .returning(Contract.id)
+        ).scalars().all()
+        lapsed = db.execute(
+            update(Contract)
+            .where(waiting, Contract.confirmed_at.is_(None))
+            .values(status=ContractStatus.EXPIRED)
+            .returning(Contract.id)
+        ).scalars().all()
+        self.cancel_unpaid_invoices(db, lapsed, "Renewal not confirmed")
+        return activated, lapsed
+
+    def end_renewals(self, db: Session, contract_ids: List[UUID], reason: str) -> List[UUID]:
+        """
+        The given contracts end early (termination, liquidation, transfer): their live
+        renewals are terminated and the renewal invoices cancelled, so the bed is free.
+        """
+        if not contract_ids:
+            return []
+        ended = db.execute(
+            update(Contract)
+            .where(
+                Contract.renewal_of_id.in_(contract_ids),
+                Contract.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE])
+            )
+            .values(status=ContractStatus.TERMINATED)
+            .returning(Contract.id)
+        ).scalars().all()
+        self.cancel_unpaid_invoices(db, ended, reason)
+        return ended
+
+    @staticmethod
+    def _first_invoice_values(contract_id: UUID, start_date: datetime, base_price: float) -> dict:
+        billable_months = 1
+        total_rent = billable_months * base_price
+        deposit = base_price
+        return {
+            "contract_id": contract_id,
+            "title": "Thanh toán Đợt 1: Cọc + Tiền thuê tháng đầu",
+            "total_amount": total_rent + deposit,
+            "status": InvoiceStatus.UNPAID,
+            # Add default due_date: 5 days from now
+            "due_date": datetime.now(timezone.utc) + timedelta(days=5),
+            "details": {
+                "rent_months": billable_months,
+                "price_per_month": base_price,
+                "deposit": deposit,
+                "start_date": str(start_date),
+                "note": "Hóa đơn thanh toán lần đầu (Cọc + Tháng 1). Các tháng tiếp theo sẽ thanh toán hàng tháng."
+            }
+        }
+
+    def bulk_update_status(self, db: Session, request: BulkContractStatusUpdate) -> dict:
+        """
+        Approve (ACTIVE) or reject (TERMINATED) many pending contracts. Each chunk locks
+        its contracts, updates beds and contracts with one statement each, bulk-inserts
+        the first invoices and commits.
+        """
+        started = time.perf_counter()
+        if request.status not in (ContractStatus.ACTIVE, ContractStatus.TERMINATED):
+            raise HTTPException(status_code=400, detail="Chỉ hỗ trợ duyệt (ACTIVE) hoặc từ chối (TERMINATED) hàng loạt")
+
+        if request.contract_ids:
+            contract_ids = list(dict.fromkeys(request.contract_ids))
+        else:
+            query = select(Contract.id).where(Contract.status == ContractStatus.PENDING)
+            if request.building_id or request.campus_id:
+                query = query.join(Bed, Contract.bed_id == Bed.id).join(Room, Bed.room_id == Room.id)
+                if request.building_id:
+                    query = query.where(Room.building_id == request.building_id)
+                if request.campus_id:
+                    query = query.join(Building, Room.building_id == Building.id).where(Building.campus_id == request.campus_id)
+            if request.created_before:
+                query = query.where(Contract.created_at < request.created_before)
+            contract_ids = db.execute(query.order_by(Contract.created_at).limit(request.limit)).scalars().all()
+
+        results = []
+        chunks = 0
+        for i in range(0, len(contract_ids), request.chunk_size):
+            chunk_results, invoices = self._bulk_update_chunk(db, contract_ids[i:i + request.chunk_size], request.status)
+            db.commit()
+            location_service.clear()
+            finance_service.push_invoices_created(invoices)
+            results.extend(chunk_results)
+            chunks += 1
+
+        succeeded = sum(1 for r in results if r["success"])
+        return {
+            "status": request.status,
+            "processed": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "chunks": chunks,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results,
+        }
+
+    def _bulk_update_chunk(self, db: Session, contract_ids: List[UUID], new_status: ContractStatus) -> Tuple[List[dict], List[dict]]:
+        rows = db.execute(
+            select(
+                Contract.id, Contract.student_id, Contract.bed_id, Contract.status, Contract.start_date,
+                Contract.renewal_of_id, Room.base_price
+            )
+            .join(Bed, Contract.bed_id == Bed.id)
+            .join(Room, Bed.room_id == Room.id)
+            .where(Contract.id.in_(contract_ids))
+            .with_for_update(of=Contract)
+        ).all()
+        found = {row.id: row for row in rows}
+
+        outcome = {}
+        pending = []
+        for contract_id in contract_ids:
+            row = found.get(contract_id)
+            if row is None:
+                outcome[contract_id] = "Hợp đồng không tìm thấy"
+            elif row.status != ContractStatus.PENDING:
+                outcome[contract_id] = f"Hợp đồng không ở trạng thái chờ duyệt ({row.status.value})"
+            else:
+                pending.append(row)
+
+        # Renewals already hold their bed through the original contract
+        renewals = [row for row in pending if row.renewal_of_id]
+        pending = [row for row in pending if not row.renewal_of_id]
+        renewed = self._bulk_update_renewals(db, renewals, new_status, outcome) if renewals else []
+
+        invoice_ids = {}
+        invoice_rows = []
+        if pending:
+            bed_ids = [row.bed_id for row in pending]
+            if new_status == ContractStatus.ACTIVE:
+                # Beds under maintenance or already occupied are not taken over
+                claimed = set(db.execute(
+                    update(Bed)
+                    .where(Bed.id.in_(bed_ids), Bed.status.in_([BedStatus.RESERVED, BedStatus.AVAILABLE]))
+                    .values(status=BedStatus.OCCUPIED, is_occupied=True)
+                    .returning(Bed.id)
+                ).scalars())
+                approved = []
+                for row in pending:
+                    if row.bed_id in claimed:
+                        approved.append(row)
+                    else:
+                        outcome[row.id] = "Giường không khả dụng (Đã có người hoặc bảo trì)"
+                pending = approved
+                if pending:
+                    for row in pending:
+                        values = self._first_invoice_values(row.id, row.start_date, row.base_price)
+                        values["id"] = uuid4()
+                        invoice_ids[row.id] = values["id"]
+                        invoice_rows.append(values)
+                    db.execute(insert(Invoice), invoice_rows)
+            else:
+                db.execute(
+                    update(Bed)
+                    .where(Bed.id.in_(bed_ids), Bed.status == BedStatus.RESERVED)
+                    .values(status=BedStatus.AVAILABLE, is_occupied=False)
+                )
+
+            if pending:
+                db.execute(
+                    update(Contract)
+                    .where(Contract.id.in_([row.id for row in pending]))
+                    .values(status=new_status)
+                )
+
+        done = {row.id for row in pending} | set(renewed)
+        students = {row.id: row.student_id for row in pending}
+        results = [
+            {
+                "contract_id": contract_id,
+                "success": contract_id in done,
+                "invoice_id": invoice_ids.get(contract_id),
+                "detail": outcome.get(contract_id),
+            }
+            for contract_id in contract_ids
+        ]
+        return results, [{**values, "student_id": students[values["contract_id"]]} for values in invoice_rows]
+
+    def _bulk_update_renewals(self, db: Session, renewals: list, new_status: ContractStatus, outcome: dict) -> List[UUID]:
+        """Same rule as update_status: no bed claim / release, approval may keep them PENDING"""
+        ids = [row.id for row in renewals]
+        if new_status != ContractStatus.ACTIVE:
+            db.execute(update(Contract).where(Contract.id.in_(ids)).values(status=new_status))
+            self.cancel_unpaid_invoices(db, ids, "Renewal rejected")
+            return ids
+
+        originals = dict(db.execute(
+            select(Contract.id, Contract.status).where(Contract.id.in_([row.renewal_of_id for row in renewals]))
+        ).all())
+        by_status = {}
+        for row in renewals:
+            status = self.renewal_approval_status(originals.get(row.renewal_of_id))
+            if status is None:
+                outcome[row.id] = "Hợp đồng gốc đã chấm dứt, không thể duyệt gia hạn"
+            else:
+                by_status.setdefault(status, []).append(row.id)
+
+        now = datetime.now(timezone.utc)
+        for status, status_ids in by_status.items():
+            db.execute(
+                update(Contract)
+                .where(Contract.id.in_(status_ids))
+                .values(status=status, confirmed_at=func.coalesce(Contract.confirmed_at, now))
+            )
+        return [contract_id for status_ids in by_status.values() for contract_id in status_ids]
+
+    def sweep(self, db: Session, now: Optional[datetime] = None) -> dict:
+        """
+        Expire ACTIVE contracts past their end_date (their confirmed renewals take
+        over the bed) and release unpaid PENDING holds older than
+        CONTRACT_PENDING_TTL_HOURS, freeing the beds in the same transaction.
+        """
+        started = time.perf_counter()
+        now = now or datetime.now(timezone.utc)
+
+        # Renewals not confirmed by the time the new term starts lapse (before the
+        # original contract expires below, so its bed can be freed)
+        lapsed = db.execute(
+            update(Contract)
+            .where(
+                Contract.status == ContractStatus.PENDING,
+                Contract.renewal_of_id.is_not(None),
+                Contract.confirmed_at.is_(None),
+                Contract.start_date <= now.replace(tzinfo=None)
+            )
+            .values(status=ContractStatus.EXPIRED)
+            .returning(Contract.id)
+        ).scalars().all()
+        self.cancel_unpaid_invoices(db, lapsed, "Renewal not confirmed")
+
+        # end_date is a naive UTC column
+        expired = db.execute(
+            update(Contract)
+            .where(Contract.status == ContractStatus.ACTIVE, Contract.end_date < now.replace(tzinfo=None))
+            .values(status=ContractStatus.EXPIRED)
+            .returning(Contract.id, Contract.bed_id)
+        ).all()
+        activated, late_lapsed = self.roll_over_renewals(db, [row.id for row in expired])
+        # Beds taken over by an activated renewal stay OCCUPIED (free_beds skips them)
+        freed_beds = self.free_beds(db, [row.bed_id for row in expired], BedStatus.OCCUPIED)
+
+        stale_before = now - timedelta(hours=settings.CONTRACT_PENDING_TTL_HOURS)
+        # Same guard as cancel_contract: a paid hold (deposit, transfer fee) waits for staff
+        paid = select(Invoice.id).where(
+            Invoice.contract_id == Contract.id,
+            Invoice.status == InvoiceStatus.PAID
+        ).exists()
+        released = db.execute(
+            update(Contract)
+            .where(
+                Contract.status == ContractStatus.PENDING,
+                Contract.renewal_of_id.is_(None),
+                Contract.created_at < stale_before,
+                ~paid
+            )
+            .values(status=ContractStatus.EXPIRED)
+            .returning(Contract.id, Contract.bed_id)
+        ).all()
+        self.cancel_unpaid_invoices(db, [row.id for row in released], "Booking not approved in time")
+        released_beds = self.free_beds(db, [row.bed_id for row in released], BedStatus.RESERVED)
+
+        db.commit()
+        if lapsed or expired or released:
+            location_service.clear()
+        return {
+            "run_at": now,
+            "expired_contracts": len(expired),
+            "freed_beds": freed_beds,
+            "released_holds": len(released),
+            "released_beds": released_beds,
+            "lapsed_renewals": len(lapsed) + len(late_lapsed),
+            "activated_renewals": len(activated),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def cancel_unpaid_invoices(self, db: Session, contract_ids: List[UUID], reason: str) -> int:
+        if not contract_ids:
+            return 0
+        details = func.coalesce(Invoice.details, literal({}, JSONB))
+        result = db.execute(
+            update(Invoice)
+            .where(Invoice.contract_id.in_(contract_ids), Invoice.status == InvoiceStatus.UNPAID)
+            .values(status=InvoiceStatus.CANCELLED, details=details.op("||")(literal({"cancel_reason": reason}, JSONB)))
+        )
+        return result.rowcount
+
+    def free_beds(self, db: Session, bed_ids: List[UUID], from_status: BedStatus) -> int:
+        if not bed_ids:
+            return 0
+        # Skip beds that already carry another live contract (e.g. booked right after)
+        other_live = select(Contract.id).where(
+            Contract.bed_id == Bed.id,
+            Contract.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE])
+        ).exists()
+        result = db.execute(
+            update(Bed)
+            .where(Bed.id.in_(set(bed_ids)), Bed.status == from_status, ~other_live)
+            .values(status=BedStatus.AVAILABLE, is_occupied=False)
+        )
+        return result.rowcount
+
     def cancel_contract(self, db: Session, contract_id: UUID, user_id: UUID):
         contract = db.query(Contract).filter(Contract.id == contract_id).first()
         if not contract:
@@ -238,8 +716,9 @@ class ContractService:
                 detail="Bạn đã thanh toán tiền cọc. Vui lòng liên hệ quản lý để hủy và nhận lại tiền."
             )
 
-        # 4. Hợp lệ -> Xóa
+        # 4. Hợp lệ -> Xóa và trả lại giường đang giữ chỗ
         db.query(Invoice).filter(Invoice.contract_id == contract.id).delete()
+        self.release_bed(db, contract.bed_id)
         db.delete(contract)
         db.commit()
         return {"message": "Hủy hợp đồng thành công"}
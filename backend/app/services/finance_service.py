@@ -4,15 +4,29 @@ from typing import List, Optional
 from datetime import datetime
 from app.models.finance import UtilityReading, Invoice, InvoiceStatus, UtilityConfig, Payment
 from app.models.operations import ContractStatus
-from app.models.enums import UtilityType
+from app.models.enums import UtilityType, UserRole
 from app.schemas.finance import UtilityRecordingCreate, PaymentCreate, UtilityConfigCreate, UtilityConfigUpdate
 from app.services.base import BaseService
+from app.core.events import event_broker
 
 class UtilityConfigService(BaseService[UtilityConfig, UtilityConfigCreate, UtilityConfigUpdate]):
     def get_by_type(self, db: Session, type: UtilityType) -> Optional[UtilityConfig]:
         return db.query(UtilityConfig).filter(UtilityConfig.type == type).first()
 
 class FinanceService:
+    def push_invoices_created(self, invoices: List[dict]) -> None:
+        """
+        Push new invoices to their payers: {id, title, total_amount} plus
+        student_id (personal invoice) or room_id (shared utility invoice).
+        """
+        for invoice in invoices:
+            topic = f"user:{invoice['student_id']}" if invoice.get("student_id") else f"room:{invoice['room_id']}"
+            event_broker.publish([topic], "invoice.created", {
+                "id": str(invoice["id"]),
+                "title": invoice["title"],
+                "total_amount": invoice["total_amount"],
+            })
+
     def get_rate(self, db: Session, type: UtilityType) -> float:
         config = db.query(UtilityConfig).filter(UtilityConfig.type == type).first()
         return config.price_per_unit if config else 0.0
@@ -58,6 +72,7 @@ class FinanceService:
         from app.models.operations import Contract
         
         invoices = []
+        created = []
       
         readings = db.query(UtilityReading).filter(
             UtilityReading.month == month,
@@ -102,6 +117,7 @@ class FinanceService:
                 )
                 db.add(inv)
                 invoices.append(inv)
+                created.append((inv, {"room_id": reading.room_id}))
             
             processed_rooms.add(reading.room_id)
             
@@ -149,8 +165,15 @@ class FinanceService:
                 )
                 db.add(inv)
                 invoices.append(inv)
+                created.append((inv, {"student_id": student_id}))
             
+        db.flush()
+        notifications = [
+            {"id": inv.id, "title": inv.title, "total_amount": inv.total_amount, **owner}
+            for inv, owner in created
+        ]
         db.commit()
+        self.push_invoices_created(notifications)
         return invoices
 
     def process_payment(self, db: Session, payment_in: PaymentCreate) -> Payment:
@@ -184,8 +207,25 @@ class FinanceService:
             
         db.commit()
         db.refresh(payment)
+        if inv:
+            self._push_payment(inv, payment)
         return payment
 
+    def _push_payment(self, inv: Invoice, payment: Payment) -> None:
+        # Payer (student or room residents) and staff dashboards
+        topics = [f"role:{UserRole.ADMIN.value}", f"role:{UserRole.MANAGER.value}"]
+        if inv.contract_id and inv.contract:
+            topics.append(f"user:{inv.contract.student_id}")
+        elif inv.room_id:
+            topics.append(f"room:{inv.room_id}")
+        event_broker.publish(topics, "payment.completed", {
+            "invoice_id": str(inv.id),
+            "payment_id": str(payment.id),
+            "amount": payment.amount,
+            "status": inv.status.value,
+            "remaining_amount": inv.remaining_amount,
+        })
+
     
     def cancel_invoice(self, db: Session, invoice_id: UUID, reason: Optional[str] = None) -> Invoice:
         inv = db.query(Invoice).filter(Invoice.id == invoice_id).first()
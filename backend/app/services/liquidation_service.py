@@ -1,46 +1,139 @@
+import time
+import uuid
+from typing import List, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from uuid import UUID
 from datetime import datetime
 from fastapi import HTTPException
+from app.models.enums import BedStatus
 from app.models.operations import LiquidationRecord, Contract, ContractStatus
-from app.schemas.operations import LiquidationCreate
+from app.schemas.operations import LiquidationCreate, LiquidationBatchCreate
+from app.services.contract_service import contract_service
+from app.services.location_service import location_service
 
 class LiquidationService:
     def liquidate_contract(self, db: Session, confirmed_by: UUID, obj_in: LiquidationCreate) -> LiquidationRecord:
-        contract = db.query(Contract).filter(Contract.id == obj_in.contract_id).first()
-        if not contract:
-            raise HTTPException(status_code=404, detail="Contract not found")
-        
-        if contract.status != ContractStatus.ACTIVE:
-             raise HTTPException(status_code=400, detail="Only active contracts can be liquidated")
-
-        base_deposit = contract.deposit_amount
-        total_refund = base_deposit - obj_in.penalty_amount - obj_in.damage_fee
-        
-        db_obj = LiquidationRecord(
-            contract_id=obj_in.contract_id,
-            refund_deposit_amount=base_deposit,
-            penalty_amount=obj_in.penalty_amount,
-            damage_fee=obj_in.damage_fee,
-            total_refund_to_student=total_refund,
-            notes=obj_in.notes,
-            confirmed_by=confirmed_by,
-            liquidation_date=datetime.utcnow()
-        )
-        
-        contract.status = ContractStatus.TERMINATED
-        contract.end_date = datetime.utcnow()
-        
-        from app.models.infrastructure import Bed
-        bed = db.query(Bed).filter(Bed.id == contract.bed_id).first()
-        if bed:
-            bed.is_occupied = False
-            db.add(bed)
-
-        db.add(db_obj)
-        db.add(contract)
+        """Single checkout: the batch implementation with one contract"""
+        result = self._liquidate_chunk(db, confirmed_by, [obj_in])[0][0]
+        if not result["success"]:
+            db.rollback()
+            status_code = 404 if result["detail"] == "Contract not found" else 400
+            raise HTTPException(status_code=status_code, detail=result["detail"])
         db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        student_id = db.query(Contract.student_id).filter(Contract.id == obj_in.contract_id).scalar()
+        location_service.invalidate([student_id])
+        return db.query(LiquidationRecord).filter(LiquidationRecord.id == result["liquidation_id"]).first()
+
+    def liquidate_batch(self, db: Session, confirmed_by: UUID, request: LiquidationBatchCreate) -> dict:
+        """
+        End-of-semester checkout: liquidate many ACTIVE contracts in committed chunks.
+        Per chunk: bulk-insert LiquidationRecords, terminate contracts (and their live
+        renewals) in one UPDATE, free beds and cancel unpaid invoices.
+        """
+        started = time.perf_counter()
+        items = list({item.contract_id: item for item in request.items}.values())
+
+        results = []
+        chunks = 0
+        cancelled_invoices = 0
+        for i in range(0, len(items), request.chunk_size):
+            chunk_results, cancelled = self._liquidate_chunk(db, confirmed_by, items[i:i + request.chunk_size])
+            db.commit()
+            location_service.clear()
+            results.extend(chunk_results)
+            cancelled_invoices += cancelled
+            chunks += 1
+
+        done = [r for r in results if r["success"]]
+        refunds = [r["total_refund_to_student"] for r in done]
+        return {
+            "processed": len(results),
+            "succeeded": len(done),
+            "failed": len(results) - len(done),
+            "chunks": chunks,
+            "total_deposit": sum(r["refund_deposit_amount"] for r in done),
+            "total_penalty": sum(r["penalty_amount"] for r in done),
+            "total_damage_fee": sum(r["damage_fee"] for r in done),
+            "total_refund": sum(x for x in refunds if x > 0),
+            # Charges exceeding the deposit, still owed by students
+            "total_owed": -sum(x for x in refunds if x < 0),
+            "cancelled_invoices": cancelled_invoices,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results,
+        }
+
+    def _liquidate_chunk(self, db: Session, confirmed_by: UUID, items: List[LiquidationCreate]) -> Tuple[List[dict], int]:
+        now = datetime.utcnow()
+        contracts = {
+            row.id: row for row in db.execute(
+                select(Contract.id, Contract.bed_id, Contract.status, Contract.deposit_amount)
+                .where(Contract.id.in_([item.contract_id for item in items]))
+                .with_for_update()
+            ).all()
+        }
+
+        records = []
+        failures = {}
+        for item in items:
+            contract = contracts.get(item.contract_id)
+            if contract is None:
+                failures[item.contract_id] = "Contract not found"
+            elif contract.status != ContractStatus.ACTIVE:
+                failures[item.contract_id] = "Only active contracts can be liquidated"
+            else:
+                records.append({
+                    "id": uuid.uuid4(),
+                    "contract_id": item.contract_id,
+                    "refund_deposit_amount": contract.deposit_amount,
+                    "penalty_amount": item.penalty_amount,
+                    "damage_fee": item.damage_fee,
+                    "total_refund_to_student": contract.deposit_amount - item.penalty_amount - item.damage_fee,
+                    "notes": item.notes,
+                    "confirmed_by": confirmed_by,
+                    "liquidation_date": now,
+                })
+
+        liquidated = set()
+        cancelled = 0
+        if records:
+            liquidated = set(db.execute(
+                pg_insert(LiquidationRecord).values(records)
+                .on_conflict_do_nothing(index_elements=["contract_id"])
+                .returning(LiquidationRecord.contract_id)
+            ).scalars().all())
+            for record in records:
+                if record["contract_id"] not in liquidated:
+                    failures[record["contract_id"]] = "Contract already liquidated"
+
+        if liquidated:
+            ids = list(liquidated)
+            db.execute(
+                update(Contract)
+                .where(Contract.id.in_(ids))
+                .values(status=ContractStatus.TERMINATED, end_date=now)
+            )
+            # A student who checks out does not keep a pending/confirmed renewal
+            contract_service.end_renewals(db, ids, "Contract liquidated")
+            contract_service.free_beds(db, [contracts[cid].bed_id for cid in ids], BedStatus.OCCUPIED)
+            cancelled = contract_service.cancel_unpaid_invoices(db, ids, "Contract liquidated")
+
+        by_contract = {r["contract_id"]: r for r in records}
+        results = []
+        for item in items:
+            record = by_contract.get(item.contract_id)
+            ok = item.contract_id in liquidated
+            results.append({
+                "contract_id": item.contract_id,
+                "success": ok,
+                "liquidation_id": record["id"] if ok else None,
+                "refund_deposit_amount": record["refund_deposit_amount"] if ok else 0,
+                "penalty_amount": item.penalty_amount if ok else 0,
+                "damage_fee": item.damage_fee if ok else 0,
+                "total_refund_to_student": record["total_refund_to_student"] if ok else 0,
+                "detail": failures.get(item.contract_id),
+            })
+        return results, cancelled
 
 liquidation_service = LiquidationService()
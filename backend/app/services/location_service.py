@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Select, case, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.enums import ContractStatus
+from app.models.infrastructure import Bed, Building, Room
+from app.models.operations import Contract
+
+# Keyed by student id; None (no live contract) is cached as well.
+# Invalidated by every service that creates, ends or moves a contract.
+location_cache = TTLCache("student_location", ttl=300, maxsize=20000)
+
+LIVE_STATUSES = [ContractStatus.ACTIVE, ContractStatus.PENDING]
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class StudentLocation:
+    student_id: UUID
+    contract_id: UUID
+    contract_status: ContractStatus
+    contract_end: datetime
+    bed_id: UUID
+    bed_label: str
+    room_id: UUID
+    room_code: str
+    floor: int
+    building_id: UUID
+    building_name: str
+    campus_id: UUID
+
+    @property
+    def is_active(self) -> bool:
+        return self.contract_status == ContractStatus.ACTIVE
+
+
+class LocationService:
+    def live_contracts(self) -> Select:
+        """
+        Contract -> Bed -> Room -> Building for every live (ACTIVE / PENDING) contract.
+        Shared by the resolver and by set-based queries (announcement fan-out).
+        """
+        return select(
+            Contract.student_id,
+            Contract.id.label("contract_id"),
+            Contract.status.label("contract_status"),
+            Contract.end_date.label("contract_end"),
+            Bed.id.label("bed_id"),
+            Bed.label.label("bed_label"),
+            Room.id.label("room_id"),
+            Room.code.label("room_code"),
+            Room.floor,
+            Building.id.label("building_id"),
+            Building.name.label("building_name"),
+            Building.campus_id,
+        ).select_from(Contract)\
+            .join(Bed, Contract.bed_id == Bed.id)\
+            .join(Room, Bed.room_id == Room.id)\
+            .join(Building, Room.building_id == Building.id)\
+            .where(Contract.status.in_(LIVE_STATUSES))
+
+    def resolve(self, db: Session, student_id: UUID) -> Optional[StudentLocation]:
+        return self.resolve_many(db, [student_id])[student_id]
+
+    def resolve_many(self, db: Session, student_ids: Iterable[UUID]) -> Dict[UUID, Optional[StudentLocation]]:
+        """
+        Location of each student (None without a live contract). Cache misses are
+        loaded in one query. An ACTIVE contract wins over a PENDING one (e.g. an
+        unconfirmed renewal), then the newest.
+        """
+        found: Dict[UUID, Optional[StudentLocation]] = {}
+        missing: List[UUID] = []
+        for student_id in dict.fromkeys(student_ids):
+            location = location_cache.get(student_id, _MISSING)
+            if location is _MISSING:
+                missing.append(student_id)
+            else:
+                found[student_id] = location
+
+        if missing:
+            stmt = self.live_contracts()\
+                .where(Contract.student_id.in_(missing))\
+                .order_by(
+                    Contract.student_id,
+                    case((Contract.status == ContractStatus.ACTIVE, 0), else_=1),
+                    Contract.created_at.desc()
+                )\
+                .distinct(Contract.student_id)
+            loaded = {row.student_id: StudentLocation(**row._asdict()) for row in db.execute(stmt)}
+            for student_id in missing:
+                found[student_id] = loaded.get(student_id)
+                location_cache.set(student_id, found[student_id])
+        return found
+
+    def invalidate(self, student_ids: Iterable[UUID]) -> None:
+        for student_id in student_ids:
+            location_cache.invalidate(student_id)
+
+    def clear(self) -> None:
+        # Bulk status changes and room edits: cheaper than tracking every student
+        location_cache.clear()
+
+
+location_service = LocationService()
@@ -0,0 +1,102 @@
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import select, insert, delete, func, literal
+from sqlalchemy.orm import Session
+from app.models.infrastructure import Bed, Room
+from app.models.reporting import OccupancySnapshot
+from app.models.enums import BedStatus, GenderType
+
+class OccupancyService:
+    def take_snapshot(self, db: Session, snapshot_date: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Aggregate current bed states per (building, room type, gender) into the rollup
+        table with one INSERT ... SELECT. Re-running for the same day replaces its rows.
+        """
+        started = time.perf_counter()
+        snapshot_date = snapshot_date or date.today()
+
+        def count_status(status: BedStatus):
+            return func.count(Bed.id).filter(Bed.status == status)
+
+        aggregate = select(
+            func.gen_random_uuid(),
+            literal(snapshot_date),
+            Room.building_id,
+            Room.room_type_id,
+            Room.gender_type,
+            func.count(Bed.id),
+            count_status(BedStatus.OCCUPIED),
+            count_status(BedStatus.RESERVED),
+            count_status(BedStatus.MAINTENANCE),
+        ).select_from(Bed).join(Room, Bed.room_id == Room.id)\
+         .group_by(Room.building_id, Room.room_type_id, Room.gender_type)
+
+        db.execute(delete(OccupancySnapshot).where(OccupancySnapshot.snapshot_date == snapshot_date))
+        result = db.execute(
+            insert(OccupancySnapshot).from_select(
+                ["id", "snapshot_date", "building_id", "room_type_id", "gender_type",
+                 "total_beds", "occupied_beds", "reserved_beds", "maintenance_beds"],
+                aggregate
+            )
+        )
+        db.commit()
+
+        return {
+            "snapshot_date": snapshot_date,
+            "rows": result.rowcount,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def get_trend(
+        self,
+        db: Session,
+        start_date: date,
+        end_date: date,
+        building_id: Optional[UUID] = None,
+        room_type_id: Optional[UUID] = None,
+        gender_type: Optional[GenderType] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Daily occupancy series read from the rollup table only (indexed range scan).
+        """
+        total = func.sum(OccupancySnapshot.total_beds)
+        occupied = func.sum(OccupancySnapshot.occupied_beds)
+        reserved = func.sum(OccupancySnapshot.reserved_beds)
+        maintenance = func.sum(OccupancySnapshot.maintenance_beds)
+
+        stmt = select(
+            OccupancySnapshot.snapshot_date,
+            total.label("total_beds"),
+            occupied.label("occupied_beds"),
+            reserved.label("reserved_beds"),
+            maintenance.label("maintenance_beds"),
+        ).where(
+            OccupancySnapshot.snapshot_date >= start_date,
+            OccupancySnapshot.snapshot_date <= end_date,
+        )
+        if building_id:
+            stmt = stmt.where(OccupancySnapshot.building_id == building_id)
+        if room_type_id:
+            stmt = stmt.where(OccupancySnapshot.room_type_id == room_type_id)
+        if gender_type:
+            stmt = stmt.where(OccupancySnapshot.gender_type == gender_type)
+
+        rows = db.execute(
+            stmt.group_by(OccupancySnapshot.snapshot_date).order_by(OccupancySnapshot.snapshot_date)
+        ).all()
+
+        return [
+            {
+                "date": r.snapshot_date,
+                "total_beds": r.total_beds,
+                "occupied_beds": r.occupied_beds,
+                "reserved_beds": r.reserved_beds,
+                "maintenance_beds": r.maintenance_beds,
+                "occupancy_rate": round((r.occupied_beds + r.reserved_beds) / r.total_beds * 100, 2) if r.total_beds else 0,
+            }
+            for r in rows
+        ]
+
+occupancy_service = OccupancyService()
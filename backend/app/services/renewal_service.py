@@ -0,0 +1,160 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select, insert, exists, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from app.models.enums import ContractStatus, InvoiceStatus
+from app.models.finance import Invoice
+from app.models.infrastructure import Bed, Room
+from app.models.operations import Contract
+from app.schemas.operations import RenewalGenerate
+from app.services.contract_service import contract_service
+from app.services.finance_service import finance_service
+from app.services.location_service import location_service
+
+
+class RenewalService:
+    def generate(self, db: Session, request: RenewalGenerate) -> dict:
+        """
+        Create PENDING renewal contracts (same bed, current room price) plus their
+        first-month invoice for every ACTIVE contract ending within the window.
+        Idempotent: contracts that already have a live renewal are skipped.
+        """
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # contract dates are naive UTC
+        window_end = now + timedelta(days=request.window_days)
+
+        fixed_end = request.end_date
+        if fixed_end is not None and fixed_end.tzinfo is not None:
+            fixed_end = fixed_end.astimezone(timezone.utc).replace(tzinfo=None)
+
+        renewal = aliased(Contract)
+        has_renewal = exists().where(and_(
+            renewal.renewal_of_id == Contract.id,
+            renewal.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE])
+        ))
+        stmt = select(
+            Contract.id, Contract.student_id, Contract.bed_id, Contract.end_date,
+            Contract.deposit_amount, Room.base_price
+        ).join(Bed, Contract.bed_id == Bed.id).join(Room, Bed.room_id == Room.id).where(
+            Contract.status == ContractStatus.ACTIVE,
+            Contract.end_date >= now,
+            Contract.end_date <= window_end,
+            ~has_renewal,
+        )
+        if request.building_id:
+            stmt = stmt.where(Room.building_id == request.building_id)
+        candidates = db.execute(stmt).all()
+
+        contract_rows = []
+        for row in candidates:
+            end_date = fixed_end or row.end_date + timedelta(days=30 * request.term_months)
+            if end_date <= row.end_date:
+                continue
+            contract_rows.append({
+                "id": uuid.uuid4(),
+                "student_id": row.student_id,
+                "bed_id": row.bed_id,
+                "start_date": row.end_date,
+                "end_date": end_date,
+                "price_per_month": row.base_price,
+                # The deposit already paid carries over to the renewal
+                "deposit_amount": row.deposit_amount,
+                "status": ContractStatus.PENDING,
+                "renewal_of_id": row.id,
+            })
+
+        if request.dry_run or not contract_rows:
+            return self._result(request, len(candidates), 0, 0, started)
+
+        # A concurrent run may have renewed some contracts meanwhile; those rows are skipped
+        created = set(db.execute(
+            pg_insert(Contract).values(contract_rows)
+            .on_conflict_do_nothing(
+                index_elements=["renewal_of_id"],
+                index_where=Contract.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE])
+            )
+            .returning(Contract.id)
+        ).scalars().all())
+
+        invoice_rows = [
+            {
+                "id": uuid.uuid4(),
+                "contract_id": row["id"],
+                "title": "Gia hạn hợp đồng: Tiền thuê tháng đầu",
+                "total_amount": row["price_per_month"],
+                "status": InvoiceStatus.UNPAID,
+                "due_date": row["start_date"],
+                "details": {
+                    "rent_months": 1,
+                    "price_per_month": row["price_per_month"],
+                    "start_date": str(row["start_date"]),
+                    "end_date": str(row["end_date"]),
+                    "renewal_of": str(row["renewal_of_id"]),
+                    "note": "Hóa đơn gia hạn (Tháng đầu của kỳ mới). Tiền cọc được giữ nguyên từ hợp đồng cũ."
+                }
+            }
+            for row in contract_rows if row["id"] in created
+        ]
+        if invoice_rows:
+            db.execute(insert(Invoice), invoice_rows)
+        db.commit()
+        students = {row["id"]: row["student_id"] for row in contract_rows}
+        finance_service.push_invoices_created(
+            [{**values, "student_id": students[values["contract_id"]]} for values in invoice_rows]
+        )
+        return self._result(request, len(candidates), len(created), len(invoice_rows), started)
+
+    @staticmethod
+    def _result(request: RenewalGenerate, candidates: int, created: int, invoices: int, started: float) -> dict:
+        return {
+            "dry_run": request.dry_run,
+            "candidates": candidates,
+            "created": created,
+            "skipped": candidates - created if not request.dry_run else 0,
+            "invoices_created": invoices,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def _get_own_renewal(self, db: Session, contract_id: UUID, user_id: UUID) -> Contract:
+        contract = db.query(Contract).filter(Contract.id == contract_id).first()
+        if not contract or contract.renewal_of_id is None:
+            raise HTTPException(status_code=404, detail="Hợp đồng gia hạn không tồn tại")
+        if contract.student_id != user_id:
+            raise HTTPException(status_code=403, detail="Bạn không sở hữu hợp đồng này")
+        if contract.status != ContractStatus.PENDING:
+            raise HTTPException(status_code=400, detail="Hợp đồng gia hạn đã được xử lý trước đó")
+        return contract
+
+    def confirm(self, db: Session, contract_id: UUID, user_id: UUID) -> Contract:
+        contract = self._get_own_renewal(db, contract_id, user_id)
+        original = db.query(Contract).filter(Contract.id == contract.renewal_of_id).first()
+        if not original or original.status != ContractStatus.ACTIVE:
+            raise HTTPException(status_code=400, detail="Hợp đồng gốc không còn hiệu lực để gia hạn")
+
+        # Same student, same bed: the renewal stays PENDING and the sweeper activates it
+        # once the original contract expires
+        contract.confirmed_at = datetime.now(timezone.utc)
+        db.add(contract)
+        db.commit()
+        db.refresh(contract)
+        location_service.invalidate([user_id])
+        return contract
+
+    def decline(self, db: Session, contract_id: UUID, user_id: UUID) -> Contract:
+        contract = self._get_own_renewal(db, contract_id, user_id)
+        contract.status = ContractStatus.TERMINATED
+        db.add(contract)
+        contract_service.cancel_unpaid_invoices(db, [contract.id], "Renewal declined by student")
+        db.commit()
+        db.refresh(contract)
+        location_service.invalidate([user_id])
+        return contract
+
+
+renewal_service = RenewalService()
@@ -1,10 +1,18 @@
+import time
+import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from typing import List, Optional, Any, Dict
+from sqlalchemy import func, and_, or_, select, insert
+from typing import List, Optional, Any, Dict, Union
 from uuid import UUID
-from app.models.infrastructure import Room, RoomType, RoomStatus, Bed, BedStatus
+from fastapi import HTTPException
+from app.models.infrastructure import Building, Room, RoomType, RoomStatus, Bed, BedStatus
+from app.core.cache import TTLCache
 from app.services.base import BaseService
-from app.schemas.infrastructure import RoomCreate, RoomUpdate, RoomTypeCreate, RoomTypeUpdate
+from app.services.location_service import location_service
+from app.schemas.infrastructure import RoomCreate, RoomUpdate, RoomTypeCreate, RoomTypeUpdate, FloorPlanProvision
+
+# bed_id -> (room_id, room_code, base_price) for contract price quotes
+bed_price_cache = TTLCache("bed_price", ttl=300, maxsize=20000)
 
 class RoomTypeService(BaseService[RoomType, RoomTypeCreate, RoomTypeUpdate]):
     def get_by_name(self, db: Session, name: str) -> Optional[RoomType]:
@@ -39,6 +47,86 @@ class RoomService(BaseService[Room, RoomCreate, RoomUpdate]):
             
         return room
 
+    def provision_floor_plan(self, db: Session, *, plan: FloorPlanProvision) -> Dict[str, Any]:
+        """
+        Create every room and bed of a floor plan (floors x rooms per floor x room type)
+        with two multi-row INSERTs and a single commit.
+        """
+        started = time.perf_counter()
+
+        building = db.query(Building).filter(Building.id == plan.building_id).first()
+        if not building:
+            raise HTTPException(status_code=404, detail="Building not found")
+        room_type = db.query(RoomType).filter(RoomType.id == plan.room_type_id).first()
+        if not room_type:
+            raise HTTPException(status_code=404, detail="Room Type not found")
+
+        prefix = plan.code_prefix or building.code
+        width = max(2, len(str(plan.rooms_per_floor)))
+        base_price = plan.base_price if plan.base_price is not None else room_type.base_price
+        last_floor = plan.start_floor + plan.floors - 1
+
+        room_rows = []
+        bed_rows = []
+        for floor in range(plan.start_floor, last_floor + 1):
+            for number in range(1, plan.rooms_per_floor + 1):
+                room_id = uuid.uuid4()
+                room_rows.append({
+                    "id": room_id,
+                    "building_id": building.id,
+                    "room_type_id": room_type.id,
+                    "code": f"{prefix}{floor}{number:0{width}d}",
+                    "floor": floor,
+                    "gender_type": plan.gender_type,
+                    "status": RoomStatus.AVAILABLE,
+                    "base_price": base_price,
+                    "current_occupancy": 0,
+                })
+                for i in range(1, room_type.capacity + 1):
+                    bed_rows.append({
+                        "id": uuid.uuid4(),
+                        "room_id": room_id,
+                        "label": f"G-{i}",
+                        "status": BedStatus.AVAILABLE,
+                        "is_occupied": False,
+                    })
+
+        codes = [r["code"] for r in room_rows]
+        existing = db.execute(select(Room.code).where(Room.code.in_(codes))).scalars().all()
+        if existing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Room codes already exist: {', '.join(sorted(existing)[:10])}"
+            )
+
+        db.execute(insert(Room), room_rows)
+        if bed_rows:
+            db.execute(insert(Bed), bed_rows)
+        if building.total_floors < last_floor:
+            building.total_floors = last_floor
+            db.add(building)
+        db.commit()
+
+        return {
+            "building_id": building.id,
+            "rooms_created": len(room_rows),
+            "beds_created": len(bed_rows),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "room_codes": codes,
+        }
+
+    def update(self, db: Session, *, db_obj: Room, obj_in: Union[RoomUpdate, Dict[str, Any]]) -> Room:
+        room = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        bed_price_cache.clear()
+        location_service.clear()
+        return room
+
+    def remove(self, db: Session, *, id: Any) -> Room:
+        room = super().remove(db, id=id)
+        bed_price_cache.clear()
+        location_service.clear()
+        return room
+
     def _compute_occupancy(self, room: Room):
         if room and room.beds:
             room.current_occupancy = sum(1 for b in room.beds if b.status in [BedStatus.OCCUPIED, BedStatus.RESERVED])
@@ -87,6 +175,183 @@ class RoomService(BaseService[Room, RoomCreate, RoomUpdate]):
             self._compute_occupancy(room)
         return rooms
 
+    def get_compact_listing(self, db: Session, *,
+                            skip: int = 0,
+                            limit: int = 100,
+                            room_type_id: Optional[UUID] = None,
+                            min_price: Optional[float] = None,
+                            max_price: Optional[float] = None,
+                            status: Optional[RoomStatus] = None,
+                            building_id: Optional[UUID] = None,
+                            keyword: Optional[str] = None
+                            ) -> List[Dict[str, Any]]:
+        """
+        Column projection for the room grid: one aggregate query returning plain
+        tuples, serialized straight to JSON-ready dicts (no ORM identity map,
+        no joinedload fan-out, no Pydantic from_attributes validation).
+        """
+        price = func.coalesce(Room.base_price, RoomType.base_price)
+        occupancy = func.count(Bed.id).filter(Bed.status.in_([BedStatus.OCCUPIED, BedStatus.RESERVED]))
+        capacity = func.coalesce(RoomType.capacity, func.count(Bed.id))
+
+        stmt = select(
+            Room.id,
+            Room.code,
+            Room.floor,
+            Room.status,
+            price.label("price"),
+            occupancy.label("occupancy"),
+            capacity.label("capacity"),
+        ).outerjoin(RoomType, Room.room_type_id == RoomType.id)\
+         .outerjoin(Bed, Bed.room_id == Room.id)\
+         .group_by(Room.id, RoomType.id)
+
+        if room_type_id:
+            stmt = stmt.where(Room.room_type_id == room_type_id)
+        if min_price is not None:
+            stmt = stmt.where(price >= min_price)
+        if max_price is not None:
+            stmt = stmt.where(price <= max_price)
+        if status:
+            stmt = stmt.where(Room.status == status)
+        if building_id:
+            stmt = stmt.where(Room.building_id == building_id)
+        if keyword:
+            stmt = stmt.where(Room.code.ilike(f"%{keyword}%"))
+
+        rows = db.execute(stmt.order_by(Room.code).offset(skip).limit(limit)).all()
+        return [
+            {
+                "id": str(r.id),
+                "code": r.code,
+                "floor": r.floor,
+                "status": r.status.value,
+                "price": r.price,
+                "occupancy": r.occupancy,
+                "capacity": r.capacity,
+            }
+            for r in rows
+        ]
+
+    # Bed status -> small integer code used by the building floor map
+    BED_STATUS_CODES = {
+        BedStatus.AVAILABLE: 0,
+        BedStatus.OCCUPIED: 1,
+        BedStatus.RESERVED: 2,
+        BedStatus.MAINTENANCE: 3,
+    }
+
+    # Rows are stamped with their transaction's start time (now()), so a change that
+    # commits right after a read can carry an older timestamp than that read's version.
+    # `since` is moved back by this margin and such cells are sent again.
+    BED_MATRIX_SINCE_OVERLAP_MS = 5000
+
+    def get_bed_matrix_version(self, db: Session, building_id: UUID) -> str:
+        """
+        Cheap version of the bed matrix: "<newest room/bed change, epoch ms>.<rooms>.<beds>".
+        The row counts change when rooms or beds are deleted, which leaves no timestamp.
+        """
+        room_ts = func.coalesce(Room.updated_at, Room.created_at)
+        bed_ts = func.coalesce(Bed.updated_at, Bed.created_at)
+        row = db.execute(
+            select(
+                func.greatest(func.max(room_ts), func.max(bed_ts)).label("changed_at"),
+                func.count(func.distinct(Room.id)).label("rooms"),
+                func.count(Bed.id).label("beds"),
+            )
+            .select_from(Room)
+            .outerjoin(Bed, Bed.room_id == Room.id)
+            .where(Room.building_id == building_id)
+        ).one()
+        changed_ms = int(row.changed_at.timestamp() * 1000) if row.changed_at else 0
+        return f"{changed_ms}.{row.rooms}.{row.beds}"
+
+    @staticmethod
+    def _parse_matrix_version(version: Optional[str]) -> Optional[List[int]]:
+        parts = (version or "").split(".")
+        if len(parts) != 3 or not all(part.isdigit() for part in parts):
+            return None
+        return [int(part) for part in parts]
+
+    def get_bed_matrix(
+        self, db: Session, building_id: UUID, since: Optional[str] = None, version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Whole-building bed map from a single query. `data` is a flat array of status
+        codes laid out floor -> room -> bed; each room records its offset into it.
+        `version` comes from get_bed_matrix_version. When `since` is a previous version
+        and the layout is unchanged, only the cells changed after it are returned.
+        """
+        version = version or self.get_bed_matrix_version(db, building_id)
+        previous = self._parse_matrix_version(since)
+        since_ms = None
+        layout_changed = False
+        if previous is not None:
+            since_ms = previous[0] - self.BED_MATRIX_SINCE_OVERLAP_MS
+            # Rooms or beds were added or deleted
+            layout_changed = previous[1:] != self._parse_matrix_version(version)[1:]
+
+        bed_ts = func.coalesce(Bed.updated_at, Bed.created_at)
+        rows = db.execute(
+            select(
+                Room.id.label("room_id"),
+                Room.floor,
+                Room.code,
+                func.coalesce(Room.updated_at, Room.created_at).label("room_ts"),
+                Bed.id.label("bed_id"),
+                Bed.status,
+                Bed.created_at.label("bed_created_at"),
+                bed_ts.label("bed_ts"),
+            )
+            .outerjoin(Bed, Bed.room_id == Room.id)
+            .where(Room.building_id == building_id)
+            .order_by(Room.floor, Room.code, Bed.label)
+        ).all()
+
+        def to_ms(ts) -> int:
+            return int(ts.timestamp() * 1000) if ts else 0
+
+        floors: List[Dict[str, Any]] = []
+        data: List[int] = []
+        changes: List[List[int]] = []
+        current_room = None
+
+        for r in rows:
+            if current_room != r.room_id:
+                current_room = r.room_id
+                if not floors or floors[-1]["floor"] != r.floor:
+                    floors.append({"floor": r.floor, "rooms": []})
+                floors[-1]["rooms"].append({"code": r.code, "offset": len(data), "beds": 0})
+                if since_ms is not None and to_ms(r.room_ts) > since_ms:
+                    layout_changed = True
+
+            if r.bed_id is None:
+                continue
+
+            code = self.BED_STATUS_CODES.get(r.status, 0)
+            if since_ms is not None:
+                if to_ms(r.bed_created_at) > since_ms:
+                    layout_changed = True
+                elif to_ms(r.bed_ts) > since_ms:
+                    changes.append([len(data), code])
+            floors[-1]["rooms"][-1]["beds"] += 1
+            data.append(code)
+
+        result = {
+            "building_id": str(building_id),
+            "version": version,
+            "legend": {code: status.value for status, code in self.BED_STATUS_CODES.items()},
+        }
+        if since_ms is not None and not layout_changed:
+            result["full"] = False
+            result["since"] = since
+            result["changes"] = changes
+        else:
+            result["full"] = True
+            result["floors"] = floors
+            result["data"] = data
+        return result
+
     def check_room_availability(self, db: Session, room_id: UUID) -> bool:
         room = self.get(db, room_id)
         if not room:
@@ -7,6 +7,8 @@ from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
 from app.models.operations import Contract, ContractStatus
 from app.models.finance import Invoice, InvoiceStatus
+from app.services.finance_service import finance_service
+from app.services.location_service import location_service
 
 class ServiceMgmtService:
     def create_package(self, db: Session, obj_in: ServicePackageCreate) -> ServicePackage:
@@ -83,6 +85,10 @@ class ServiceMgmtService:
 
         db.commit()
         db.refresh(db_obj)
+        finance_service.push_invoices_created([{
+            "id": invoice.id, "title": invoice.title,
+            "total_amount": invoice.total_amount, "student_id": user_id,
+        }])
         return db_obj
 
     def get_student_subscriptions(self, db: Session, user_id: UUID) -> List[ServiceSubscription]:
@@ -106,7 +112,7 @@ class ServiceMgmtService:
             joinedload(ServiceSubscription.user)
         ).order_by(ServiceSubscription.start_date.desc()).offset(skip).limit(limit).all()
         
-        from app.models.infrastructure import Room, Bed, Building
+        locations = location_service.resolve_many(db, [sub.user_id for sub in subs])
         
         for sub in subs:
             # 1. Service Name
@@ -119,17 +125,11 @@ class ServiceMgmtService:
                 sub.student_code = sub.user.student_code or sub.user.id
                 
             # 3. Room Info (via Active Contract)
-            active_contract = db.query(Contract).options(
-                 joinedload(Contract.bed).joinedload(Bed.room).joinedload(Room.building)
-            ).filter(
-                Contract.student_id == sub.user_id,
-                Contract.status == ContractStatus.ACTIVE
-            ).first()
-            
-            if active_contract and active_contract.bed and active_contract.bed.room:
-                sub.room_code = active_contract.bed.room.code
-                sub.building_name = active_contract.bed.room.building.name if active_contract.bed.room.building else ""
-                sub.bed_label = active_contract.bed.label
+            location = locations[sub.user_id]
+            if location and location.is_active:
+                sub.room_code = location.room_code
+                sub.building_name = location.building_name
+                sub.bed_label = location.bed_label
             else:
                 sub.room_code = "N/A"
                 sub.building_name = "N/A"
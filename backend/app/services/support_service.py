@@ -4,20 +4,16 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.services.base import BaseService
 from app.models.support import MaintenanceRequest
-from app.models.operations import Contract, ContractStatus
+from app.services.location_service import location_service
 from app.models.enums import RequestStatus
 from app.schemas.support import MaintenanceRequestCreate, MaintenanceRequestUpdate
 
 class SupportService(BaseService[MaintenanceRequest, MaintenanceRequestCreate, MaintenanceRequestUpdate]):
     def create_request(self, db: Session, obj_in: MaintenanceRequestCreate, user_id: UUID) -> MaintenanceRequest:
         if not obj_in.room_code:
-            active_contract = db.query(Contract).filter(
-                Contract.student_id == user_id,
-                Contract.status == ContractStatus.ACTIVE
-            ).order_by(Contract.created_at.desc()).first()
-            
-            if active_contract and active_contract.bed and active_contract.bed.room:
-                obj_in.room_code = active_contract.bed.room.code
+            location = location_service.resolve(db, user_id)
+            if location and location.is_active:
+                obj_in.room_code = location.room_code
         
         db_obj = MaintenanceRequest(
             **obj_in.dict(),
@@ -7,6 +7,9 @@ from app.models.finance import Invoice, InvoiceStatus
 from app.models.infrastructure import Bed
 from app.models.enums import TransferStatus, ContractStatus
 from app.schemas.transfers import TransferRequestCreate, TransferRequestUpdate
+from app.services.communication_service import communication_service
+from app.services.finance_service import finance_service
+from app.services.location_service import location_service
 
 class TransferService:
     def create_request(self, db: Session, user_id: UUID, obj_in: TransferRequestCreate) -> TransferRequest:
@@ -110,29 +113,29 @@ class TransferService:
             if not new_bed:
                  raise HTTPException(status_code=404, detail="Giường đích không tồn tại")
             
-            if new_bed.status != BedStatus.AVAILABLE:
-                 raise HTTPException(status_code=400, detail="Giường đích không khả dụng (Đã có người hoặc bảo trì)")
-
             # 3. Get Old Contract & Data
             contract = db.query(Contract).filter(Contract.id == req.contract_id).first()
             if not contract or contract.status != ContractStatus.ACTIVE:
                  raise HTTPException(status_code=400, detail="Hợp đồng gốc không còn hiệu lực để chuyển")
+
+            # Giữ chỗ giường đích (atomic, tránh tranh chấp với đăng ký mới)
+            from app.services.contract_service import contract_service
+            if not contract_service.claim_bed(db, new_bed.id):
+                 db.rollback()
+                 raise HTTPException(status_code=400, detail="Giường đích không khả dụng (Đã có người hoặc bảo trì)")
             
             # 4. Terminate Old Contract (Thanh lý nhanh)
             from datetime import datetime, timezone, timedelta
             now = datetime.now(timezone.utc)
             
-            old_bed_id = contract.bed_id
-            old_bed = db.query(Bed).filter(Bed.id == old_bed_id).first()
-            
             contract.status = ContractStatus.TERMINATED
             contract.end_date = now
             db.add(contract)
-            
-            if old_bed:
-                old_bed.status = BedStatus.AVAILABLE
-                old_bed.is_occupied = False
-                db.add(old_bed)
+            db.flush()
+
+            # The renewal of the old contract goes with it, then the old bed is freed
+            contract_service.end_renewals(db, [contract.id], "Transferred to new room")
+            contract_service.free_beds(db, [contract.bed_id], BedStatus.OCCUPIED)
                 
             # 5. Create New Pending Contract
             new_room = db.query(Room).filter(Room.id == new_bed.room_id).first()
@@ -233,6 +236,12 @@ class TransferService:
             db.add(req)
             db.commit()
             db.refresh(req)
+            location_service.invalidate([req.student_id])
+            communication_service.deliver_to_users(db, [req.student_id])
+            finance_service.push_invoices_created([{
+                "id": invoice.id, "title": invoice.title,
+                "total_amount": invoice.total_amount, "student_id": req.student_id,
+            }])
             return req
 
 transfer_service = TransferService()
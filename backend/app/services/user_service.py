@@ -1,13 +1,29 @@
-from typing import Optional
+import csv
+import io
+import secrets
+import time
+import uuid
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from app.models.users import User
-from app.schemas.user import UserCreate
+from app.models.users import User, UserRole
 from app.services.base import BaseService
-from app.core.security import get_password_hash, verify_password
-from app.schemas.user import UserCreate, UserUpdate
+from starlette.concurrency import run_in_threadpool
+from app.core.security import get_password_hash, get_password_hashes, verify_and_update_password, verify_and_update_password_async
+from app.core.principal import invalidate_principal
+from app.core.text import search_terms, user_search_text
+from app.services.auth_service import auth_service
+from app.services.communication_service import communication_service
+from app.schemas.user import UserCreate, UserUpdate, UserImportRow
 from typing import Any, Dict, Union
 from sqlalchemy import or_
 
+MAX_IMPORT_ROWS = 20000
+IMPORT_CHUNK_SIZE = 1000
+
 class UserService(BaseService[User, UserCreate, UserUpdate]):
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
@@ -26,16 +42,41 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        communication_service.deliver_to_users(db, [db_obj.id])
         return db_obj
 
     def authenticate(self, db: Session, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            self.store_rehash(db, user, new_hash)
+        return user
+
+    async def authenticate_async(self, db: Session, email: str, password: str) -> Optional[User]:
+        """
+        Same as authenticate, for async endpoints: DB work runs in the threadpool and
+        bcrypt in the dedicated hash executor, so neither blocks the event loop.
+        """
+        user = await run_in_threadpool(self.get_by_email, db, email=email)
+        if not user:
+            return None
+        valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            await run_in_threadpool(self.store_rehash, db, user, new_hash)
         return user
 
+    def store_rehash(self, db: Session, user: User, new_hash: str) -> None:
+        # Password was correct but hashed with old parameters (e.g. BCRYPT_ROUNDS changed)
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+
     def update(
         self,
         db: Session,
@@ -53,7 +94,12 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
             
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        if "hashed_password" in update_data or update_data.get("is_active") is False:
+            auth_service.revoke_all(db, user.id)
+        else:
+            invalidate_principal(user.id)
+        return user
 
     def get_multi_with_filter(
         self, 
@@ -70,19 +116,146 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         if role:
             query = query.filter(self.model.role == role)
             
-        if keyword:
-            search = f"%{keyword}%"
-            query = query.filter(
-                or_(
-                    self.model.email.ilike(search),
-                    self.model.full_name.ilike(search),
-                    self.model.student_code.ilike(search)
-                )
-            )
+        terms = search_terms(keyword)
+        if terms:
+            # Every term must match the unaccented text ("nguyen van" finds "Nguyễn Văn");
+            # LIKE '%term%' is served by the trigram index on search_text
+            for term in terms:
+                query = query.filter(self.model.search_text.contains(term, autoescape=True))
 
         if is_active is not None:
              query = query.filter(self.model.is_active == is_active)
+
+        if terms:
+            # Rank: exact student code, then matches at the start of the name, then earliest match
+            phrase = " ".join(terms)
+            query = query.order_by(
+                case((func.lower(self.model.student_code) == phrase, 0), else_=1),
+                case((self.model.search_text.startswith(phrase, autoescape=True), 0), else_=1),
+                func.strpos(self.model.search_text, terms[0]),
+                self.model.full_name,
+            )
             
         return query.offset(skip).limit(limit).all()
 
+    def import_csv(self, db: Session, content: bytes, dry_run: bool = False) -> dict:
+        """
+        Bulk-create student accounts from a CSV file (columns: email, student_code,
+        full_name, phone_number, gender, password). Rows are validated against the
+        file itself and against existing users with one query; passwords are hashed
+        on the shared hash executor and accounts are inserted in chunks. Rows taken
+        by a concurrent writer are reported as conflicts instead of failing the import.
+        Rows without a password get a random one-time password, returned once in
+        `credentials`; every imported account must change its password at first login.
+        """
+        started = time.perf_counter()
+        try:
+            text = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="File CSV phải được mã hóa UTF-8")
+
+        reader = csv.DictReader(io.StringIO(text))
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+        if not {"email", "student_code"} <= set(reader.fieldnames):
+            raise HTTPException(status_code=400, detail="File CSV phải có cột email và student_code")
+
+        issues: List[dict] = []
+        valid: List[Tuple[int, UserImportRow]] = []
+        seen_emails, seen_codes = set(), set()
+        for line, raw in enumerate(reader, start=2):  # line 1 is the header
+            if line - 1 > MAX_IMPORT_ROWS:
+                raise HTTPException(status_code=400, detail=f"Tối đa {MAX_IMPORT_ROWS} dòng mỗi lần import")
+            values = {k: v.strip() for k, v in raw.items() if k and isinstance(v, str) and v.strip()}
+            try:
+                row = UserImportRow(**values)
+            except ValidationError as e:
+                error = e.errors()[0]
+                issues.append({"row": line, "email": values.get("email"), "student_code": values.get("student_code"),
+                               "reason": f"{'.'.join(map(str, error['loc']))}: {error['msg']}"})
+                continue
+            if row.email in seen_emails or row.student_code in seen_codes:
+                issues.append({"row": line, "email": row.email, "student_code": row.student_code,
+                               "reason": "Trùng email hoặc mã sinh viên trong file"})
+                continue
+            seen_emails.add(row.email)
+            seen_codes.add(row.student_code)
+            valid.append((line, row))
+        total_rows = len(valid) + len(issues)
+        invalid = len(issues)
+
+        # One round trip for every email / student code already in use
+        taken_emails, taken_codes = set(), set()
+        if valid:
+            for email, code in db.execute(
+                select(User.email, User.student_code).where(or_(
+                    func.lower(User.email).in_(seen_emails), User.student_code.in_(seen_codes)
+                ))
+            ):
+                taken_emails.add(email.lower())
+                taken_codes.add(code)
+
+        pending = []
+        for line, row in valid:
+            if row.email in taken_emails or row.student_code in taken_codes:
+                issues.append({"row": line, "email": row.email, "student_code": row.student_code,
+                               "reason": "Email hoặc mã sinh viên đã tồn tại"})
+            else:
+                pending.append((line, row))
+
+        created, hash_ms = 0, 0.0
+        credentials = []
+        if pending and not dry_run:
+            generated = {row.email: secrets.token_urlsafe(9) for _, row in pending if not row.password}
+            hash_started = time.perf_counter()
+            hashes = get_password_hashes([row.password or generated[row.email] for _, row in pending])
+            hash_ms = (time.perf_counter() - hash_started) * 1000
+
+            user_rows = [{
+                "id": uuid.uuid4(),
+                "email": row.email,
+                "hashed_password": hashed,
+                "full_name": row.full_name,
+                "role": UserRole.STUDENT,
+                "student_code": row.student_code,
+                "phone_number": row.phone_number,
+                "gender": row.gender,
+                "is_active": True,
+                "must_change_password": True,
+                # Core insert: the mapper event does not run
+                "search_text": user_search_text(row.email, row.full_name, row.student_code),
+            } for (_, row), hashed in zip(pending, hashes)]
+
+            inserted = {}
+            for i in range(0, len(user_rows), IMPORT_CHUNK_SIZE):
+                inserted.update(db.execute(
+                    pg_insert(User).values(user_rows[i:i + IMPORT_CHUNK_SIZE])
+                    .on_conflict_do_nothing()
+                    .returning(User.email, User.id)
+                ).tuples().all())
+            db.commit()
+            created = len(inserted)
+            communication_service.deliver_to_users(db, list(inserted.values()))
+            for line, row in pending:
+                if row.email not in inserted:
+                    issues.append({"row": line, "email": row.email, "student_code": row.student_code,
+                                   "reason": "Email hoặc mã sinh viên vừa được tạo bởi thao tác khác"})
+                elif row.email in generated:
+                    credentials.append({"email": row.email, "student_code": row.student_code,
+                                        "temporary_password": generated[row.email]})
+
+        elapsed = time.perf_counter() - started
+        issues.sort(key=lambda issue: issue["row"])
+        return {
+            "dry_run": dry_run,
+            "total_rows": total_rows,
+            "created": created,
+            "invalid": invalid,
+            "conflicts": len(issues) - invalid,
+            "issues": issues,
+            "credentials": credentials,
+            "hash_ms": round(hash_ms, 2),
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "accounts_per_second": round(created / elapsed, 1) if created else 0.0,
+        }
+
 user_service = UserService(User)
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Benchmark: batch bed allocation planner on synthetic intake data (no database).
+
+    python -m scripts.bench_allocation --students 10000 --buildings 10
+"""
+import argparse
+import logging
+import random
+import uuid
+
+from app.models.enums import GenderType
+from app.services.allocation_service import StudentDemand, FreeBed, plan_allocation
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRICES = [350000, 450000, 600000, 800000, 1200000]
+
+
+def make_inventory(buildings: int, beds: int, rng: random.Random):
+    building_ids = [uuid.uuid4() for _ in range(buildings)]
+    inventory = []
+    while len(inventory) < beds:
+        room_id = uuid.uuid4()
+        building_id = rng.choice(building_ids)
+        gender = rng.choices([GenderType.MALE, GenderType.FEMALE, GenderType.MIXED], weights=[45, 45, 10])[0]
+        price = rng.choice(PRICES)
+        for _ in range(rng.choice([2, 4, 6, 8])):
+            inventory.append(FreeBed(uuid.uuid4(), room_id, building_id, gender, price))
+    return building_ids, inventory[:beds]
+
+
+def make_students(count: int, building_ids, rng: random.Random, roommate_ratio: float):
+    students = []
+    for _ in range(count):
+        students.append(StudentDemand(
+            student_id=uuid.uuid4(),
+            gender=rng.choices([GenderType.MALE, GenderType.FEMALE, None], weights=[49, 49, 2])[0],
+            max_budget=rng.choice(PRICES + [None]),
+            preferred_building_id=rng.choice(building_ids + [None]),
+        ))
+    # Pair up a share of same-gender students as roommate requests
+    by_gender = {}
+    for s in students:
+        by_gender.setdefault(s.gender, []).append(s)
+    for group in by_gender.values():
+        rng.shuffle(group)
+        pairs = int(len(group) * roommate_ratio) // 2
+        for i in range(pairs):
+            a, b = group[2 * i], group[2 * i + 1]
+            a.roommate_ids.append(b.student_id)
+    return students
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--beds", type=int, default=None, help="Free beds (default: 110%% of students)")
+    parser.add_argument("--buildings", type=int, default=10)
+    parser.add_argument("--roommates", type=float, default=0.3, help="Share of students in roommate pairs")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    beds = args.beds or int(args.students * 1.1)
+    building_ids, inventory = make_inventory(args.buildings, beds, rng)
+    students = make_students(args.students, building_ids, rng, args.roommates)
+
+    plan = plan_allocation(students, inventory)
+    for key, value in plan.metrics.items():
+        logger.info(f"{key:<26} {value}")
+
+
+if __name__ == "__main__":
+    main()
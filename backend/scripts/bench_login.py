@@ -0,0 +1,68 @@
+"""
+Benchmark: password verification throughput for the login endpoint (no database).
+
+Runs the same verify_and_update call the login path uses, inline and through the
+thread / process hash executors, and reports logins/sec and logins/sec per core:
+
+    python -m scripts.bench_login --logins 200 --rounds 12 --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from passlib.hash import bcrypt
+
+from app.core import security
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def report(label: str, logins: int, elapsed: float) -> None:
+    rate = logins / elapsed
+    cores = os.cpu_count() or 1
+    logger.info(f"{label:<16} {rate:8.1f} logins/s  {rate / cores:8.1f} per core  ({elapsed:.2f}s)")
+
+
+async def run_async(logins: int, concurrency: int, hashed: str) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            valid, _ = await security.verify_and_update_password_async("correct horse", hashed)
+            assert valid
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64, help="Simultaneous login requests")
+    args = parser.parse_args()
+
+    hashed = bcrypt.using(rounds=args.rounds).hash("correct horse")
+    logger.info(f"bcrypt rounds={args.rounds}, cpus={os.cpu_count()}, workers={args.workers}")
+
+    start = time.perf_counter()
+    for _ in range(args.logins):
+        security.verify_and_update_password("correct horse", hashed)
+    report("inline", args.logins, time.perf_counter() - start)
+
+    for kind in ("thread", "process"):
+        security.configure_hash_executor(kind, args.workers)
+        # warm up the pool (process start-up is not part of steady-state throughput)
+        asyncio.run(run_async(args.workers, args.workers, hashed))
+        elapsed = asyncio.run(run_async(args.logins, args.concurrency, hashed))
+        report(f"{kind} pool", args.logins, elapsed)
+    security.get_hash_executor().shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: full RoomResponse listing vs compact column projection.
+
+Seeds N rooms (default 10k) inside a transaction that is rolled back at the end,
+so it is safe to run against a development database:
+
+    python -m scripts.bench_room_listing --rooms 10000
+"""
+import argparse
+import json
+import logging
+import time
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import engine
+from app.db import base  # noqa: F401  (register all mappers)
+from app.models.infrastructure import Campus, Building, Room, RoomType, Bed
+from app.models.enums import RoomStatus, GenderType, BedStatus
+from app.schemas.infrastructure import RoomResponse
+from app.services.room_service import room_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def seed(db: Session, rooms: int, beds_per_room: int) -> None:
+    campus_id = uuid.uuid4()
+    building_id = uuid.uuid4()
+    room_type_id = uuid.uuid4()
+    db.execute(insert(Campus), [{"id": campus_id, "name": "BENCH"}])
+    db.execute(insert(Building), [{"id": building_id, "campus_id": campus_id, "code": f"BENCH-{building_id.hex[:6]}", "total_floors": 50}])
+    db.execute(insert(RoomType), [{"id": room_type_id, "name": f"BENCH-{room_type_id.hex[:6]}", "capacity": beds_per_room, "base_price": 500000}])
+
+    room_rows, bed_rows = [], []
+    for i in range(rooms):
+        room_id = uuid.uuid4()
+        room_rows.append({
+            "id": room_id,
+            "building_id": building_id,
+            "room_type_id": room_type_id,
+            "code": f"BENCH{building_id.hex[:4]}-{i:05d}",
+            "floor": i // 200 + 1,
+            "gender_type": GenderType.MALE,
+            "status": RoomStatus.AVAILABLE,
+            "base_price": 500000,
+            "current_occupancy": 0,
+        })
+        for b in range(beds_per_room):
+            bed_rows.append({
+                "id": uuid.uuid4(),
+                "room_id": room_id,
+                "label": f"G-{b + 1}",
+                "status": BedStatus.OCCUPIED if b % 2 else BedStatus.AVAILABLE,
+                "is_occupied": bool(b % 2),
+            })
+    db.execute(insert(Room), room_rows)
+    db.execute(insert(Bed), bed_rows)
+    db.flush()
+
+
+def timed(label: str, fn, repeat: int) -> float:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = fn()
+        best = min(best, time.perf_counter() - start)
+        size = len(payload)
+    logger.info(f"{label:<10} best of {repeat}: {best * 1000:8.1f} ms  payload {size / 1024:8.1f} KiB")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=10000)
+    parser.add_argument("--beds", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection)
+    try:
+        seed(db, args.rooms, args.beds)
+        logger.info(f"Seeded {args.rooms} rooms x {args.beds} beds")
+
+        def full():
+            db.expunge_all()
+            rooms = room_service.get_multi(db, skip=0, limit=args.rooms)
+            return json.dumps([RoomResponse.model_validate(r).model_dump(mode="json") for r in rooms])
+
+        def compact():
+            rows = room_service.get_compact_listing(db, skip=0, limit=args.rooms)
+            return json.dumps(rows)
+
+        full_time = timed("full", full, args.repeat)
+        compact_time = timed("compact", compact, args.repeat)
+        logger.info(f"Speedup: {full_time / compact_time:.1f}x")
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
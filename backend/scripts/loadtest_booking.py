@@ -0,0 +1,161 @@
+"""
+Load test: many students racing to book a small pool of beds at the same time.
+
+Seeds a throw-away building, beds and student accounts (committed, because every
+worker uses its own connection), fires concurrent ContractService.book_bed calls
+and then verifies that no bed ended up with more than one live contract.
+All seeded rows are deleted at the end:
+
+    python -m scripts.loadtest_booking --students 2000 --beds 300 --workers 16
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.session import engine, SessionLocal
+from app.db import base  # noqa: F401  (register all mappers)
+from app.models.infrastructure import Campus, Building, Room, Bed
+from app.models.operations import Contract
+from app.models.users import User
+from app.models.enums import BedStatus, ContractStatus, GenderType, RoomStatus, UserRole
+from app.schemas.operations import ContractCreate
+from app.services.contract_service import contract_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def seed(db: Session, students: int, beds: int):
+    tag = uuid.uuid4().hex[:6]
+    campus_id, building_id = uuid.uuid4(), uuid.uuid4()
+    db.execute(insert(Campus), [{"id": campus_id, "name": f"LOADTEST-{tag}"}])
+    db.execute(insert(Building), [{"id": building_id, "campus_id": campus_id, "code": f"LT-{tag}", "total_floors": 10}])
+
+    room_rows, bed_rows = [], []
+    for i in range(0, beds, 4):
+        room_id = uuid.uuid4()
+        room_rows.append({
+            "id": room_id,
+            "building_id": building_id,
+            "code": f"LT{tag}-{i // 4:04d}",
+            "floor": 1,
+            "gender_type": GenderType.MIXED,
+            "status": RoomStatus.AVAILABLE,
+            "base_price": 500000,
+            "current_occupancy": 0,
+        })
+        for b in range(min(4, beds - i)):
+            bed_rows.append({"id": uuid.uuid4(), "room_id": room_id, "label": f"G-{b + 1}",
+                             "status": BedStatus.AVAILABLE, "is_occupied": False})
+
+    user_rows = [{
+        "id": uuid.uuid4(),
+        "email": f"lt-{tag}-{i}@loadtest.local",
+        "hashed_password": "!",
+        "role": UserRole.STUDENT,
+        "gender": GenderType.MALE,
+        "is_active": True,
+    } for i in range(students)]
+
+    db.execute(insert(Room), room_rows)
+    db.execute(insert(Bed), bed_rows)
+    db.execute(insert(User), user_rows)
+    db.commit()
+    return campus_id, building_id, [r["id"] for r in bed_rows], [u["id"] for u in user_rows]
+
+
+def cleanup(db: Session, campus_id, building_id, bed_ids, user_ids) -> None:
+    db.execute(delete(Contract).where(Contract.bed_id.in_(bed_ids)))
+    db.execute(delete(Bed).where(Bed.id.in_(bed_ids)))
+    db.execute(delete(Room).where(Room.building_id == building_id))
+    db.execute(delete(Building).where(Building.id == building_id))
+    db.execute(delete(Campus).where(Campus.id == campus_id))
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--beds", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=16, help="Keep <= pool_size + max_overflow")
+    parser.add_argument("--hot", type=float, default=0.2, help="Share of beds that receive most of the traffic")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    campus_id, building_id, bed_ids, user_ids = seed(db, args.students, args.beds)
+    logger.info(f"Seeded {len(bed_ids)} beds and {len(user_ids)} students")
+
+    # Skewed demand: most students fight over a few popular beds
+    hot = bed_ids[:max(1, int(len(bed_ids) * args.hot))]
+    targets = [rng.choice(hot) if rng.random() < 0.8 else rng.choice(bed_ids) for _ in user_ids]
+    end_date = datetime.now(timezone.utc) + timedelta(days=150)
+
+    outcomes = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def attempt(user_id, bed_id):
+        session = SessionLocal()
+        started = time.perf_counter()
+        try:
+            contract_service.book_bed(session, user_id, ContractCreate(bed_id=bed_id, end_date=end_date))
+            outcome = "booked"
+        except HTTPException:
+            outcome = "rejected"
+        except Exception:
+            logger.exception("Unexpected booking error")
+            outcome = "error"
+        finally:
+            session.close()
+        with lock:
+            outcomes[outcome] += 1
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for user_id, bed_id in zip(user_ids, targets):
+                pool.submit(attempt, user_id, bed_id)
+        elapsed = time.perf_counter() - started
+
+        live = Contract.status.in_([ContractStatus.PENDING, ContractStatus.ACTIVE])
+        double_booked = db.execute(
+            select(func.count()).select_from(
+                select(Contract.bed_id).where(Contract.bed_id.in_(bed_ids), live)
+                .group_by(Contract.bed_id).having(func.count() > 1).subquery()
+            )
+        ).scalar()
+        reserved = db.execute(
+            select(func.count(Bed.id)).where(Bed.id.in_(bed_ids), Bed.status == BedStatus.RESERVED)
+        ).scalar()
+
+        latencies.sort()
+        logger.info(f"attempts          {len(user_ids)}")
+        logger.info(f"booked            {outcomes['booked']}")
+        logger.info(f"rejected          {outcomes['rejected']}")
+        logger.info(f"errors            {outcomes['error']}")
+        logger.info(f"throughput        {len(user_ids) / elapsed:.1f} req/s")
+        logger.info(f"latency p50/p99   {latencies[len(latencies) // 2] * 1000:.1f} / {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+        logger.info(f"reserved beds     {reserved}")
+        logger.info(f"double-booked     {double_booked}")
+    finally:
+        cleanup(db, campus_id, building_id, bed_ids, user_ids)
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Load test: bursts of chatbot messages against a fake LLM, while probing a cheap endpoint.
+
+Starts a local HTTP server that mimics the Gemini REST API (fixed latency per
+answer, streamed word by word for streamGenerateContent), points ai_service at
+it and serves the app with uvicorn in a background thread. While the chat burst
+runs, a prober keeps calling GET /chat/suggested: if model calls block the event
+loop, probe latency climbs to the LLM latency.
+
+With --stream the burst uses POST /chat/stream and reports time to first token;
+--abandon makes that share of clients hang up after the first token, and the
+fake server reports how many upstream streams were cut short.
+The throw-away student account is deleted at the end:
+
+    python -m scripts.loadtest_chat --chats 200 --latency 2 --concurrency 16
+    python -m scripts.loadtest_chat --stream --abandon 0.5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import httpx
+import uvicorn
+from sqlalchemy import delete, insert
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.db import base  # noqa: F401  (register all mappers)
+from app.main import app
+from app.models.enums import GenderType, UserRole
+from app.models.users import User
+from app.services.ai_service import ai_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("google_genai").setLevel(logging.WARNING)
+
+ANSWER = "Chào bạn, mình là Tinmyn. Bạn có thể đăng ký phòng trong mục Hợp đồng nhé."
+
+
+def candidate(text: str) -> bytes:
+    return json.dumps({
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}]
+    }).encode()
+
+
+def fake_llm(latency: float) -> ThreadingHTTPServer:
+    streams = {"completed": 0, "aborted": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if "streamGenerateContent" in self.path:
+                self.stream()
+                return
+            time.sleep(latency)
+            body = candidate(ANSWER)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self):
+            words = ANSWER.split(" ")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            try:
+                for i, word in enumerate(words):
+                    time.sleep(latency / len(words))
+                    self.wfile.write(b"data: " + candidate(word if i == 0 else " " + word) + b"\r\n\r\n")
+                    self.wfile.flush()
+                outcome = "completed"
+            except (BrokenPipeError, ConnectionResetError):
+                outcome = "aborted"
+            with lock:
+                streams[outcome] += 1
+            self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.streams = streams
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_app() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+def report(label: str, latencies: List[float]) -> None:
+    if not latencies:
+        return
+    logger.info(
+        f"{label:<16} n={len(latencies):<5} p50={statistics.median(latencies) * 1000:8.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:8.1f}ms  max={max(latencies) * 1000:8.1f}ms"
+    )
+
+
+async def run(base_url: str, token: str, args: argparse.Namespace) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        async def probe() -> float:
+            start = time.perf_counter()
+            r = await client.get(f"{settings.API_V1_STR}/chat/suggested")
+            r.raise_for_status()
+            return time.perf_counter() - start
+
+        report("probe (idle)", [await probe() for _ in range(20)])
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        chat_latencies: List[float] = []
+        first_token: List[float] = []
+        answers = {"ok": 0, "fallback": 0, "abandoned": 0}
+
+        async def chat(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                r = await client.post(f"{settings.API_V1_STR}/chat/", headers=headers, json={"message": f"Câu hỏi {i}"})
+                chat_latencies.append(time.perf_counter() - start)
+                answers["ok" if r.status_code == 200 and r.json()["response"] == ANSWER else "fallback"] += 1
+
+        async def chat_stream(i: int) -> None:
+            abandon = i < args.chats * args.abandon
+            async with semaphore:
+                start = time.perf_counter()
+                text = ""
+                async with client.stream(
+                    "POST", f"{settings.API_V1_STR}/chat/stream", headers=headers, json={"message": f"Câu hỏi {i}"}
+                ) as r:
+                    async for line in r.aiter_lines():
+                        if not line.startswith("data: ") or line == "data: {}":
+                            continue
+                        if not text:
+                            first_token.append(time.perf_counter() - start)
+                        text += json.loads(line[6:])["text"]
+                        if abandon:
+                            break
+                if abandon:
+                    answers["abandoned"] += 1
+                    return
+                chat_latencies.append(time.perf_counter() - start)
+                answers["ok" if text == ANSWER else "fallback"] += 1
+
+        probe_latencies: List[float] = []
+        done = asyncio.Event()
+
+        async def prober() -> None:
+            while not done.is_set():
+                probe_latencies.append(await probe())
+                await asyncio.sleep(args.probe_interval)
+
+        probing = asyncio.create_task(prober())
+        start = time.perf_counter()
+        await asyncio.gather(*((chat_stream if args.stream else chat)(i) for i in range(args.chats)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probing
+
+        logger.info(f"{args.chats} chats in {elapsed:.2f}s ({args.chats / elapsed:.1f}/s): {answers}")
+        report("first token", first_token)
+        report("chat", chat_latencies)
+        report("probe (burst)", probe_latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=2.0, help="Fake LLM seconds per answer")
+    parser.add_argument("--concurrency", type=int, default=16, help="Simultaneous chat requests")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--stream", action="store_true", help="Use POST /chat/stream")
+    parser.add_argument("--abandon", type=float, default=0.0, help="Share of streaming clients that hang up early")
+    args = parser.parse_args()
+
+    server = fake_llm(args.latency)
+    ai_service.configure("fake-key", f"http://127.0.0.1:{server.server_port}")
+    logger.info(
+        f"fake LLM latency={args.latency}s, AI_MAX_CONCURRENCY={settings.AI_MAX_CONCURRENCY}, "
+        f"AI_TIMEOUT_SECONDS={settings.AI_TIMEOUT_SECONDS}"
+    )
+
+    db = SessionLocal()
+    user_id = uuid.uuid4()
+    db.execute(insert(User), [{
+        "id": user_id,
+        "email": f"lt-chat-{user_id.hex[:6]}@loadtest.local",
+        "hashed_password": "!",
+        "full_name": "Load Test",
+        "role": UserRole.STUDENT,
+        "gender": GenderType.MALE,
+        "is_active": True,
+    }])
+    db.commit()
+    try:
+        asyncio.run(run(serve_app(), create_access_token(user_id), args))
+        if args.stream:
+            # Give the fake server a moment to notice the last hang-ups
+            time.sleep(args.latency)
+            logger.info(f"upstream streams: {server.streams}")
+    finally:
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+        db.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
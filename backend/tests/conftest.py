@@ -0,0 +1,58 @@
+"""
+Shared fixtures. Pure unit tests need nothing; tests taking `db` run against the
+configured DATABASE_URL inside a transaction that is rolled back afterwards
+(service commits only release savepoints), and are skipped without Postgres.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db import base  # noqa: F401  (register all mappers)
+from app.db.session import engine
+from app.models.enums import BedStatus, ContractStatus
+from app.models.infrastructure import Bed
+from app.models.operations import Contract
+from scripts.loadtest_booking import seed
+
+
+@pytest.fixture
+def db():
+    try:
+        connection = engine.connect()
+    except OperationalError:
+        pytest.skip("Postgres is not reachable")
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def active_contracts(db):
+    """Factory: `count` ACTIVE contracts (one student, one OCCUPIED bed each) ending in `days`"""
+    def make(count: int = 1, days: int = 10):
+        _, building_id, bed_ids, user_ids = seed(db, count, count)
+        now = datetime.utcnow()
+        rows = [{
+            "id": uuid.uuid4(),
+            "student_id": user_id,
+            "bed_id": bed_id,
+            "start_date": now - timedelta(days=150),
+            "end_date": now + timedelta(days=days),
+            "price_per_month": 500000,
+            "deposit_amount": 500000,
+            "status": ContractStatus.ACTIVE,
+        } for user_id, bed_id in zip(user_ids, bed_ids)]
+        db.execute(insert(Contract), rows)
+        db.execute(update(Bed).where(Bed.id.in_(bed_ids)).values(status=BedStatus.OCCUPIED, is_occupied=True))
+        db.commit()
+        return building_id, [db.get(Contract, row["id"]) for row in rows]
+    return make
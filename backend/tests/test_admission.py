@@ -0,0 +1,84 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api import deps
+from app.core.admission import WaitingRoom
+
+
+def test_turns_are_admitted_in_order_up_to_max_active():
+    room = WaitingRoom(max_active=2, token_ttl=60)
+    tickets = [room.join(f"user-{i}") for i in range(3)]
+
+    assert [t["admitted"] for t in tickets] == [True, True, False]
+    assert tickets[2]["position"] == 1
+
+    assert room.enter(tickets[0]["token"], "user-0") is None
+    room.leave(tickets[0]["token"])
+    assert room.status(tickets[2]["token"], "user-2")["admitted"]
+
+
+def test_joining_twice_returns_the_same_ticket():
+    room = WaitingRoom(max_active=1, token_ttl=60)
+
+    assert room.join("user")["token"] == room.join("user")["token"]
+
+
+def test_status_of_another_users_token_looks_unknown():
+    room = WaitingRoom(max_active=1, token_ttl=60)
+    token = room.join("owner")["token"]
+
+    assert room.status(token, "someone-else") is None
+    assert room.status("no-such-token", "owner") is None
+    assert room.status(token, "owner")["token"] == token
+
+
+def test_token_only_enters_for_its_owner_and_once():
+    room = WaitingRoom(max_active=1, token_ttl=60)
+    token = room.join("owner")["token"]
+
+    assert room.enter(token, "someone-else") == {}
+    assert room.enter(None, "owner") == {}
+    assert room.enter(token, "owner") is None
+    # Already in flight: a second concurrent booking call is turned away
+    assert room.enter(token, "owner")["admitted"]
+
+
+def test_released_token_can_enter_again():
+    room = WaitingRoom(max_active=1, token_ttl=60)
+    token = room.join("owner")["token"]
+    assert room.enter(token, "owner") is None
+
+    room.release(token)
+
+    assert room.enter(token, "owner") is None
+
+
+@pytest.fixture
+def booking_room(monkeypatch):
+    room = WaitingRoom(max_active=1, token_ttl=60)
+    monkeypatch.setattr(deps, "booking_room", room)
+    monkeypatch.setattr(deps.settings, "WAITING_ROOM_ENABLED", True)
+    return room
+
+
+@pytest.mark.parametrize("status_code, keeps_turn", [(409, True), (503, False)])
+def test_refused_booking_keeps_the_turn(booking_room, status_code, keeps_turn):
+    token = booking_room.join("owner")["token"]
+    turn = deps.require_booking_turn("owner", token)
+    assert next(turn) == token
+
+    with pytest.raises(HTTPException):
+        turn.throw(HTTPException(status_code=status_code))
+
+    assert (booking_room.status(token, "owner") is not None) == keeps_turn
+
+
+def test_successful_booking_uses_up_the_turn(booking_room):
+    token = booking_room.join("owner")["token"]
+    turn = deps.require_booking_turn("owner", token)
+    next(turn)
+
+    with pytest.raises(StopIteration):
+        next(turn)
+
+    assert booking_room.status(token, "owner") is None
@@ -0,0 +1,135 @@
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.enums import GenderType
+from app.schemas.operations import AllocationRequest
+from app.services.allocation_service import FreeBed, StudentDemand, plan_allocation
+
+BUILDING_A = uuid.uuid4()
+BUILDING_B = uuid.uuid4()
+
+
+def room(beds: int, gender: GenderType = GenderType.MIXED, price: float = 500000, building_id=BUILDING_A):
+    room_id = uuid.uuid4()
+    return [FreeBed(uuid.uuid4(), room_id, building_id, gender, price) for _ in range(beds)]
+
+
+def student(gender: GenderType = GenderType.MALE, **kwargs) -> StudentDemand:
+    return StudentDemand(student_id=uuid.uuid4(), gender=gender, **kwargs)
+
+
+def test_every_student_gets_a_distinct_bed():
+    beds = room(4) + room(4)
+    students = [student() for _ in range(6)]
+
+    plan = plan_allocation(students, beds)
+
+    assert set(plan.assignments) == {s.student_id for s in students}
+    assert len({bed.bed_id for bed in plan.assignments.values()}) == 6
+    assert plan.unassigned == []
+    assert plan.metrics["assignment_rate"] == 1.0
+
+
+def test_more_students_than_beds_reports_the_rest_unassigned():
+    students = [student() for _ in range(5)]
+
+    plan = plan_allocation(students, room(4))
+
+    assert len(plan.assignments) == 4
+    assert len(plan.unassigned) == 1
+    assert set(plan.unassigned).isdisjoint(plan.assignments)
+
+
+def test_gendered_rooms_only_take_matching_students():
+    female_beds = room(2, GenderType.FEMALE)
+    students = [student(GenderType.MALE), student(None)]
+
+    plan = plan_allocation(students, female_beds)
+
+    assert plan.assignments == {}
+    assert sorted(plan.unassigned) == sorted(s.student_id for s in students)
+
+
+def test_students_without_declared_gender_only_go_to_mixed_rooms():
+    male_beds = room(1, GenderType.MALE)
+    mixed_beds = room(1, GenderType.MIXED)
+    undeclared = student(None)
+
+    plan = plan_allocation([undeclared], male_beds + mixed_beds)
+
+    assert plan.assignments[undeclared.student_id].room_id == mixed_beds[0].room_id
+
+
+def test_budget_is_respected():
+    cheap = room(1, price=400000)
+    expensive = room(1, price=900000)
+    tight = student(max_budget=500000)
+    unplaceable = student(max_budget=300000)
+
+    plan = plan_allocation([tight, unplaceable], expensive + cheap)
+
+    assert plan.assignments[tight.student_id].bed_id == cheap[0].bed_id
+    assert plan.unassigned == [unplaceable.student_id]
+
+
+def test_roommates_share_a_room():
+    a, b, c = student(), student(), student()
+    a.roommate_ids = [b.student_id]
+    c.roommate_ids = [b.student_id]
+    # Two rooms of two and one of three: only the last one holds the whole group
+    beds = room(2) + room(2) + room(3, price=600000)
+
+    plan = plan_allocation([a, b, c], beds)
+
+    rooms = {plan.assignments[s.student_id].room_id for s in (a, b, c)}
+    assert rooms == {beds[-1].room_id}
+    assert plan.metrics["roommate_groups"] == 1
+    assert plan.metrics["roommate_groups_kept"] == 1
+
+
+def test_group_that_fits_nowhere_is_split():
+    a, b, c = student(), student(), student()
+    a.roommate_ids = [b.student_id, c.student_id]
+
+    plan = plan_allocation([a, b, c], room(2) + room(2))
+
+    assert len(plan.assignments) == 3
+    assert plan.metrics["roommate_groups_kept"] == 0
+
+
+def test_preferred_building_is_used_when_it_has_room():
+    in_a = room(1, price=400000, building_id=BUILDING_A)
+    in_b = room(1, price=600000, building_id=BUILDING_B)
+    picky = student(preferred_building_id=BUILDING_B)
+
+    plan = plan_allocation([picky], in_a + in_b)
+
+    assert plan.assignments[picky.student_id].building_id == BUILDING_B
+    assert plan.metrics["preferred_building_rate"] == 1.0
+
+
+def test_repair_moves_a_placed_student_to_make_room():
+    # The male student is placed first and takes the cheaper mixed bed; the
+    # student without a declared gender can only use that bed, so repair moves
+    # the male student to the male room.
+    mixed = room(1, GenderType.MIXED, price=400000)
+    male = room(1, GenderType.MALE, price=450000)
+    first = student(GenderType.MALE, max_budget=500000)
+    second = student(None, max_budget=500000)
+
+    plan = plan_allocation([first, second], mixed + male)
+
+    assert plan.unassigned == []
+    assert plan.assignments[first.student_id].bed_id == male[0].bed_id
+    assert plan.assignments[second.student_id].bed_id == mixed[0].bed_id
+
+
+def test_request_rejects_duplicate_students():
+    student_id = str(uuid.uuid4())
+    with pytest.raises(ValidationError, match=student_id):
+        AllocationRequest(
+            students=[{"student_id": student_id}, {"student_id": student_id}],
+            end_date="2027-01-31T00:00:00",
+        )
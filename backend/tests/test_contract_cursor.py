@@ -0,0 +1,52 @@
+import base64
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.contract_service import ContractService
+
+
+def contract(created_at: datetime) -> SimpleNamespace:
+    return SimpleNamespace(id=uuid.uuid4(), created_at=created_at)
+
+
+def test_cursor_round_trip_keeps_timestamp_and_id():
+    row = contract(datetime(2026, 9, 1, 8, 30, 15, 123456, tzinfo=timezone.utc))
+
+    created_at, contract_id = ContractService.decode_cursor(ContractService.encode_cursor(row))
+
+    assert created_at == row.created_at
+    assert created_at.tzinfo is not None
+    assert contract_id == row.id
+
+
+def test_cursor_is_url_safe():
+    # The cursor travels in a query string: no "+" or "/" from the standard base64 alphabet
+    row = contract(datetime(2026, 9, 1, 8, 30, tzinfo=timezone.utc))
+    for _ in range(50):
+        row.id = uuid.uuid4()
+        cursor = ContractService.encode_cursor(row)
+        assert "+" not in cursor and "/" not in cursor
+
+
+def test_cursors_of_the_same_instant_differ_by_id():
+    created_at = datetime(2026, 9, 1, tzinfo=timezone.utc)
+    a, b = contract(created_at), contract(created_at)
+
+    assert ContractService.encode_cursor(a) != ContractService.encode_cursor(b)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    base64.urlsafe_b64encode(b"no separator").decode(),
+    base64.urlsafe_b64encode(b"2026-09-01T00:00:00|not-a-uuid").decode(),
+    base64.urlsafe_b64encode(b"yesterday|" + str(uuid.uuid4()).encode()).decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        ContractService.decode_cursor(cursor)
+    assert exc.value.status_code == 400
@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints import events
+from app.models.infrastructure import Bed
+from app.models.users import User
+
+
+@pytest.fixture
+def stream_session(db, monkeypatch):
+    # The stream opens its own short-lived session: keep it inside the test transaction
+    monkeypatch.setattr(
+        events, "SessionLocal",
+        lambda: Session(bind=db.connection(), join_transaction_mode="create_savepoint"),
+    )
+
+
+def test_subscriber_gets_user_role_and_location_topics(db, active_contracts, stream_session):
+    building_id, (contract,) = active_contracts()
+    bed = db.get(Bed, contract.bed_id)
+
+    principal, topics = events._subscriber_topics(str(contract.student_id))
+
+    assert principal.id == contract.student_id
+    assert topics[:3] == ["all", f"user:{contract.student_id}", f"role:{principal.role.value}"]
+    assert f"room:{bed.room_id}" in topics
+    assert f"building:{building_id}" in topics
+
+
+def test_subscriber_must_change_password_first(db, active_contracts, stream_session):
+    _, (contract,) = active_contracts()
+    db.execute(update(User).where(User.id == contract.student_id).values(must_change_password=True))
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        events._subscriber_topics(str(contract.student_id))
+    assert exc.value.status_code == 403
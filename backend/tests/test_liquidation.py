@@ -0,0 +1,94 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+
+from app.models.enums import BedStatus, ContractStatus, InvoiceStatus
+from app.models.finance import Invoice
+from app.models.infrastructure import Bed
+from app.models.operations import Contract
+from app.models.users import User, UserRole
+from app.schemas.operations import LiquidationBatchCreate, LiquidationCreate, RenewalGenerate
+from app.services.liquidation_service import liquidation_service
+from app.services.renewal_service import renewal_service
+
+
+@pytest.fixture
+def staff_id(db):
+    user_id = uuid.uuid4()
+    db.execute(insert(User), [{
+        "id": user_id, "email": f"staff-{user_id.hex[:8]}@example.com", "hashed_password": "!",
+        "role": UserRole.MANAGER, "is_active": True,
+    }])
+    db.commit()
+    return user_id
+
+
+def add_unpaid_invoice(db, contract_id):
+    db.execute(insert(Invoice), [{
+        "id": uuid.uuid4(), "contract_id": contract_id, "total_amount": 500000, "status": InvoiceStatus.UNPAID,
+    }])
+    db.commit()
+
+
+def test_single_liquidation_ends_contract_renewal_and_bed(db, active_contracts, staff_id):
+    building_id, (contract,) = active_contracts()
+    add_unpaid_invoice(db, contract.id)
+    renewal_service.generate(db, RenewalGenerate(building_id=building_id))
+    renewed = db.execute(select(Contract).where(Contract.renewal_of_id == contract.id)).scalar_one()
+    renewal_service.confirm(db, renewed.id, renewed.student_id)
+
+    record = liquidation_service.liquidate_contract(
+        db, staff_id, LiquidationCreate(contract_id=contract.id, penalty_amount=100000, damage_fee=50000)
+    )
+
+    assert record.total_refund_to_student == 350000
+    db.expire_all()
+    assert db.get(Contract, contract.id).status == ContractStatus.TERMINATED
+    assert db.get(Contract, renewed.id).status == ContractStatus.TERMINATED
+    assert db.get(Bed, contract.bed_id).status == BedStatus.AVAILABLE
+    statuses = db.execute(
+        select(Invoice.status).where(Invoice.contract_id.in_([contract.id, renewed.id]))
+    ).scalars().all()
+    assert statuses == [InvoiceStatus.CANCELLED, InvoiceStatus.CANCELLED]
+
+
+def test_single_liquidation_errors(db, active_contracts, staff_id):
+    _, (contract,) = active_contracts()
+    liquidation_service.liquidate_contract(db, staff_id, LiquidationCreate(contract_id=contract.id))
+
+    with pytest.raises(HTTPException) as exc:
+        liquidation_service.liquidate_contract(db, staff_id, LiquidationCreate(contract_id=contract.id))
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        liquidation_service.liquidate_contract(db, staff_id, LiquidationCreate(contract_id=uuid.uuid4()))
+    assert exc.value.status_code == 404
+
+
+def test_batch_liquidation_reports_each_contract(db, active_contracts, staff_id):
+    _, contracts = active_contracts(3)
+    missing = uuid.uuid4()
+    liquidation_service.liquidate_contract(db, staff_id, LiquidationCreate(contract_id=contracts[0].id))
+
+    result = liquidation_service.liquidate_batch(db, staff_id, LiquidationBatchCreate(
+        items=[
+            {"contract_id": contracts[0].id},
+            {"contract_id": contracts[1].id, "penalty_amount": 700000},
+            {"contract_id": contracts[2].id, "damage_fee": 200000},
+            {"contract_id": missing},
+        ],
+        chunk_size=2,
+    ))
+
+    assert result["chunks"] == 2
+    assert result["succeeded"] == 2
+    by_id = {r["contract_id"]: r for r in result["results"]}
+    assert by_id[contracts[0].id]["detail"] == "Only active contracts can be liquidated"
+    assert by_id[missing]["detail"] == "Contract not found"
+    # Charges beyond the deposit are owed by the student, not refunded
+    assert result["total_refund"] == 300000
+    assert result["total_owed"] == 200000
+    db.expire_all()
+    assert {db.get(Bed, c.bed_id).status for c in contracts} == {BedStatus.AVAILABLE}
@@ -0,0 +1,96 @@
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import MemoryBackend, RateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_burst_up_to_capacity_then_wait(clock):
+    backend = MemoryBackend()
+    # 5 requests per 10 s: 0.5 token per second
+    assert [backend.take("ip", 5, 0.5) for _ in range(5)] == [0.0] * 5
+    assert backend.take("ip", 5, 0.5) == pytest.approx(2.0)
+
+
+def test_tokens_refill_continuously_up_to_capacity(clock):
+    backend = MemoryBackend()
+    for _ in range(5):
+        backend.take("ip", 5, 0.5)
+
+    clock.now += 2
+    assert backend.take("ip", 5, 0.5) == 0.0
+    assert backend.take("ip", 5, 0.5) == pytest.approx(2.0)
+
+    clock.now += 3600
+    assert [backend.take("ip", 5, 0.5) for _ in range(6)].count(0.0) == 5
+
+
+def test_rejected_requests_do_not_consume(clock):
+    backend = MemoryBackend()
+    backend.take("ip", 1, 1)
+    for _ in range(10):
+        assert backend.take("ip", 1, 1) == pytest.approx(1.0)
+    clock.now += 1
+    assert backend.take("ip", 1, 1) == 0.0
+
+
+def test_dry_run_checks_without_consuming_or_storing(clock):
+    backend = MemoryBackend()
+    assert backend.take("new", 1, 1, dry_run=True) == 0.0
+    assert len(backend) == 0
+
+    backend.take("used", 1, 1)
+    assert backend.take("used", 1, 1, dry_run=True) == pytest.approx(1.0)
+    clock.now += 1
+    assert backend.take("used", 1, 1, dry_run=True) == 0.0
+    assert backend.take("used", 1, 1) == 0.0
+
+
+def test_identities_are_independent_and_reset(clock):
+    backend = MemoryBackend()
+    backend.take("a", 1, 1)
+    assert backend.take("b", 1, 1) == 0.0
+    backend.reset("a")
+    assert backend.take("a", 1, 1) == 0.0
+
+
+def test_least_recently_used_buckets_are_evicted(clock):
+    backend = MemoryBackend(maxsize=2)
+    backend.take("a", 1, 1)
+    backend.take("b", 1, 1)
+    backend.take("a", 1, 1)  # "a" is now the most recently used
+    backend.take("c", 1, 1)
+
+    assert len(backend) == 2
+    # "b" was forgotten: it starts again with a full bucket
+    assert backend.take("b", 1, 1) == 0.0
+
+
+def test_limiter_counts_rejections_and_honours_the_switch(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "_backend", MemoryBackend())
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_ENABLED", True)
+    limiter = RateLimiter("test", capacity=2, window_seconds=60)
+
+    assert limiter.hit("ip") == 0.0
+    assert limiter.check("ip") == 0.0
+    assert limiter.hit("ip") == 0.0
+    assert limiter.hit("ip") == pytest.approx(30.0)
+    assert limiter.check("ip") == pytest.approx(30.0)
+    assert limiter.stats()["rejected"] == 2
+
+    monkeypatch.setattr(rate_limit.settings, "RATE_LIMIT_ENABLED", False)
+    assert limiter.hit("ip") == 0.0
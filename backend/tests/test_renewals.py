@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.enums import BedStatus, ContractStatus, InvoiceStatus
+from app.models.finance import Invoice
+from app.models.infrastructure import Bed
+from app.models.operations import Contract
+from app.schemas.operations import BulkContractStatusUpdate, ContractUpdateStatus, RenewalGenerate
+from app.services.contract_service import ContractService, contract_service
+from app.services.renewal_service import renewal_service
+
+
+@pytest.mark.parametrize("original, expected", [
+    (ContractStatus.ACTIVE, ContractStatus.PENDING),
+    (ContractStatus.EXPIRED, ContractStatus.ACTIVE),
+    (ContractStatus.TERMINATED, None),
+    (ContractStatus.PENDING, None),
+    (None, None),
+])
+def test_renewal_approval_status(original, expected):
+    assert ContractService.renewal_approval_status(original) == expected
+
+
+@pytest.fixture
+def renewal(db, active_contracts):
+    """An ACTIVE contract ending in 10 days and its freshly generated PENDING renewal"""
+    building_id, (original,) = active_contracts()
+    result = renewal_service.generate(db, RenewalGenerate(building_id=building_id))
+    assert result["created"] == 1
+    renewed = db.execute(select(Contract).where(Contract.renewal_of_id == original.id)).scalar_one()
+    return original, renewed
+
+
+def sweep_after_end(db):
+    return contract_service.sweep(db, now=datetime.now(timezone.utc) + timedelta(days=11))
+
+
+def invoice_statuses(db, contract_id):
+    return db.execute(select(Invoice.status).where(Invoice.contract_id == contract_id)).scalars().all()
+
+
+def refresh(db, *rows):
+    db.expire_all()
+    return [db.get(type(row), row.id) for row in rows]
+
+
+def test_generate_creates_a_pending_renewal_with_its_invoice(db, renewal):
+    original, renewed = renewal
+
+    assert renewed.status == ContractStatus.PENDING
+    assert renewed.bed_id == original.bed_id
+    assert renewed.start_date == original.end_date
+    assert renewed.confirmed_at is None
+    assert renewed.created_at.tzinfo is not None
+    assert invoice_statuses(db, renewed.id) == [InvoiceStatus.UNPAID]
+
+
+def test_generate_is_idempotent(db, active_contracts):
+    building_id, _ = active_contracts()
+    request = RenewalGenerate(building_id=building_id)
+    assert renewal_service.generate(db, request)["created"] == 1
+
+    again = renewal_service.generate(db, request)
+
+    assert again["candidates"] == 0
+    assert again["created"] == 0
+
+
+def test_confirmed_renewal_waits_for_the_original_to_expire(db, renewal):
+    original, renewed = renewal
+
+    renewal_service.confirm(db, renewed.id, renewed.student_id)
+    original, renewed = refresh(db, original, renewed)
+    # Only one live ACTIVE contract on the bed until the sweeper runs
+    assert original.status == ContractStatus.ACTIVE
+    assert renewed.status == ContractStatus.PENDING
+    assert renewed.confirmed_at is not None
+
+    result = sweep_after_end(db)
+    original, renewed = refresh(db, original, renewed)
+    assert result["activated_renewals"] >= 1
+    assert original.status == ContractStatus.EXPIRED
+    assert renewed.status == ContractStatus.ACTIVE
+    assert db.get(Bed, renewed.bed_id).status == BedStatus.OCCUPIED
+    assert invoice_statuses(db, renewed.id) == [InvoiceStatus.UNPAID]
+
+
+def test_unconfirmed_renewal_lapses_and_frees_the_bed(db, renewal):
+    original, renewed = renewal
+
+    sweep_after_end(db)
+
+    original, renewed = refresh(db, original, renewed)
+    assert original.status == ContractStatus.EXPIRED
+    assert renewed.status == ContractStatus.EXPIRED
+    assert invoice_statuses(db, renewed.id) == [InvoiceStatus.CANCELLED]
+    assert db.get(Bed, original.bed_id).status == BedStatus.AVAILABLE
+
+
+def test_staff_approval_confirms_without_activating(db, renewal):
+    original, renewed = renewal
+
+    result = contract_service.bulk_update_status(
+        db, BulkContractStatusUpdate(contract_ids=[renewed.id], status=ContractStatus.ACTIVE)
+    )
+
+    assert result["results"][0]["success"]
+    # The bed already belongs to the original contract: no claim, no new invoice
+    assert result["results"][0]["invoice_id"] is None
+    (renewed,) = refresh(db, renewed)
+    assert renewed.status == ContractStatus.PENDING
+    assert renewed.confirmed_at is not None
+    assert invoice_statuses(db, renewed.id) == [InvoiceStatus.UNPAID]
+
+
+def test_approval_after_the_original_expired_activates(db, renewal):
+    original, renewed = renewal
+    contract_service.update_status(db, original.id, ContractUpdateStatus(status=ContractStatus.EXPIRED))
+
+    contract_service.update_status(db, renewed.id, ContractUpdateStatus(status=ContractStatus.ACTIVE))
+
+    original, renewed = refresh(db, original, renewed)
+    assert original.status == ContractStatus.EXPIRED
+    assert renewed.status == ContractStatus.ACTIVE
+
+
+def test_rejected_renewal_keeps_the_bed_with_the_original(db, renewal):
+    original, renewed = renewal
+
+    contract_service.update_status(db, renewed.id, ContractUpdateStatus(status=ContractStatus.TERMINATED))
+
+    original, renewed = refresh(db, original, renewed)
+    assert renewed.status == ContractStatus.TERMINATED
+    assert invoice_statuses(db, renewed.id) == [InvoiceStatus.CANCELLED]
+    assert db.get(Bed, original.bed_id).status == BedStatus.OCCUPIED
+
+
+def test_terminating_the_original_ends_its_renewal(db, renewal):
+    original, renewed = renewal
+    renewal_service.confirm(db, renewed.id, renewed.student_id)
+
+    contract_service.update_status(db, original.id, ContractUpdateStatus(status=ContractStatus.TERMINATED))
+
+    original, renewed = refresh(db, original, renewed)
+    assert original.status == ContractStatus.TERMINATED
+    assert renewed.status == ContractStatus.TERMINATED
+    assert invoice_statuses(db, renewed.id) == [InvoiceStatus.CANCELLED]
+    assert db.get(Bed, original.bed_id).status == BedStatus.AVAILABLE
+
+
+def test_declined_renewal_cannot_be_confirmed(db, renewal):
+    _, renewed = renewal
+
+    renewal_service.decline(db, renewed.id, renewed.student_id)
+
+    with pytest.raises(HTTPException) as exc:
+        renewal_service.confirm(db, renewed.id, renewed.student_id)
+    assert exc.value.status_code == 400
+    assert invoice_statuses(db, renewed.id) == [InvoiceStatus.CANCELLED]
+
+
+def test_only_the_owner_can_confirm(db, renewal, active_contracts):
+    _, renewed = renewal
+    _, (stranger,) = active_contracts()
+
+    with pytest.raises(HTTPException) as exc:
+        renewal_service.confirm(db, renewed.id, stranger.student_id)
+    assert exc.value.status_code == 403
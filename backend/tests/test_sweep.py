@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select, update
+
+from app.core.config import settings
+from app.models.enums import BedStatus, ContractStatus, InvoiceStatus
+from app.models.finance import Invoice
+from app.models.infrastructure import Bed
+from app.models.operations import Contract
+from app.services.contract_service import contract_service
+from scripts.loadtest_booking import seed
+
+
+def stale_holds(db, invoice_statuses):
+    """One PENDING contract past the TTL per invoice status, each on its own RESERVED bed"""
+    _, _, bed_ids, user_ids = seed(db, len(invoice_statuses), len(invoice_statuses))
+    created_at = datetime.now(timezone.utc) - timedelta(hours=settings.CONTRACT_PENDING_TTL_HOURS + 1)
+    now = datetime.utcnow()
+    contract_ids = [uuid.uuid4() for _ in invoice_statuses]
+    db.execute(insert(Contract), [{
+        "id": contract_id, "student_id": user_id, "bed_id": bed_id,
+        "start_date": now, "end_date": now + timedelta(days=150),
+        "price_per_month": 500000, "deposit_amount": 500000,
+        "status": ContractStatus.PENDING, "created_at": created_at,
+    } for contract_id, user_id, bed_id in zip(contract_ids, user_ids, bed_ids)])
+    db.execute(insert(Invoice), [{
+        "id": uuid.uuid4(), "contract_id": contract_id, "total_amount": 500000, "status": status,
+    } for contract_id, status in zip(contract_ids, invoice_statuses)])
+    db.execute(update(Bed).where(Bed.id.in_(bed_ids)).values(status=BedStatus.RESERVED))
+    db.commit()
+    return contract_ids
+
+
+def test_sweep_releases_unpaid_holds_and_cancels_their_invoices(db):
+    (contract_id,) = stale_holds(db, [InvoiceStatus.UNPAID])
+
+    result = contract_service.sweep(db)
+
+    assert result["released_holds"] >= 1
+    db.expire_all()
+    contract = db.get(Contract, contract_id)
+    assert contract.status == ContractStatus.EXPIRED
+    assert db.get(Bed, contract.bed_id).status == BedStatus.AVAILABLE
+    statuses = db.execute(select(Invoice.status).where(Invoice.contract_id == contract_id)).scalars().all()
+    assert statuses == [InvoiceStatus.CANCELLED]
+
+
+def test_sweep_keeps_paid_holds_for_staff(db):
+    # e.g. a transfer whose fee is paid: the old contract is already terminated
+    (contract_id,) = stale_holds(db, [InvoiceStatus.PAID])
+
+    contract_service.sweep(db)
+
+    db.expire_all()
+    contract = db.get(Contract, contract_id)
+    assert contract.status == ContractStatus.PENDING
+    assert db.get(Bed, contract.bed_id).status == BedStatus.RESERVED
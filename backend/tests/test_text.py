@@ -0,0 +1,28 @@
+import pytest
+
+from app.core.text import normalize_search, search_terms, user_search_text
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Nguyễn Văn Đức", "nguyen van duc"),
+    ("TRẦN THỊ HỒNG", "tran thi hong"),
+    ("đặng  \t quỳnh\nanh ", "dang quynh anh"),
+    # Decomposed input (NFD, e.g. typed on macOS) normalizes the same way
+    ("Nguyễn", "nguyen"),
+    ("SV2024001", "sv2024001"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_search(value, expected):
+    assert normalize_search(value) == expected
+
+
+def test_search_terms_split_on_whitespace():
+    assert search_terms("  Lê   Minh ") == ["le", "minh"]
+    assert search_terms("   ") == []
+    assert search_terms(None) == []
+
+
+def test_user_search_text_skips_missing_parts():
+    assert user_search_text("An.Le@Example.com", "Lê Văn An", None) == "le van an an.le@example.com"
+    assert user_search_text("x@example.com", None, "SV01") == "sv01 x@example.com"
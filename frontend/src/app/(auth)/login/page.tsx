@@ -44,7 +44,10 @@ export default function LoginPage() {
         setError(null);
         try {
             const { user } = await authService.login(data);
-            if (user.role === 'SINH_VIEN') {
+            if (user.must_change_password) {
+                // Other endpoints are refused until the one-time password is replaced
+                router.push(user.role === 'SINH_VIEN' ? "/student/settings" : "/admin/settings");
+            } else if (user.role === 'SINH_VIEN') {
                 router.push("/student/dashboard");
             } else {
                 router.push("/admin/dashboard");
@@ -1,4 +1,5 @@
 import { useState } from "react";
+import { useRouter } from "next/navigation";
 import { useForm } from "react-hook-form";
 import { zodResolver } from "@hookform/resolvers/zod";
 import * as z from "zod";
@@ -33,6 +34,7 @@ type PasswordFormValues = z.infer<typeof passwordSchema>;
 export function ChangePasswordForm() {
     const { user } = useAuthStore();
     const { toast } = useToast();
+    const router = useRouter();
     const [isLoading, setIsLoading] = useState(false);
 
     const form = useForm<PasswordFormValues>({
@@ -53,11 +55,14 @@ export function ChangePasswordForm() {
                 new_password: data.new_password,
             });
 
+            form.reset();
+            // Changing the password signs out every session, including this one
             toast({
                 title: "Thành công",
-                description: "Đổi mật khẩu thành công",
+                description: "Đổi mật khẩu thành công, vui lòng đăng nhập lại",
             });
-            form.reset();
+            authService.logout();
+            router.push("/login");
         } catch (error: any) {
             console.error(error);
             // Assuming error.response.data.detail could be "Incorrect password"
@@ -15,6 +15,10 @@ export function ChatWidget() {
     const [isLoading, setIsLoading] = useState(false);
     const [suggestedQuestions, setSuggestedQuestions] = useState<SuggestedQuestion[]>([]);
     const scrollRef = useRef<HTMLDivElement>(null);
+    const streamRef = useRef<AbortController | null>(null);
+
+    // Closing the page mid-answer stops the generation on the server
+    useEffect(() => () => streamRef.current?.abort(), []);
 
     useEffect(() => {
         if (isOpen && messages.length === 0) {
@@ -61,16 +65,23 @@ export function ChatWidget() {
         setInputValue('');
         setIsLoading(true);
 
+        const aiMsgId = (Date.now() + 1).toString();
+        const controller = new AbortController();
+        streamRef.current = controller;
+        let received = false;
+
         try {
-            const responseText = await chatService.sendMessage(messageText);
-            const aiMsg: ChatMessage = {
-                id: (Date.now() + 1).toString(),
-                sender: 'ai',
-                text: responseText,
-                timestamp: new Date(),
-            };
-            setMessages((prev) => [...prev, aiMsg]);
+            // The answer bubble appears with the first token and grows as the rest arrives
+            await chatService.streamMessage(messageText, (token) => {
+                if (!received) {
+                    received = true;
+                    setMessages((prev) => [...prev, { id: aiMsgId, sender: 'ai', text: token, timestamp: new Date() }]);
+                } else {
+                    setMessages((prev) => prev.map((m) => (m.id === aiMsgId ? { ...m, text: m.text + token } : m)));
+                }
+            }, controller.signal);
         } catch (error) {
+            if (controller.signal.aborted || received) return;
             const errorMsg: ChatMessage = {
                 id: (Date.now() + 1).toString(),
                 sender: 'ai',
@@ -79,6 +90,7 @@ export function ChatWidget() {
             };
             setMessages((prev) => [...prev, errorMsg]);
         } finally {
+            streamRef.current = null;
             setIsLoading(false);
         }
     };
@@ -201,7 +213,7 @@ export function ChatWidget() {
                                 </div>
                             )}
 
-                            {isLoading && (
+                            {isLoading && messages[messages.length - 1]?.sender !== 'ai' && (
                                 <div className="self-start bg-white rounded-2xl rounded-bl-none p-4 border border-slate-100 shadow-sm flex items-center gap-3 animate-in fade-in zoom-in duration-300">
                                     <Loader2 className="h-4 w-4 text-blue-600 animate-spin" />
                                     <span className="text-sm text-slate-500 font-medium">Đang suy nghĩ...</span>
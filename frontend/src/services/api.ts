@@ -34,7 +34,7 @@ const getBaseUrl = () => {
     return url;
 };
 
-const API_URL = getBaseUrl();
+export const API_URL = getBaseUrl();
 console.log('API Service configured with Base URL:', API_URL);
 
 export const api = axios.create({
@@ -56,11 +56,44 @@ api.interceptors.request.use(
     (error) => Promise.reject(error)
 );
 
-// Response Interceptor: Handle 401
+// Access tokens are short-lived: on 401, trade the refresh token for a new pair
+// once (shared by all requests that failed meanwhile) and replay the request
+let refreshing: Promise<string | null> | null = null;
+
+export const refreshAccessToken = (): Promise<string | null> => {
+    const refreshToken = Cookies.get('refresh_token');
+    if (!refreshToken) return Promise.resolve(null);
+    if (!refreshing) {
+        refreshing = axios
+            .post(`${API_URL}/api/v1/auth/refresh`, { refresh_token: refreshToken })
+            .then((response) => {
+                const { access_token, refresh_token } = response.data;
+                Cookies.set('auth_token', access_token, { expires: 7 });
+                Cookies.set('refresh_token', refresh_token, { expires: 14 });
+                useAuthStore.getState().setAuth(useAuthStore.getState().user, access_token);
+                return access_token as string;
+            })
+            .catch(() => null)
+            .finally(() => {
+                refreshing = null;
+            });
+    }
+    return refreshing;
+};
+
 // Response Interceptor: Handle 401
 api.interceptors.response.use(
     (response) => response,
-    (error) => {
+    async (error) => {
+        if (error.response?.status === 401 && error.config && !error.config._retried) {
+            const token = await refreshAccessToken();
+            if (token) {
+                error.config._retried = true;
+                error.config.headers.Authorization = `Bearer ${token}`;
+                return api(error.config);
+            }
+        }
+
         // Check if the request explicitly wants to bypass global error handling
         if (error.config?.skipGlobalErrorHandler) {
             return Promise.reject(error);
@@ -69,6 +102,7 @@ api.interceptors.response.use(
         if (error.response?.status === 401) {
             useAuthStore.getState().logout();
             Cookies.remove('auth_token');
+            Cookies.remove('refresh_token');
             if (typeof window !== 'undefined' && !window.location.pathname.startsWith('/login')) {
                 // Redirect to login page
                 window.location.href = '/login';
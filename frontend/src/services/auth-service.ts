@@ -15,12 +15,15 @@ export const authService = {
             },
         });
 
-        const { access_token } = response.data;
+        const { access_token, refresh_token } = response.data;
 
         // Temporarily set token in Cookie so the subsequent request works if it relies on cookies, 
         // or update store first if api interceptor uses store.
         // Assuming api interceptor uses Cookies or we need to set it manually.
         Cookies.set('auth_token', access_token, { expires: 7 });
+        if (refresh_token) {
+            Cookies.set('refresh_token', refresh_token, { expires: 14 });
+        }
 
         // Fetch user details immediately
         // We manually set header for this request if needed, or rely on the cookie we just set
@@ -62,8 +65,19 @@ export const authService = {
     },
 
     logout() {
+        // Best effort: revoke the session server-side, then clear local state.
+        // Interceptors run after this returns, so capture the tokens and send the header now
+        const token = useAuthStore.getState().token;
+        const refreshToken = Cookies.get('refresh_token');
+        if (token) {
+            api.post('/api/v1/auth/logout', { refresh_token: refreshToken }, {
+                headers: { Authorization: `Bearer ${token}` },
+                skipGlobalErrorHandler: true
+            } as any).catch(() => undefined);
+        }
         useAuthStore.getState().logout();
         Cookies.remove('auth_token');
+        Cookies.remove('refresh_token');
         Cookies.remove('user_role');
     }
 };
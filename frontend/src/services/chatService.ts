@@ -1,4 +1,5 @@
-import { api } from '@/services/api';
+import { api, API_URL, refreshAccessToken } from '@/services/api';
+import { useAuthStore } from '@/stores/auth-store';
 
 export interface ChatMessage {
     id: string;
@@ -18,6 +19,45 @@ export const chatService = {
         return response.data.response;
     },
 
+    // Relays the answer while the model writes it (POST /chat/stream, Server-Sent Events).
+    // Aborting the signal closes the connection, which also stops generation server-side.
+    async streamMessage(message: string, onToken: (text: string) => void, signal?: AbortSignal): Promise<void> {
+        const send = (token: string | null) => fetch(`${API_URL}/api/v1/chat/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                ...(token ? { Authorization: `Bearer ${token}` } : {}),
+            },
+            body: JSON.stringify({ message }),
+            signal,
+        });
+
+        let response = await send(useAuthStore.getState().token);
+        if (response.status === 401) {
+            const token = await refreshAccessToken();
+            if (token) response = await send(token);
+        }
+        if (!response.ok || !response.body) {
+            throw new Error(`Chat stream failed with status ${response.status}`);
+        }
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            const events = buffer.split('\n\n');
+            buffer = events.pop() ?? '';
+            for (const event of events) {
+                const data = event.split('\n').find((line) => line.startsWith('data: '));
+                if (event.startsWith('event: token') && data) {
+                    onToken(JSON.parse(data.slice('data: '.length)).text);
+                }
+            }
+        }
+    },
+
     async getSuggestedQuestions(): Promise<SuggestedQuestion[]> {
         const response = await api.get('/api/v1/chat/suggested');
         return response.data;
@@ -14,11 +14,14 @@ export interface User {
     avatar_url?: string;
     phone_number?: string;
     gender?: string; // 'MALE' | 'FEMALE' | 'OTHER'
+    must_change_password?: boolean; // imported accounts log in with a one-time password
 }
 
 export interface LoginResponse {
     access_token: string;
     token_type: string;
+    refresh_token?: string;
+    expires_in?: number;
     user: User;
 }
 